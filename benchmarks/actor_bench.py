@@ -0,0 +1,496 @@
+'''
+Throughput and latency of the actor runtime: tell ping-pong, ask round
+trips, fan-out, fan-in and batched tells, the routers, a Source to
+NodePubSub to Sink stream and the actor spawn and shutdown rates.  Every
+scenario runs on the default loop and is repeated, reporting the median
+rate.  Results are written as JSON that benchmarks.compare checks against
+an earlier run.
+
+    python -m benchmarks.actor_bench [--scale 1.0] [--repeat 3]
+        [--only PATTERN] [--metrics] [--json] [--output FILE]
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from multiprocessing import cpu_count
+from compaktor.actor.base_actor import BaseActor
+from compaktor.message.message_objects import Message, QueryMessage,\
+    RouteTell
+from compaktor.metrics.actor_metrics import get_metrics_registry
+from compaktor.routing.balancing import BalancingRouter
+from compaktor.routing.random import RandomRouter
+from compaktor.routing.round_robin import RoundRobinRouter
+from compaktor.streams.objects.node_pub_sub import NodePubSub
+from compaktor.streams.objects.sink import Sink
+from compaktor.streams.objects.source import Source
+from compaktor.system.actor_system import ActorSystem
+from compaktor.utils.name_utils import NameCreationUtils
+
+
+SEED = 1234
+WIDTH = 16
+ROUTEES = 4
+BATCH = 100
+TIMEOUT = 120
+
+
+class Ball(Message):
+    __slots__ = ()
+
+
+class Work(Message):
+    __slots__ = ()
+
+
+class Countdown(object):
+    """
+    Completes a future once a number of messages have been counted
+    """
+
+    def __init__(self, total, loop):
+        self.remaining = total
+        self.done = loop.create_future()
+        if total <= 0:
+            self.done.set_result(None)
+
+    def count(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done.set_result(None)
+
+
+class PongActor(BaseActor):
+    """
+    Returns every ball to its sender
+    """
+
+    def __init__(self, name=None, loop=None):
+        super().__init__(name, loop)
+        self.register_handler(Ball, self.__return)
+
+    async def __return(self, message):
+        await self.tell(message.sender, Ball(message.payload, self))
+
+
+class PingActor(BaseActor):
+    """
+    Serves balls to a partner one at a time and times each return
+    """
+
+    def __init__(self, name=None, loop=None):
+        super().__init__(name, loop)
+        self.latencies = []
+        self.__partner = None
+        self.__countdown = None
+        self.register_handler(Ball, self.__receive_ball)
+
+    async def serve(self, partner, rounds):
+        self.__partner = partner
+        self.__countdown = Countdown(rounds, self.loop)
+        await self.tell(partner, Ball(time.perf_counter(), self))
+        await self.__countdown.done
+
+    async def __receive_ball(self, message):
+        now = time.perf_counter()
+        self.latencies.append(now - message.payload)
+        self.__countdown.count()
+        if self.__countdown.remaining > 0:
+            await self.tell(self.__partner, Ball(now, self))
+
+
+class EchoActor(BaseActor):
+    """
+    Answers a query with its payload
+    """
+
+    def __init__(self, name=None, loop=None):
+        super().__init__(name, loop)
+        self.register_handler(QueryMessage, self.__echo)
+
+    async def __echo(self, message):
+        return message.payload
+
+
+class CountActor(BaseActor):
+    """
+    Counts every message it handles
+    """
+
+    def __init__(self, countdown, name=None, loop=None, inbox=None):
+        super().__init__(name, loop, inbox=inbox)
+        self.__countdown = countdown
+        self.register_handler(Message, self.__count)
+
+    async def __count(self, message):
+        self.__countdown.count()
+
+
+class CountSource(Source):
+    """
+    Produces increasing integers
+    """
+
+    def __init__(self, loop):
+        super().__init__(_name('source'), loop=loop, subscribers=[])
+        self.__value = 0
+
+    def on_pull(self):
+        self.__value += 1
+        return self.__value
+
+
+class DoubleNode(NodePubSub):
+    """
+    Doubles every integer passing through
+    """
+
+    def __init__(self, provider, loop):
+        super().__init__(_name('node'), [provider], loop=loop, concurrency=1)
+
+    async def on_pull(self, message):
+        return message * 2
+
+
+class CountSink(Sink):
+    """
+    Counts every item reaching the end of the stream
+    """
+
+    def __init__(self, provider, countdown, loop):
+        super().__init__(_name('sink'), [provider], loop=loop, concurrency=1)
+        self.__countdown = countdown
+
+    def on_push(self, message):
+        if self.__countdown.remaining > 0:
+            self.__countdown.count()
+
+
+def _name(kind):
+    return "bench_{}_{}".format(kind, NameCreationUtils.get_name_base())
+
+
+def _start(*actors):
+    for actor in actors:
+        actor.start()
+    return actors
+
+
+async def _stop(actors):
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            *(actor.stop() for actor in actors), return_exceptions=True), 10)
+    except asyncio.TimeoutError:
+        pass
+
+
+def bench_ping_pong(loop, count):
+    async def run():
+        ping, pong = _start(PingActor(), PongActor())
+        start = time.perf_counter()
+        await ping.serve(pong, count)
+        elapsed = time.perf_counter() - start
+        await _stop((ping, pong))
+        return count, elapsed, ping.latencies
+    return loop.run_until_complete(run())
+
+
+def bench_ask(loop, count):
+    async def run():
+        driver, echo = _start(BaseActor(), EchoActor())
+        latencies = []
+        start = time.perf_counter()
+        for i in range(count):
+            sent = time.perf_counter()
+            await driver.ask(echo, QueryMessage(i), timeout=TIMEOUT)
+            latencies.append(time.perf_counter() - sent)
+        elapsed = time.perf_counter() - start
+        await _stop((driver, echo))
+        return count, elapsed, latencies
+    return loop.run_until_complete(run())
+
+
+def bench_fan_out(loop, count):
+    async def run():
+        countdown = Countdown(count, loop)
+        workers = _start(*(CountActor(countdown) for _ in range(WIDTH)))
+        driver, = _start(BaseActor())
+        start = time.perf_counter()
+        for i in range(count):
+            await driver.tell(workers[i % WIDTH], Work(i))
+        await asyncio.wait_for(countdown.done, TIMEOUT)
+        elapsed = time.perf_counter() - start
+        await _stop(workers + (driver,))
+        return count, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def bench_fan_out_nowait(loop, count):
+    async def run():
+        countdown = Countdown(count, loop)
+        workers = _start(*(CountActor(countdown) for _ in range(WIDTH)))
+        driver, = _start(BaseActor())
+        start = time.perf_counter()
+        for i in range(count):
+            target = workers[i % WIDTH]
+            message = Work(i)
+            if driver.tell_nowait(target, message) is None:
+                await driver.tell(target, message)
+        await asyncio.wait_for(countdown.done, TIMEOUT)
+        elapsed = time.perf_counter() - start
+        await _stop(workers + (driver,))
+        return count, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def bench_batch(loop, count):
+    batches = max(1, count // BATCH)
+    total = batches * BATCH
+
+    async def run():
+        countdown = Countdown(total, loop)
+        collector, = _start(CountActor(countdown))
+        producer, = _start(BaseActor())
+        start = time.perf_counter()
+        for b in range(batches):
+            await producer.tell_many(
+                collector, [Work(i) for i in range(BATCH)])
+        await asyncio.wait_for(countdown.done, TIMEOUT)
+        elapsed = time.perf_counter() - start
+        await _stop((producer, collector))
+        return total, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def bench_fan_in(loop, count):
+    per_producer = max(1, count // WIDTH)
+    total = per_producer * WIDTH
+
+    async def produce(producer, target):
+        for i in range(per_producer):
+            await producer.tell(target, Work(i))
+
+    async def run():
+        countdown = Countdown(total, loop)
+        collector, = _start(CountActor(countdown))
+        producers = _start(*(BaseActor() for _ in range(WIDTH)))
+        start = time.perf_counter()
+        await asyncio.gather(*(produce(p, collector) for p in producers))
+        await asyncio.wait_for(countdown.done, TIMEOUT)
+        elapsed = time.perf_counter() - start
+        await _stop(producers + (collector,))
+        return total, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def _bench_router(router_cls, loop, count):
+    async def run():
+        countdown = Countdown(count, loop)
+        router, = _start(router_cls(name=_name('router'), actors=[]))
+        inbox = None
+        if isinstance(router, BalancingRouter):
+            inbox = router.get_router_queue()
+        workers = [CountActor(countdown, inbox=inbox) for _ in range(ROUTEES)]
+        for worker in workers:
+            worker.start()
+            router.add_actor(worker)
+        driver, = _start(BaseActor())
+        start = time.perf_counter()
+        for i in range(count):
+            await driver.tell(router, RouteTell(Work(i)))
+        await asyncio.wait_for(countdown.done, TIMEOUT)
+        elapsed = time.perf_counter() - start
+        await _stop(workers + [driver, router])
+        return count, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def bench_round_robin(loop, count):
+    return _bench_router(RoundRobinRouter, loop, count)
+
+
+def bench_random(loop, count):
+    return _bench_router(RandomRouter, loop, count)
+
+
+def bench_balancing(loop, count):
+    return _bench_router(BalancingRouter, loop, count)
+
+
+def bench_pipeline(loop, count):
+    # NodePubSub drives the loop while it is built so the stream is set up
+    # before the loop runs
+    countdown = Countdown(count, loop)
+    source = CountSource(loop)
+    source.start()
+    node = DoubleNode(source, loop)
+    node.start()
+    sink = CountSink(node, countdown, loop)
+    start = time.perf_counter()
+    sink.start()
+    loop.run_until_complete(asyncio.wait_for(countdown.done, TIMEOUT))
+    elapsed = time.perf_counter() - start
+    actors = [sink, node, source, node.router] + list(node.router.actor_set)
+    actors.extend(stage._subscription_router for stage in (sink, node, source))
+    loop.run_until_complete(_stop(actors))
+    return count, elapsed, None
+
+
+def bench_spawn(loop, count):
+    async def run():
+        system = ActorSystem(_name('system'))
+        start = time.perf_counter()
+        actors = [system.spawn(BaseActor) for _ in range(count)]
+        await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        await _stop(actors)
+        return count, elapsed, None
+    return loop.run_until_complete(run())
+
+
+def bench_shutdown(loop, count):
+    name = _name('shutdown')
+    system = ActorSystem(name)
+    branches = [BaseActor(name=_name('branch')) for _ in range(10)]
+    for branch in _start(*branches):
+        system.add_actor(branch, name)
+    for i in range(count):
+        branch = branches[i % len(branches)]
+        actor = BaseActor(name=_name('leaf'))
+        actor.start()
+        system.add_actor(actor, "{}/{}".format(name, branch.get_name()))
+    loop.run_until_complete(asyncio.sleep(0))
+    start = time.perf_counter()
+    report = system.close()
+    elapsed = time.perf_counter() - start
+    return len(report.stopped), elapsed, None
+
+
+BENCHMARKS = [
+    ('tell.ping_pong', bench_ping_pong, 20000),
+    ('ask.round_trip', bench_ask, 20000),
+    ('tell.fan_out', bench_fan_out, 50000),
+    ('tell.fan_out_nowait', bench_fan_out_nowait, 50000),
+    ('tell.fan_in', bench_fan_in, 50000),
+    ('tell.batch', bench_batch, 50000),
+    ('router.round_robin', bench_round_robin, 20000),
+    ('router.random', bench_random, 20000),
+    ('router.balancing', bench_balancing, 20000),
+    ('stream.pipeline', bench_pipeline, 5000),
+    ('system.spawn', bench_spawn, 5000),
+    ('system.shutdown', bench_shutdown, 5000)]
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def get_environment():
+    """
+    Describe the interpreter and host so runs can be matched up
+
+    :return: The environment
+    :rtype: dict()
+    """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': cpu_count()}
+
+
+def run(scale=1.0, repeat=3, only=None):
+    """
+    Run the scenarios.
+
+    :param scale: Multiplier for the operation counts
+    :type scale: float()
+    :param repeat: Runs of each scenario, the median rate is reported
+    :type repeat: int()
+    :param only: Glob patterns selecting scenarios by name
+    :type only: list()
+    :return: One result per scenario
+    :rtype: list()
+    """
+    random.seed(SEED)
+    loop = asyncio.get_event_loop()
+    results = []
+    with open(os.devnull, 'w') as devnull:
+        for name, bench, count in BENCHMARKS:
+            if only and not any(fnmatch.fnmatch(name, p) for p in only):
+                continue
+            count = max(1, int(count * scale))
+            rates = []
+            latencies = []
+            for _ in range(max(1, repeat)):
+                with redirect_stdout(devnull):
+                    ops, seconds, measured = bench(loop, count)
+                rates.append(ops / seconds)
+                latencies.extend(measured or ())
+            res = {
+                'name': name,
+                'operations': ops,
+                'repeat': len(rates),
+                'ops_per_sec': statistics.median(rates),
+                'best_ops_per_sec': max(rates)}
+            if latencies:
+                res['p50_us'] = _percentile(latencies, 0.5) * 1e6
+                res['p99_us'] = _percentile(latencies, 0.99) * 1e6
+            results.append(res)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier for the operation counts')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each scenario')
+    parser.add_argument('--only', action='append',
+                        help='glob selecting scenarios, may be repeated')
+    parser.add_argument('--metrics', action='store_true',
+                        help='instrument every actor while measuring')
+    parser.add_argument('--json', action='store_true',
+                        help='print JSON instead of a table')
+    parser.add_argument('--output', help='also write the JSON to a file')
+    args = parser.parse_args()
+    if args.metrics:
+        get_metrics_registry().enable()
+    document = {
+        'suite': 'actor_bench',
+        'seed': SEED,
+        'scale': args.scale,
+        'metrics': args.metrics,
+        'environment': get_environment(),
+        'results': run(args.scale, args.repeat, args.only)}
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(document, out, indent=2, sort_keys=True)
+    if args.json:
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        print()
+        return
+    for res in document['results']:
+        line = "{:<22} {:>12.0f} ops/s".format(
+            res['name'], res['ops_per_sec'])
+        if 'p50_us' in res:
+            line += " {:>9.1f} us p50 {:>9.1f} us p99".format(
+                res['p50_us'], res['p99_us'])
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+'''
+Encode and decode throughput of the built-in message types with plain
+pickle, the out of band pickle codec and, for fixed schema payloads, the
+struct codec.
+
+    python -m benchmarks.codec_bench [--scale 1.0] [--json]
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import argparse
+import json
+import pickle
+import time
+from compaktor.message.message_objects import Message, QueryMessage,\
+    SplitPublish, TaskMessage
+from compaktor.serialization.codecs import Codec, PickleCodec, StructCodec
+
+
+class InBandCodec(Codec):
+    """
+    Plain pickle with every buffer copied into the pickle
+    """
+
+    def encode(self, message):
+        return [pickle.dumps(message, pickle.HIGHEST_PROTOCOL)]
+
+    def decode(self, frames):
+        return pickle.loads(frames[0])
+
+
+def _cases():
+    pickled = (('pickle', InBandCodec()), ('oob', PickleCodec()))
+    return [
+        ('Message', Message('hello'), pickled),
+        ('QueryMessage', QueryMessage({'key': 1}), pickled),
+        ('TaskMessage', TaskMessage(('task', 3), None, None), pickled),
+        ('SplitPublish', SplitPublish('split', 'hello'), pickled),
+        ('Message.int', Message(12345), pickled + (
+            ('struct', StructCodec(Message, '!q')),)),
+        ('Message.64KB', Message(bytes(1 << 16)), pickled),
+        ('Message.4MB', Message(bytes(1 << 22)), pickled)]
+
+
+def _rate(func, arg, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func(arg)
+    return count / (time.perf_counter() - start)
+
+
+def run(scale=1.0):
+    """
+    Time every message type with every codec that applies to it.
+
+    :param scale: Multiplier for the iteration counts
+    :type scale: float()
+    :return: One result per message type and codec
+    :rtype: list()
+    """
+    results = []
+    for label, message, codecs in _cases():
+        count = 200000
+        payload = message.payload
+        if isinstance(payload, bytes):
+            count = max(20, (1 << 26) // len(payload))
+        count = max(1, int(count * scale))
+        for name, codec in codecs:
+            frames = codec.encode(message)
+            # transports deliver out of band frames as bytes
+            received = [frames[0]] + [bytes(frame) for frame in frames[1:]]
+            results.append({
+                'name': 'codec.{}.{}'.format(name, label),
+                'codec': name,
+                'message': label,
+                'iterations': count,
+                'frames': len(frames),
+                'inline_bytes': len(frames[0]),
+                'encode_per_sec': _rate(codec.encode, message, count),
+                'decode_per_sec': _rate(codec.decode, received, count)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier for the iteration counts')
+    parser.add_argument('--json', action='store_true',
+                        help='print JSON instead of a table')
+    args = parser.parse_args()
+    results = run(args.scale)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for res in results:
+        print("{:<28} {:>12.0f} enc/s {:>12.0f} dec/s {:>9} inline B".format(
+            res['name'], res['encode_per_sec'], res['decode_per_sec'],
+            res['inline_bytes']))
+
+
+if __name__ == "__main__":
+    main()
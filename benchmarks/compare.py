@@ -0,0 +1,111 @@
+'''
+Compare two benchmark runs.  Rates, metrics ending in _per_sec, are better
+when higher and latencies, metrics ending in _us, when lower.  A metric
+that moved the wrong way by more than the threshold is a regression and
+the exit status is 1 when there is one.
+
+    python -m benchmarks.compare BASELINE CANDIDATE [--threshold 0.1]
+        [--json]
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """
+    Load the results of a run written by a benchmark
+
+    :param path: The JSON file, a result list or a document with results
+    :type path: str()
+    :return: The results by name
+    :rtype: dict()
+    """
+    with open(path) as source:
+        document = json.load(source)
+    if isinstance(document, dict):
+        document = document['results']
+    return {res['name']: res for res in document}
+
+
+def _higher_is_better(metric):
+    if metric.endswith('_per_sec'):
+        return True
+    if metric.endswith('_us'):
+        return False
+    return None
+
+
+def compare(baseline, candidate, threshold=0.1):
+    """
+    Compare the metrics the runs share
+
+    :param baseline: Results by name of the earlier run
+    :type baseline: dict()
+    :param candidate: Results by name of the new run
+    :type candidate: dict()
+    :param threshold: Relative change counted as a regression
+    :type threshold: float()
+    :return: The changes and the names only one run has
+    :rtype: dict()
+    """
+    changes = []
+    for name in sorted(set(baseline) & set(candidate)):
+        old = baseline[name]
+        new = candidate[name]
+        for metric in sorted(set(old) & set(new)):
+            higher = _higher_is_better(metric)
+            if higher is None or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            worse = -change if higher else change
+            changes.append({
+                'name': name,
+                'metric': metric,
+                'baseline': old[metric],
+                'candidate': new[metric],
+                'change': change,
+                'regression': worse > threshold})
+    return {
+        'threshold': threshold,
+        'changes': changes,
+        'missing': sorted(set(baseline) - set(candidate)),
+        'new': sorted(set(candidate) - set(baseline)),
+        'regressions': sum(1 for c in changes if c['regression'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('baseline', help='results of the earlier run')
+    parser.add_argument('candidate', help='results of the new run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change counted as a regression')
+    parser.add_argument('--json', action='store_true',
+                        help='print JSON instead of a table')
+    args = parser.parse_args()
+    report = compare(load_results(args.baseline),
+                     load_results(args.candidate), args.threshold)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        for change in report['changes']:
+            print("{:<22} {:<18} {:>12.1f} {:>12.1f} {:>+8.1%}{}".format(
+                change['name'], change['metric'], change['baseline'],
+                change['candidate'], change['change'],
+                '  REGRESSION' if change['regression'] else ''))
+        for name in report['missing']:
+            print("{:<22} missing from the candidate".format(name))
+        for name in report['new']:
+            print("{:<22} only in the candidate".format(name))
+    if report['regressions']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
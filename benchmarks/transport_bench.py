@@ -0,0 +1,141 @@
+'''
+Compare the shared memory ring transport against the pipe for moving tell
+commands to another process.  Both send through a worker handle so commands
+are encoded and framed the way the process runtime does.
+
+    python -m benchmarks.transport_bench [--scale 1.0] [--json]
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import argparse
+import json
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+from compaktor.message.message_objects import Message
+from compaktor.multiprocessing.runtime import protocol
+from compaktor.multiprocessing.runtime.process_runtime import WorkerHandle
+from compaktor.multiprocessing.transport.shm_ring import ShmConsumer,\
+    ShmProducer, ShmRing
+from compaktor.serialization.frames import recv_frames, split_frames
+
+
+SIZES = [('64B', 64, 200000), ('4KB', 4096, 50000), ('1MB', 1 << 20, 500)]
+RING_SIZE = 1 << 23
+
+
+def _ignore(item):
+    pass
+
+
+def _decode(view):
+    return protocol.decode_command(split_frames(view)[0])
+
+
+def pipe_consumer(conn, count):
+    conn.send(True)
+    for _ in range(count):
+        protocol.decode_command(recv_frames(conn))
+    conn.send(time.perf_counter())
+
+
+def shm_consumer(name, size, doorbell, space, done, count):
+    ring = ShmRing(size, name)
+    consumer = ShmConsumer(ring, doorbell, space)
+    done.send(True)
+    received = 0
+    while received < count:
+        received += consumer.drain(_ignore, _decode)
+        if received < count:
+            wait([doorbell], 0.01)
+    done.send(time.perf_counter())
+    ring.close()
+
+
+def bench_pipe(context, payload, count):
+    conn, child = context.Pipe()
+    proc = context.Process(target=pipe_consumer, args=(child, count))
+    proc.start()
+    handle = WorkerHandle(0, proc, conn)
+    command = (protocol.TELL, 'bench', Message(payload))
+    conn.recv()
+    start = time.perf_counter()
+    for _ in range(count):
+        handle.send(command)
+    end = conn.recv()
+    proc.join()
+    return end - start
+
+
+def bench_shm(context, payload, count):
+    ring = ShmRing(RING_SIZE)
+    doorbell_r, doorbell_w = context.Pipe(duplex=False)
+    space_r, space_w = context.Pipe(duplex=False)
+    done_r, done_w = context.Pipe(duplex=False)
+    producer = ShmProducer(ring, doorbell_w, space_r)
+    proc = context.Process(target=shm_consumer, args=(
+        ring.name, ring.capacity, doorbell_r, space_w, done_w, count))
+    proc.start()
+    handle = WorkerHandle(0, proc, None, producer)
+    command = (protocol.TELL, 'bench', Message(payload))
+    done_r.recv()
+    start = time.perf_counter()
+    for _ in range(count):
+        if not handle.send(command):
+            while not handle.flush():
+                wait([space_r], 0.01)
+    end = done_r.recv()
+    proc.join()
+    producer.close()
+    ring.close()
+    return end - start
+
+
+def run(scale=1.0):
+    """
+    Run every payload size over both transports.
+
+    :param scale: Multiplier for the message counts
+    :type scale: float()
+    :return: One result per size and transport
+    :rtype: list()
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for label, size, count in SIZES:
+        count = max(1, int(count * scale))
+        payload = bytes(size)
+        for transport, bench in (('pipe', bench_pipe), ('shm', bench_shm)):
+            elapsed = bench(context, payload, count)
+            results.append({
+                'name': 'transport.{}.{}'.format(transport, label),
+                'transport': transport,
+                'payload': size,
+                'messages': count,
+                'seconds': elapsed,
+                'msgs_per_sec': count / elapsed,
+                'mb_per_sec': count * size / elapsed / (1 << 20)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier for the message counts')
+    parser.add_argument('--json', action='store_true',
+                        help='print JSON instead of a table')
+    args = parser.parse_args()
+    results = run(args.scale)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for res in results:
+        print("{:<24} {:>12.0f} msg/s {:>10.1f} MB/s".format(
+            res['name'], res['msgs_per_sec'], res['mb_per_sec']))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,17 @@ Created on Sep 22, 2017
 import asyncio
 import time
 import traceback
+import weakref
+from compaktor.actor.loop_bridge import get_bridge
 from compaktor.utils.name_utils import NameCreationUtils
 from compaktor.registry import actor_registry as registry
 from compaktor.state.actor_state import ActorState
+from compaktor.errors.actor_errors import AskTimeoutError,\
+    HandlerNotFoundError, MailboxFullError, PendingAskLimitError
 from compaktor.message.message_objects import QueryMessage
+from compaktor.structure.pending_replies import PendingReplyTable
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
 import pdb
 
 
@@ -19,7 +26,8 @@ class AbstractActor(object):
     The basis for all actors is the AbstractActor
     """
 
-    def __init__(self, name=None, loop=None, address=None):
+    def __init__(self, name=None, loop=None, address=None,
+                 max_pending_asks=None, ask_timeout=None):
         """
         Constructor
 
@@ -29,6 +37,10 @@ class AbstractActor(object):
         :type loop: asyncio.events.AbstractEventLoop()
         :param address: Address for the actor
         :type address: str()
+        :param max_pending_asks: Maximum in-flight asks or None for no limit
+        :type max_pending_asks: int()
+        :param ask_timeout: Default ask timeout in seconds or None
+        :type ask_timeout: float()
         """
         self.__STATE = ActorState.CREATED
         self.loop = loop
@@ -41,6 +53,9 @@ class AbstractActor(object):
         self.__STATE = ActorState.LIMBO
         self.__complete = asyncio.Future(loop=self.loop)
         self.__address = address
+        self.__pending_replies = PendingReplyTable(max_pending_asks)
+        self.__ask_timeout = ask_timeout
+        self.__registries = ()
 
     def get_name(self):
         """
@@ -59,6 +74,24 @@ class AbstractActor(object):
         """
         return self.__STATE
 
+    def get_pending_asks(self):
+        """
+        Get the number of asks awaiting a reply
+
+        :return: The number of in-flight asks
+        :rtype: int()
+        """
+        return len(self.__pending_replies)
+
+    def get_ask_stats(self):
+        """
+        Get the pending reply table counters
+
+        :return: In flight, expired and rejected counts
+        :rtype: dict()
+        """
+        return self.__pending_replies.get_stats()
+
     def pre_start(self):
         """
         A method to run before the actor is started.
@@ -68,12 +101,40 @@ class AbstractActor(object):
 
     def start(self):
         """
-        Start the actor
+        Start the actor.  The registries it is in hold it until it stops.
         """
         self.pre_start()
         self.__STATE = ActorState.RUNNING
+        for held_by in self.__get_registries():
+            held_by.hold(self)
         self.loop.create_task(self._run())
 
+    def _join_registry(self, held_by):
+        """
+        Record a registry the actor was added to.  Called by the registry.
+
+        :param held_by: The registry
+        :type held_by: Registry()
+        """
+        for ref in self.__registries:
+            if ref() is held_by:
+                return
+        self.__registries += (weakref.ref(held_by),)
+
+    def __get_registries(self):
+        """
+        Get the registries the actor was added to that still exist
+
+        :return: The registries
+        :rtype: list()
+        """
+        found = []
+        for ref in self.__registries:
+            held_by = ref()
+            if held_by is not None:
+                found.append(held_by)
+        return found
+
     def _start(self):
         """
         Do not touch
@@ -82,11 +143,23 @@ class AbstractActor(object):
 
     async def _run(self):
         """
-        Complete tasks while the state is running
+        Complete tasks while the state is running.  Completion is signalled
+        even when a task fails so stop never waits forever.
+        """
+        try:
+            while self.__STATE == ActorState.RUNNING:
+                await self._task()
+        finally:
+            try:
+                self._release_inbox()
+            finally:
+                if not self.__complete.done():
+                    self.__complete.set_result(True)
+
+    def _release_inbox(self):
+        """
+        Called once the actor stops reading its inbox.
         """
-        while self.__STATE == ActorState.RUNNING:
-            await self._task()
-        self.__complete.set_result(True)
 
     async def stop(self):
         """
@@ -121,10 +194,13 @@ class AbstractActor(object):
 
     def post_stop(self):
         """
-        Logs a stopped message
+        Logs a stopped message and reports the actor to the registries it
+        is in so its entries are cleaned up.
         """
         print("Actor Stopped {}".format(time.time()))
         self.__STATE = ActorState.TERMINATED
+        for held_by in self.__get_registries():
+            held_by.retire(self)
 
     def post_restart(self):
         """
@@ -141,7 +217,9 @@ class AbstractActor(object):
 
     async def tell(self, target, message):
         """
-        Submit a message to a target actor without blocking.
+        Submit a message to a target actor without blocking.  A target on
+        this loop with room in its mailbox is enqueued directly.  The tell
+        only waits when the mailbox is full and its policy blocks.
 
         :param target:  The target actor
         :type target:  AbtractActor
@@ -149,44 +227,183 @@ class AbstractActor(object):
         :type message:  Message()
         """
         try:
+            recipient = target
             if isinstance(target, str):
-                target = registry.get_registry().find_node(target)
-            if target:
-                if target.loop == self.loop:
-                    await target._receive(message)
-                else:
-                    #redirect since it is from a different loop
-                    print(type(message))
-                    print(target)
-                    print(message.sender)
-                    asyncio.run_coroutine_threadsafe(
-                        target._receive(message), loop=target.loop)
+                target = registry.get_registry().resolve(target)
+            if not target:
+                get_dead_letter_office().post(
+                    message, DeadLetterReason.NO_TARGET, recipient, self)
             else:
-                print("Target Does Not Exist")
+                loop = asyncio.get_event_loop()
+                if target.loop is not loop:
+                    #batched through the bridge since it is on another loop
+                    get_bridge(loop, target.loop).submit(target, message)
+                elif target._receive_nowait(message) is None:
+                    await target._receive(message)
+        except AttributeError as ex:
+            err = "Target Does not Have a _receive method. Is it an actor?"
+            raise TypeError(err) from ex
+
+    def tell_nowait(self, target, message):
+        """
+        Submit a message to a target actor without awaiting.  A target on
+        this loop is enqueued directly and one on another loop goes through
+        the loop bridge.  When the target mailbox is full and its policy
+        blocks nothing is sent and None is returned, so the caller can fall
+        back to awaiting tell.
+
+        :param target:  The target actor
+        :type target:  AbtractActor
+        :param message: The appropriate message to send
+        :type message:  Message()
+        :return: True when enqueued or handed to the bridge, False when
+            refused by the overflow policy or there is no target and None
+            when the sender must wait
+        :rtype: bool()
+        """
+        try:
+            recipient = target
+            if isinstance(target, str):
+                target = registry.get_registry().resolve(target)
+            if not target:
+                get_dead_letter_office().post(
+                    message, DeadLetterReason.NO_TARGET, recipient, self)
+                return False
+            loop = asyncio.get_event_loop()
+            if target.loop is loop:
+                return target._receive_nowait(message)
+            get_bridge(loop, target.loop).submit(target, message)
+            return True
         except AttributeError as ex:
             err = "Target Does not Have a _receive method. Is it an actor?"
             raise TypeError(err) from ex
 
-    async def ask(self, target, message):
+    async def tell_many(self, target, messages):
+        """
+        Submit several messages to one target actor, resolving the target
+        once.  On this loop the batch is enqueued with a single wakeup,
+        waiting only on a message the mailbox has no room for.  A target on
+        another loop gets the batch through the loop bridge in one hop and
+        the tell waits until the target loop has settled every message.
+        Every message goes through the target's overflow policy.
+
+        :param target:  The target actor or its address
+        :type target:  AbtractActor
+        :param messages: The messages to send in order
+        :type messages:  list()
+        :return: The number of messages enqueued
+        :rtype: int()
         """
-        Submit a message to a target actor and wait for a response
+        messages = list(messages)
+        try:
+            recipient = target
+            if isinstance(target, str):
+                target = registry.get_registry().resolve(target)
+            if not target:
+                office = get_dead_letter_office()
+                for message in messages:
+                    office.post(
+                        message, DeadLetterReason.NO_TARGET, recipient, self)
+                return 0
+            loop = asyncio.get_event_loop()
+            if target.loop is not loop:
+                future = loop.create_future()
+                get_bridge(loop, target.loop).submit_many(
+                    target, messages, future)
+                return await future
+            accepted = 0
+            while messages:
+                taken, enqueued = target._receive_many_nowait(messages)
+                accepted += enqueued
+                if taken == len(messages):
+                    break
+                if await target._receive(messages[taken]) is not False:
+                    accepted += 1
+                messages = messages[taken + 1:]
+            return accepted
+        except AttributeError as ex:
+            err = "Target Does not Have a _receive method. Is it an actor?"
+            raise TypeError(err) from ex
+
+    def _receive_many_nowait(self, messages):
+        """
+        Enqueue messages in order without waiting.  The default offers them
+        one at a time through _receive_nowait.
+
+        :param messages: The messages to enqueue
+        :type messages: list()
+        :return: How many messages were taken from the front of messages and
+            how many of those were enqueued
+        :rtype: tuple()
+        """
+        taken = 0
+        accepted = 0
+        for message in messages:
+            enqueued = self._receive_nowait(message)
+            if enqueued is None:
+                break
+            if enqueued:
+                accepted += 1
+            taken += 1
+        return taken, accepted
+
+    def _receive_nowait(self, message):
+        """
+        Enqueue a message without waiting.  The default cannot, so callers
+        fall back to _receive.
+
+        :param message: The message to enqueue
+        :type message: Message()
+        :return: True when enqueued, False when refused by the overflow
+            policy and None when the sender must wait
+        :rtype: bool()
+        """
+        return None
+
+    async def ask(self, target, message, timeout=None):
+        """
+        Submit a message to a target actor and wait for a response.  The
+        reply future belongs to the loop running the ask, so a target on
+        another loop completes it thread-safely and the caller never blocks.
+
+        The ask is tracked in the actor's pending reply table.  An
+        AskTimeoutError is raised when no reply arrives in time and a
+        PendingAskLimitError when too many asks are already in flight.  A
+        query the target cannot take raises MailboxFullError and one it has
+        no handler for HandlerNotFoundError.
 
         :param target:  The target actor
         :type target:  AbstractActor
         :param message:  The appropriate message to send
         :type message:  QueryMessage
+        :param timeout: Seconds to wait, defaulting to the actor's ask timeout
+        :type timeout: float()
         """
         try:
             assert isinstance(message, QueryMessage)
-            if not message.result:
-                message.result = asyncio.Future(loop=target.loop)
-            await self.tell(target, message)
-            res = None
-            if target.loop == self.loop:
-                res = await message.result
-            else:
-                res = target.loop.run_until_complete(message.result)
-            return res
+            loop = asyncio.get_event_loop()
+            if not getattr(message, 'result', None):
+                message.result = loop.create_future()
+            if timeout is None:
+                timeout = self.__ask_timeout
+            key = self.__pending_replies.add(message.result, timeout)
+            try:
+                if timeout is None:
+                    await self.tell(target, message)
+                    return await message.result
+                deadline = loop.time() + timeout
+                await self.tell(target, message)
+                return await asyncio.wait_for(
+                    message.result, max(0, deadline - loop.time()))
+            finally:
+                self.__pending_replies.discard(key)
+        except asyncio.TimeoutError:
+            self.__pending_replies.record_expired()
+            raise AskTimeoutError(
+                "No reply from {} within {}s".format(target, timeout)) from None
+        except (AskTimeoutError, PendingAskLimitError, MailboxFullError,
+                HandlerNotFoundError):
+            raise
         except Exception:
             self.handle_fail()
 
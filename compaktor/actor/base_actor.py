@@ -8,21 +8,35 @@ Created on Aug 18, 2017
 
 import asyncio
 import logging
+import time
 from compaktor.actor.abstract_actor import AbstractActor
-from compaktor.errors.actor_errors import HandlerNotFoundError
-from compaktor.message.message_objects import QueryMessage, PoisonPill
+from compaktor.errors.actor_errors import ChildNodeExistsException,\
+    HandlerNotFoundError, MailboxFullError
+from compaktor.message.message_objects import MessageTag, PoisonPill
+from compaktor.metrics.actor_metrics import ActorMetrics,\
+    get_metrics_registry
 from compaktor.registry import actor_registry as registry
+from compaktor.state.actor_state import ActorState
+from compaktor.structure.mailbox import Mailbox, OverflowPolicy, QueueMailbox
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
+from compaktor.system.scheduling import get_loop_accounting
+from compaktor.utils.loop_utils import resolve_future
 from compaktor.utils.name_utils import NameCreationUtils 
 from abc import abstractmethod
 
 
+_MISSING = object()
+
 class BaseActor(AbstractActor):
     """
     The base actor implementing the AbstractActor class.
     """
 
     def __init__(self,  name=None, loop=None, address=None, mailbox_size=10000,
-                 inbox=None):
+                 inbox=None, batch_size=64, overflow_policy=OverflowPolicy.BLOCK,
+                 put_timeout=None, max_pending_asks=None, ask_timeout=None,
+                 time_budget=None):
         """
         Constructor
 
@@ -36,20 +50,47 @@ class BaseActor(AbstractActor):
         :type mailbox_size: int()
         :param inbox: The inbox queue
         :type inbox: asyncio.Queue()
+        :param batch_size: Maximum number of queued messages drained per pass
+        :type batch_size: int()
+        :param overflow_policy: What to do with messages sent to a full inbox
+        :type overflow_policy: OverflowPolicy()
+        :param put_timeout: Seconds to wait for room under BLOCK_TIMEOUT
+        :type put_timeout: float()
+        :param max_pending_asks: Maximum in-flight asks or None for no limit
+        :type max_pending_asks: int()
+        :param ask_timeout: Default ask timeout in seconds or None
+        :type ask_timeout: float()
+        :param time_budget: Seconds a pass may run before yielding or None
+        :type time_budget: float()
         """
         if name is None:
             name = str(NameCreationUtils.get_name_base())
         if address is None:
             address = [registry.get_registry().get_host()]
             address.append(name)
-        super().__init__(name, loop, address)
+        super().__init__(name, loop, address, max_pending_asks, ask_timeout)
         self.__max_inbox_size = mailbox_size
-        self.__inbox = inbox
-        if self.__inbox is None:
-            self.__inbox = asyncio.Queue(
-                maxsize=self.__max_inbox_size, loop=self.loop)
+        if inbox is None:
+            self.__inbox = Mailbox(
+                self.__max_inbox_size, self.loop, overflow_policy, put_timeout,
+                self._dead_letter)
+            self.__get_nowait = self.__inbox.get_nowait
+        else:
+            self.__inbox = QueueMailbox(
+                inbox, self.loop, overflow_policy, put_timeout,
+                self._dead_letter)
+            self.__get_nowait = None
+            if hasattr(inbox, 'get_nowait'):
+                self.__get_nowait = self.__inbox.get_nowait
+        self.__batch_size = max(1, batch_size)
+        self.__time_budget = time_budget
         self._handlers = {}
+        self.__dispatch_table = {}
         self.register_handler(PoisonPill, self._stop_message_handler)
+        self.__metrics = None
+        self.__dispatch = self._dispatch
+        if get_metrics_registry().is_enabled():
+            self.enable_metrics()
         self.address = address
         if self.address:
             if isinstance(self.address, str):
@@ -59,7 +100,12 @@ class BaseActor(AbstractActor):
                 self.address = t_addr
             else:
                 self.address = list(self.address)
-            registry.get_registry().add_actor(self.address[:-1], self, True)
+            try:
+                registry.get_registry().add_actor(
+                    self.address[:-1], self, True)
+            except ChildNodeExistsException as ex:
+                logging.warning("{} is not registered: {}".format(
+                    self.name, ex))
 
     def set_address(self, address):
         """
@@ -91,7 +137,9 @@ class BaseActor(AbstractActor):
     def register_handler(self, message_cls, func):
         """
         Registers a function for to be run when a type of message is used.
-        Both a Message and QueryMessage may be supplied
+        Both a Message and QueryMessage may be supplied.  The handler also
+        receives subclasses of the message class unless a more specific
+        handler is registered.
 
         :param message:  Thee message class
         :type: <class Message>
@@ -99,42 +147,275 @@ class BaseActor(AbstractActor):
         :type func: def
         """
         self._handlers[message_cls] = func
-    
-    @abstractmethod    
+        self.__dispatch_table = dict(self._handlers)
+
+    def _resolve_handler(self, message_cls):
+        """
+        Find the handler for a message class by walking its MRO.  The result
+        is cached in the dispatch table so each message type is resolved
+        once.
+
+        :param message_cls: The class of the incoming message
+        :type message_cls: <class Message>
+        :return: The handler or a missing marker
+        :rtype: def
+        """
+        for cls in message_cls.__mro__:
+            handler = self._handlers.get(cls, _MISSING)
+            if handler is not _MISSING:
+                self.__dispatch_table[message_cls] = handler
+                return handler
+        return _MISSING
+
+    def _dead_letter(self, message, reason):
+        """
+        Send a message this actor could not take to the dead letter office.
+        An ask fails at once instead of waiting for its timeout.
+
+        :param message: The message
+        :type message: Message()
+        :param reason: Why it was not delivered
+        :type reason: str()
+        """
+        get_dead_letter_office().post(message, reason, self)
+        is_query = getattr(message, 'type_tag', 0) & MessageTag.QUERY
+        result = getattr(message, 'result', None) if is_query else None
+        if result is not None:
+            if reason == DeadLetterReason.NO_HANDLER:
+                error = HandlerNotFoundError(
+                    "Handler Does Not Exist for {}".format(type(message)))
+            else:
+                error = MailboxFullError(
+                    "Mailbox of {} is full".format(self.name))
+            resolve_future(result, exception=error, loop=self.loop)
+
+    def get_mailbox_stats(self):
+        """
+        Get the inbox depth and overflow counters
+
+        :return: The mailbox statistics
+        :rtype: dict()
+        """
+        return self.__inbox.get_stats()
+
+    def enable_metrics(self, enabled=True):
+        """
+        Start or stop recording queue wait, handler time and message, ask
+        and failure counts per message type.  Existing counts are kept
+        when recording stops and resume when it starts again.
+
+        :param enabled: Whether to record
+        :type enabled: bool()
+        """
+        if enabled:
+            if self.__metrics is None:
+                self.__metrics = ActorMetrics(self.name)
+            get_metrics_registry().add(self.__metrics)
+            self.__dispatch = self.__timed_dispatch
+        else:
+            self.__dispatch = self._dispatch
+        self.__inbox.set_timing(enabled)
+
+    def get_metrics(self):
+        """
+        Get a snapshot of the recorded metrics
+
+        :return: The snapshot or None if metrics were never enabled
+        :rtype: dict()
+        """
+        if self.__metrics is None:
+            return None
+        return self.__metrics.snapshot()
+
+    def get_batch_size(self):
+        """
+        Get the maximum number of messages drained from the inbox per pass
+
+        :return: The batch size
+        :rtype: int()
+        """
+        return self.__batch_size
+
+    def set_batch_size(self, batch_size):
+        """
+        Set the maximum number of messages drained from the inbox per pass
+
+        :param batch_size: The batch size.  Values below 1 are treated as 1.
+        :type batch_size: int()
+        """
+        self.__batch_size = max(1, batch_size)
+
+    def get_time_budget(self):
+        """
+        Get the seconds a pass over the inbox may run before yielding
+
+        :return: The time budget or None for no limit
+        :rtype: float()
+        """
+        return self.__time_budget
+
+    def set_time_budget(self, time_budget):
+        """
+        Set the seconds a pass over the inbox may run before yielding.  The
+        budget is checked between messages so a single handler is never
+        interrupted.
+
+        :param time_budget: The time budget or None for no limit
+        :type time_budget: float()
+        """
+        self.__time_budget = time_budget
+
+    @abstractmethod
     async def _task(self):
         """
         The running task.  It is not recommended to override this function.
+
+        Waits for a message and then drains whatever is already queued,
+        dispatching everything in one pass.  The pass ends and the actor
+        yields to the loop once it has handled the batch size in messages or
+        run for the time budget, so other actors are not starved.  Passes
+        are recorded when accounting is enabled for the loop.
         """
+        dispatch = self.__dispatch
         message = await self.__inbox.get()
-        is_query = isinstance(message, QueryMessage)
-        try:
-            handler_type = type(message)
-            if handler_type not in self._handlers.keys():
-                err_msg = "Handler Does Not Exist for {}".format(handler_type)
-                raise HandlerNotFoundError(err_msg)
-            handler = self._handlers[type(message)]
+        accounting = get_loop_accounting(self.loop)
+        if accounting is not None or self.__time_budget is not None:
+            await self.__budgeted_pass(message, dispatch, accounting)
+            return
+        await dispatch(message)
+        get_nowait = self.__get_nowait
+        if get_nowait is None:
+            return
+        remaining = self.__batch_size - 1
+        while remaining > 0:
+            if getattr(message, 'type_tag', 0) == MessageTag.POISON_PILL:
+                return
+            if self.get_state() is not ActorState.RUNNING:
+                return
             try:
-                if handler:
-                    response = await handler(message)
-                else:
-                    logging.warning("Handler is NoneType")
-                    logging.warning("Message is {}".format(str(message)))
-                    logging.warning("Message Type {}".format(str(type(message))))
-                    logging.warning("Sender {}".format(str(message.sender)))
-                    self.handle_fail()
-            except Exception as ex:
-                if is_query:
-                    message.result.set_exception(ex)
-                else:
-                    logging.warning('Unhandled exception from handler of '
-                                    '{0}'.format(type(message)))
-                    self.handle_fail()
+                message = get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await dispatch(message)
+            remaining -= 1
+        await asyncio.sleep(0)
+
+    async def __budgeted_pass(self, message, dispatch, accounting):
+        """
+        A pass over the inbox that also ends on the time budget and records
+        itself with the loop accounting.
+
+        :param message: The first message of the pass
+        :type message: Message()
+        :param dispatch: The dispatch function
+        :type dispatch: def
+        :param accounting: The loop accounting or None
+        :type accounting: LoopAccounting()
+        """
+        start = time.perf_counter()
+        deadline = None
+        if self.__time_budget is not None:
+            deadline = start + self.__time_budget
+        await dispatch(message)
+        handled = 1
+        preempted = False
+        get_nowait = self.__get_nowait
+        remaining = self.__batch_size - 1
+        while get_nowait is not None:
+            if getattr(message, 'type_tag', 0) == MessageTag.POISON_PILL:
+                break
+            if self.get_state() is not ActorState.RUNNING:
+                break
+            if remaining <= 0 or (deadline is not None and
+                                  time.perf_counter() >= deadline):
+                preempted = True
+                break
+            try:
+                message = get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            await dispatch(message)
+            handled += 1
+            remaining -= 1
+        if accounting is not None:
+            accounting.record_slice(
+                self.name, time.perf_counter() - start, handled, preempted)
+        if preempted:
+            await asyncio.sleep(0)
+
+    async def _dispatch(self, message):
+        """
+        Run the registered handler for a single message.
+
+        :param message: The message taken from the inbox
+        :type message: Message()
+        :return: False when the handler failed
+        :rtype: bool()
+        """
+        handler = self.__dispatch_table.get(type(message), _MISSING)
+        if handler is _MISSING:
+            handler = self._resolve_handler(type(message))
+            if handler is _MISSING:
+                self._dead_letter(message, DeadLetterReason.NO_HANDLER)
+                return False
+        is_query = getattr(message, 'type_tag', 0) & MessageTag.QUERY
+        result = getattr(message, 'result', None) if is_query else None
+        if result is not None and result.done():
+            return True
+        try:
+            if handler:
+                response = await handler(message)
             else:
-                if is_query and message.result:
-                    message.result.set_result(response)
-        except KeyError as ex:
-            self.handle_fail()
-            raise HandlerNotFoundError(type(message)) from ex
+                logging.warning("Handler is NoneType")
+                logging.warning("Message is {}".format(str(message)))
+                logging.warning("Message Type {}".format(str(type(message))))
+                logging.warning("Sender {}".format(str(message.sender)))
+                self.handle_fail()
+                return False
+        except Exception as ex:
+            if is_query:
+                resolve_future(result, exception=ex, loop=self.loop)
+            else:
+                logging.warning('Unhandled exception from handler of '
+                                '{0}'.format(type(message)))
+                self.handle_fail()
+            return False
+        else:
+            if result:
+                resolve_future(result, response, loop=self.loop)
+        return True
+
+    async def __timed_dispatch(self, message):
+        """
+        Dispatch a message and record its queue wait and handler time.
+
+        :param message: The message taken from the inbox
+        :type message: Message()
+        :return: False when the handler failed
+        :rtype: bool()
+        """
+        start = time.perf_counter()
+        tag = getattr(message, 'type_tag', 0)
+        queue_wait = None
+        if not tag & MessageTag.CONTROL:
+            enqueued = self.__inbox.get_enqueue_time()
+            if enqueued is not None:
+                queue_wait = start - enqueued
+        succeeded = False
+        try:
+            succeeded = await self._dispatch(message)
+        finally:
+            self.__metrics.record(
+                type(message), queue_wait, time.perf_counter() - start,
+                not succeeded, bool(tag & MessageTag.QUERY))
+        return succeeded
+
+    def _release_inbox(self):
+        """
+        Release the inbox so a pending get on a shared queue does not take
+        messages meant for other readers.
+        """
+        self.__inbox.close()
 
     async def _stop(self):
         """
@@ -149,8 +430,35 @@ class BaseActor(AbstractActor):
 
         :param message:  The message to enqueue
         :type message:  Message()
+        :return: Whether the message was enqueued
+        :rtype: bool()
+        """
+        return await self.__inbox.put(message)
+
+    def _receive_nowait(self, message):
+        """
+        Enqueue without waiting, applying overflow policies that do not
+        block.
+
+        :param message: The message to enqueue
+        :type message: Message()
+        :return: True when enqueued, False when refused by the overflow
+            policy and None when the sender must wait
+        :rtype: bool()
+        """
+        return self.__inbox.offer(message)
+
+    def _receive_many_nowait(self, messages):
+        """
+        Enqueue messages in order without waiting, waking the actor once.
+
+        :param messages: The messages to enqueue
+        :type messages: list()
+        :return: How many messages were taken from the front of messages and
+            how many of those were enqueued
+        :rtype: tuple()
         """
-        await self.__inbox.put(message)
+        return self.__inbox.offer_many(messages)
 
     async def _stop_message_handler(self, message):
         '''
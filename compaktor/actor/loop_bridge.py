@@ -0,0 +1,290 @@
+'''
+Batched delivery of messages between actors running on different loops.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from compaktor.errors.actor_errors import MailboxFullError
+from compaktor.state.actor_state import ActorState
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
+
+
+class _Receipt(object):
+    """
+    Counts the messages of one batch the target enqueued and resolves a
+    future on the sending loop once every message is settled.
+    """
+    __slots__ = ('future', 'remaining', 'accepted')
+
+    def __init__(self, future, remaining):
+        self.future = future
+        self.remaining = remaining
+        self.accepted = 0
+
+    def settle(self, enqueued):
+        """
+        Record the outcome of one message.  Runs on the target loop.
+
+        :param enqueued: Whether the target enqueued the message
+        :type enqueued: bool()
+        """
+        if enqueued:
+            self.accepted += 1
+        self.remaining -= 1
+        if not self.remaining:
+            try:
+                self.future.get_loop().call_soon_threadsafe(
+                    self.__resolve, self.accepted)
+            except RuntimeError:
+                pass
+
+    def __resolve(self, accepted):
+        if not self.future.done():
+            self.future.set_result(accepted)
+
+
+class LoopBridge(object):
+    """
+    Carries messages from one event loop to actors on another.  Senders
+    append to a locked buffer and only the first message of a batch
+    schedules a flush on the target loop, so a burst costs a single
+    call_soon_threadsafe wakeup.  The flush enqueues each message with a
+    non-blocking put.
+
+    Messages a target cannot take without waiting are kept in a backlog for
+    that target and delivered in order by a task on the target loop.  Later
+    messages to the same target queue behind them while other targets are
+    not held up.  A backlog whose target stops running is dead lettered.
+    """
+
+    # seconds between checks that a target blocking a backlog still runs
+    DRAIN_CHECK = 1.0
+
+    def __init__(self, target_loop):
+        """
+        Constructor
+
+        :param target_loop: The loop the messages are delivered on
+        :type target_loop: AbstractEventLoop()
+        """
+        self.__loop = target_loop
+        self.__lock = threading.Lock()
+        self.__buffer = []
+        self.__scheduled = False
+        self.__backlogs = {}
+        self.__batches = 0
+        self.__messages = 0
+        self.__deferred = 0
+        self.__dead = 0
+
+    def get_loop(self):
+        return self.__loop
+
+    def get_stats(self):
+        """
+        Get the bridge counters
+
+        :return: Flushed batches, delivered messages, deferred messages,
+            dead lettered messages and messages still in a backlog
+        :rtype: dict()
+        """
+        return {
+            'batches': self.__batches,
+            'messages': self.__messages,
+            'deferred': self.__deferred,
+            'dead_lettered': self.__dead,
+            'backlog': sum(len(backlog)
+                           for backlog in list(self.__backlogs.values()))}
+
+    def submit(self, target, message):
+        """
+        Buffer a message for the target actor.  Safe to call from any thread.
+
+        :param target: The receiving actor
+        :type target: AbstractActor()
+        :param message: The message to deliver
+        :type message: Message()
+        """
+        with self.__lock:
+            self.__buffer.append((target, message, None))
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        self.__loop.call_soon_threadsafe(self.__flush)
+
+    def submit_many(self, target, messages, future=None):
+        """
+        Buffer several messages for the target actor under one lock and at
+        most one wakeup.  Safe to call from any thread.
+
+        :param target: The receiving actor
+        :type target: AbstractActor()
+        :param messages: The messages to deliver in order
+        :type messages: list()
+        :param future: Receives the number of messages the target enqueued
+            once each was enqueued, refused or dead lettered
+        :type future: Future()
+        """
+        if not messages:
+            if future is not None:
+                future.set_result(0)
+            return
+        receipt = None
+        if future is not None:
+            receipt = _Receipt(future, len(messages))
+        with self.__lock:
+            self.__buffer.extend(
+                (target, message, receipt) for message in messages)
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        self.__loop.call_soon_threadsafe(self.__flush)
+
+    def __flush(self):
+        """
+        Deliver the buffered batch on the target loop.
+        """
+        with self.__lock:
+            batch = self.__buffer
+            self.__buffer = []
+            self.__scheduled = False
+        self.__batches += 1
+        self.__messages += len(batch)
+        backlogs = self.__backlogs
+        for target, message, receipt in batch:
+            backlog = backlogs.get(target)
+            if backlog is not None:
+                backlog.append((message, receipt))
+                self.__deferred += 1
+                continue
+            try:
+                accepted = target._receive_nowait(message)
+            except MailboxFullError:
+                self.__refuse(target, message)
+                accepted = False
+            except Exception:
+                logging.exception("Cross loop tell to {} failed".format(
+                    target))
+                accepted = False
+            if accepted is None:
+                backlogs[target] = deque(((message, receipt),))
+                self.__deferred += 1
+                self.__loop.create_task(self.__drain(target))
+            elif receipt is not None:
+                receipt.settle(accepted)
+
+    async def __drain(self, target):
+        """
+        Deliver the deferred messages for one target in order, waiting for
+        room.
+
+        :param target: The receiving actor
+        :type target: AbstractActor()
+        """
+        backlog = self.__backlogs[target]
+        try:
+            while backlog:
+                if target.get_state() is not ActorState.RUNNING:
+                    self.__dead_letter(target, backlog)
+                    return
+                message, receipt = backlog[0]
+                try:
+                    accepted = await asyncio.wait_for(
+                        target._receive(message), self.DRAIN_CHECK)
+                except asyncio.TimeoutError:
+                    continue
+                except MailboxFullError:
+                    self.__refuse(target, message)
+                    accepted = False
+                except Exception:
+                    logging.exception("Cross loop tell to {} failed".format(
+                        target))
+                    accepted = False
+                backlog.popleft()
+                if receipt is not None:
+                    receipt.settle(accepted is not False)
+        finally:
+            del self.__backlogs[target]
+
+    def __dead_letter(self, target, backlog):
+        """
+        Dead letter a backlog its stopped target will never take.
+
+        :param target: The stopped actor
+        :type target: AbstractActor()
+        :param backlog: The undelivered messages
+        :type backlog: deque()
+        """
+        while backlog:
+            message, receipt = backlog.popleft()
+            self.__refuse(target, message)
+            if receipt is not None:
+                receipt.settle(False)
+
+    def __refuse(self, target, message):
+        """
+        Dead letter a message the target refused.  A query fails with
+        MailboxFullError so the cross loop ask does not wait for a reply.
+
+        :param target: The receiving actor
+        :type target: AbstractActor()
+        :param message: The refused message
+        :type message: Message()
+        """
+        self.__dead += 1
+        dead_letter = getattr(target, '_dead_letter', None)
+        if dead_letter is not None:
+            dead_letter(message, DeadLetterReason.MAILBOX_FULL)
+        else:
+            get_dead_letter_office().post(
+                message, DeadLetterReason.MAILBOX_FULL, target)
+
+
+_bridges = {}
+_bridges_lock = threading.Lock()
+
+
+def get_bridge(source_loop, target_loop):
+    """
+    Get the bridge carrying messages from one loop to another, creating it
+    on first use.  Creating a bridge drops those of closed loops.
+
+    :param source_loop: The sending loop
+    :type source_loop: AbstractEventLoop()
+    :param target_loop: The receiving loop
+    :type target_loop: AbstractEventLoop()
+    :return: The bridge for the loop pair
+    :rtype: LoopBridge()
+    """
+    key = (source_loop, target_loop)
+    bridge = _bridges.get(key)
+    if bridge is None:
+        with _bridges_lock:
+            bridge = _bridges.get(key)
+            if bridge is None:
+                for pair in list(_bridges.keys()):
+                    if pair[0].is_closed() or pair[1].is_closed():
+                        del _bridges[pair]
+                bridge = LoopBridge(target_loop)
+                _bridges[key] = bridge
+    return bridge
+
+
+def close_bridges(loop):
+    """
+    Forget every bridge to or from a loop that is being closed.
+
+    :param loop: The closing loop
+    :type loop: AbstractEventLoop()
+    """
+    with _bridges_lock:
+        for key in list(_bridges.keys()):
+            if loop in key:
+                del _bridges[key]
@@ -31,3 +31,19 @@ class MissingActorException(Exception):
 
 class WrongActorException(Exception):
     pass
+
+
+class MailboxFullError(Exception):
+    pass
+
+
+class AskTimeoutError(Exception):
+    pass
+
+
+class PendingAskLimitError(Exception):
+    pass
+
+
+class RemoteActorError(Exception):
+    pass
@@ -1,16 +1,61 @@
 '''
 A set of standard messages
 
+Messages are compact envelopes built on __slots__.  Every message class
+carries a small integer type_tag so the dispatcher can switch on the tag
+instead of running isinstance checks.  User subclasses that do not declare
+__slots__ still receive a __dict__ and inherit the tag of their parent.
+
 Created on Aug 19, 2017
 
 @author: aevans
 '''
 
 
+class MessageTag(object):
+    """
+    Integer tags for the built-in messages.  Query messages carry the QUERY
+    bit and control messages the CONTROL bit so either can be detected with
+    a single mask.  Control messages overtake user traffic in mailboxes.
+    """
+    QUERY = 0x80
+    CONTROL = 0x40
+
+    MESSAGE = 1
+    TASK = 2
+    PUSH = 3
+    PULL_TICK = 4
+    TICK = CONTROL | 5
+    REGISTER_TIME = 6
+    BROADCAST = 7
+    POISON_PILL = CONTROL | 8
+    ROUTE_TELL = 9
+    ROUTE_ASK = 10
+    ROUTE_BROADCAST = 11
+    PULL = 12
+    PUBLISH = 13
+    DEMAND = 14
+    SUBSCRIBE = 15
+    DE_SUBSCRIBE = CONTROL | 16
+    FLOW_RESULT = 17
+    SET_ACCOUNTANT = 18
+    SPLIT_SUBSCRIBE = 19
+    SPLIT_PUBLISH = 20
+    SPLIT_PULL = 21
+    SPLIT_DE_SUBSCRIBE = CONTROL | 22
+    DEAD_LETTER = 23
+
+    QUERY_MESSAGE = QUERY | 1
+    PULL_QUERY = QUERY | 2
+
+
 class Message(object):
     """
     Base Message to be extended
     """
+    __slots__ = ('payload', 'sender')
+    type_tag = MessageTag.MESSAGE
+
     def __init__(self, payload=None, sender=None):
         """
         Constructor
@@ -34,6 +79,8 @@ class Message(object):
 
 
 class TaskMessage(Message):
+    __slots__ = ('caller',)
+    type_tag = MessageTag.TASK
 
     def __init__(self, payload, sender, caller):
         super().__init__(payload, sender)
@@ -41,104 +88,152 @@ class TaskMessage(Message):
 
 
 class Push(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.PUSH
 
 
 class PullTick(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.PULL_TICK
 
 
 class QueryMessage(Message):
     """
-    A query message with a global result var
+    A query message with a result future set by the asking actor.  A
+    subclass that skips this constructor has no result until it is asked,
+    so readers use getattr with a None default.
     """
-    result = None
+    __slots__ = ('result',)
+    type_tag = MessageTag.QUERY_MESSAGE
+
+    def __init__(self, payload=None, sender=None):
+        """
+        Constructor
+
+        :param payload:  Message to send
+        :type message: object
+        :param sender:  The sender
+        :type sender:  BaseActor
+        """
+        super().__init__(payload, sender)
+        self.result = None
 
 
 class Tick(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.TICK
 
 
 class RegisterTime(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.REGISTER_TIME
 
 
 class Broadcast(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.BROADCAST
 
 
 class PoisonPill(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.POISON_PILL
 
 
 class RouteTell(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.ROUTE_TELL
 
 
 class RouteAsk(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.ROUTE_ASK
 
 
 class RouteBroadcast(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.ROUTE_BROADCAST
 
 
 class Pull(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.PULL
+
 
 class PullQuery(QueryMessage):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.PULL_QUERY
+
 
 class Publish(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.PUBLISH
 
 
 class Demand(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.DEMAND
 
 
 class Subscribe(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.SUBSCRIBE
 
 
 class DeSubscribe(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.DE_SUBSCRIBE
 
 
 class FlowResult(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.FLOW_RESULT
 
 
 class SetAccountant(Message):
-    pass
+    __slots__ = ()
+    type_tag = MessageTag.SET_ACCOUNTANT
 
-class SplitSubscribe(Message):
 
-    def __init__(self, split_name, payload, sender=None):
+class DeadLetter(Message):
+    """
+    A message that could not be delivered.  The payload is the original
+    message and the sender its sender.
+    """
+    __slots__ = ('reason', 'recipient', 'timestamp')
+    type_tag = MessageTag.DEAD_LETTER
+
+    def __init__(self, payload, reason, recipient=None, sender=None,
+                 timestamp=None):
         """
         Constructor
 
-        :param split_name: The name of the pubsub split
-        :type split_name: str()
-        :param payload: The message to send containing the actor
-        :type payload: AbstractActor()
-        :param sender: The sender
+        :param payload: The undelivered message
+        :type payload: Message()
+        :param reason: Why it was not delivered
+        :type reason: str()
+        :param recipient: The intended recipient or its address
+        :type recipient: object
+        :param sender: The sender of the undelivered message
         :type sender: AbstractActor()
+        :param timestamp: When delivery failed
+        :type timestamp: float()
         """
         super().__init__(payload, sender)
-        self.split_name = split_name
+        self.reason = reason
+        self.recipient = recipient
+        self.timestamp = timestamp
 
     def __repr__(self):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
+        return "DeadLetter({}, {}, {})".format(self.reason, self.recipient,
+                                              self.payload)
 
-    def __str__(self, *args, **kwargs):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
 
+class SplitMessage(Message):
+    """
+    Base for messages addressed to a named split of a SplitPubSub
+    """
+    __slots__ = ('split_name',)
 
-class SplitPublish(Message):
-    
     def __init__(self, split_name, payload, sender=None):
         """
         Constructor
@@ -162,50 +257,21 @@ class SplitPublish(Message):
                                             self.split_name)
 
 
-class SplitPull(Message):
-    
-    def __init__(self, split_name, payload, sender=None):
-        """
-        Constructor
-
-        :param split_name: The name of the pubsub split
-        :type split_name: str()
-        :param payload: The message to send containing the actor
-        :type payload: AbstractActor()
-        :param sender: The sender
-        :type sender: AbstractActor()
-        """
-        super().__init__(payload, sender)
-        self.split_name = split_name
+class SplitSubscribe(SplitMessage):
+    __slots__ = ()
+    type_tag = MessageTag.SPLIT_SUBSCRIBE
 
-    def __repr__(self):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
-
-    def __str__(self, *args, **kwargs):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
 
-class SplitDeSubscribe(Message):
+class SplitPublish(SplitMessage):
+    __slots__ = ()
+    type_tag = MessageTag.SPLIT_PUBLISH
 
-    def __init__(self, split_name, payload, sender=None):
-        """
-        Constructor
 
-        :param split_name: The name of the pubsub split
-        :type split_name: str()
-        :param payload: The message to send containing the actor
-        :type payload: AbstractActor()
-        :param sender: The sender
-        :type sender: AbstractActor()
-        """
-        super().__init__(payload, sender)
-        self.split_name = split_name
+class SplitPull(SplitMessage):
+    __slots__ = ()
+    type_tag = MessageTag.SPLIT_PULL
 
-    def __repr__(self):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
 
-    def __str__(self, *args, **kwargs):
-        return "Message({}, {}, {})".format(self.payload, self.sender,
-                                            self.split_name)
\ No newline at end of file
+class SplitDeSubscribe(SplitMessage):
+    __slots__ = ()
+    type_tag = MessageTag.SPLIT_DE_SUBSCRIBE
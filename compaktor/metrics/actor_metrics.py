@@ -0,0 +1,216 @@
+'''
+Per actor message instrumentation.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import time
+import weakref
+from threading import Lock
+from compaktor.metrics.histogram import Histogram
+
+
+__METRICS_REGISTRY = None
+__metrics_lock = Lock()
+
+
+class MessageMetrics(object):
+    """
+    Counters and timings for one message type handled by one actor
+    """
+
+    __slots__ = ('messages', 'failures', 'asks', 'queue_wait', 'handler_time')
+
+    def __init__(self):
+        self.messages = 0
+        self.failures = 0
+        self.asks = 0
+        self.queue_wait = Histogram()
+        self.handler_time = Histogram()
+
+    def snapshot(self, elapsed):
+        """
+        Summarize the counters and timings
+
+        :param elapsed: Seconds the counters cover
+        :type elapsed: float()
+        :return: The summary
+        :rtype: dict()
+        """
+        rate = 0.0
+        if elapsed > 0:
+            rate = self.messages / elapsed
+        return {
+            'messages': self.messages,
+            'failures': self.failures,
+            'asks': self.asks,
+            'messages_per_sec': rate,
+            'queue_wait': self.queue_wait.snapshot(),
+            'handler_time': self.handler_time.snapshot()}
+
+
+class ActorMetrics(object):
+    """
+    The instrumentation of a single actor, kept per message type.  It is
+    written only from the actor's loop.  Snapshots may be taken from any
+    thread and are approximate while the actor runs.
+    """
+
+    def __init__(self, name):
+        """
+        Constructor
+
+        :param name: The actor name
+        :type name: str()
+        """
+        self.name = name
+        self.__by_type = {}
+        self.__since = time.monotonic()
+
+    def get_message_metrics(self, message_cls):
+        """
+        Get the metrics of a message type, creating them on first use
+
+        :param message_cls: The message class
+        :type message_cls: <class Message>
+        :return: The metrics
+        :rtype: MessageMetrics()
+        """
+        metrics = self.__by_type.get(message_cls)
+        if metrics is None:
+            metrics = MessageMetrics()
+            self.__by_type[message_cls] = metrics
+        return metrics
+
+    def record(self, message_cls, queue_wait, handler_time, failed=False,
+               is_ask=False):
+        """
+        Record one handled message
+
+        :param message_cls: The message class
+        :type message_cls: <class Message>
+        :param queue_wait: Seconds spent in the mailbox or None if unknown
+        :type queue_wait: float()
+        :param handler_time: Seconds spent in the handler
+        :type handler_time: float()
+        :param failed: Whether the handler failed
+        :type failed: bool()
+        :param is_ask: Whether the message was a query
+        :type is_ask: bool()
+        """
+        metrics = self.__by_type.get(message_cls)
+        if metrics is None:
+            metrics = self.get_message_metrics(message_cls)
+        metrics.messages += 1
+        if failed:
+            metrics.failures += 1
+        if is_ask:
+            metrics.asks += 1
+        if queue_wait is not None:
+            metrics.queue_wait.record(queue_wait)
+        metrics.handler_time.record(handler_time)
+
+    def reset(self):
+        """
+        Drop every counter and restart the rate window
+        """
+        self.__by_type = {}
+        self.__since = time.monotonic()
+
+    def snapshot(self):
+        """
+        Summarize every message type handled so far
+
+        :return: The elapsed seconds and a summary per message type name
+        :rtype: dict()
+        """
+        elapsed = time.monotonic() - self.__since
+        messages = {}
+        for message_cls, metrics in list(self.__by_type.items()):
+            messages[message_cls.__name__] = metrics.snapshot(elapsed)
+        return {
+            'name': self.name,
+            'elapsed': elapsed,
+            'messages': messages}
+
+
+class MetricsRegistry(object):
+    """
+    Tracks the metrics of every instrumented actor.  Whether new actors are
+    instrumented defaults to the registry switch, which is off.  Metrics are
+    held weakly and vanish with their actor.
+    """
+
+    def __init__(self):
+        self.__enabled = False
+        self.__metrics = weakref.WeakSet()
+        self.__lock = Lock()
+
+    def enable(self):
+        """
+        Instrument actors created from now on
+        """
+        self.__enabled = True
+
+    def disable(self):
+        """
+        Stop instrumenting actors created from now on
+        """
+        self.__enabled = False
+
+    def is_enabled(self):
+        return self.__enabled
+
+    def add(self, metrics):
+        """
+        Track the metrics of an actor
+
+        :param metrics: The actor metrics
+        :type metrics: ActorMetrics()
+        """
+        with self.__lock:
+            self.__metrics.add(metrics)
+
+    def remove(self, metrics):
+        """
+        Stop tracking the metrics of an actor
+
+        :param metrics: The actor metrics
+        :type metrics: ActorMetrics()
+        """
+        with self.__lock:
+            self.__metrics.discard(metrics)
+
+    def snapshot(self):
+        """
+        Summarize every tracked actor
+
+        :return: One snapshot per actor
+        :rtype: list()
+        """
+        with self.__lock:
+            tracked = list(self.__metrics)
+        return [metrics.snapshot() for metrics in tracked]
+
+    def reset(self):
+        """
+        Reset every tracked actor
+        """
+        with self.__lock:
+            tracked = list(self.__metrics)
+        for metrics in tracked:
+            metrics.reset()
+
+
+def get_metrics_registry():
+    """
+    Get the metrics registry
+    """
+    global __METRICS_REGISTRY
+    if __METRICS_REGISTRY is None:
+        with __metrics_lock:
+            if __METRICS_REGISTRY is None:
+                __METRICS_REGISTRY = MetricsRegistry()
+    return __METRICS_REGISTRY
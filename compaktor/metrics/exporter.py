@@ -0,0 +1,261 @@
+'''
+Samples actor mailboxes and exports them in the Prometheus text format.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import logging
+import os
+import socket
+import threading
+import time
+from compaktor.registry import actor_registry as registry
+from compaktor.state.actor_state import ActorState
+
+
+# (name, type, help, sample key)
+MAILBOX_METRICS = (
+    ('compaktor_mailbox_depth', 'gauge',
+     'User messages waiting in the mailbox', 'depth'),
+    ('compaktor_mailbox_max_depth', 'gauge',
+     'Highest mailbox depth seen', 'max_depth'),
+    ('compaktor_mailbox_enqueued_total', 'counter',
+     'User messages enqueued', 'enqueued'),
+    ('compaktor_mailbox_dequeued_total', 'counter',
+     'User messages dequeued', 'dequeued'),
+    ('compaktor_mailbox_enqueue_rate', 'gauge',
+     'Messages enqueued per second since the previous sample',
+     'enqueue_rate'),
+    ('compaktor_mailbox_dequeue_rate', 'gauge',
+     'Messages dequeued per second since the previous sample',
+     'dequeue_rate'),
+    ('compaktor_mailbox_dropped_total', 'counter',
+     'Messages dropped by the overflow policy', 'dropped'),
+    ('compaktor_mailbox_rejected_total', 'counter',
+     'Messages rejected by the overflow policy', 'rejected'),
+    ('compaktor_mailbox_redirected_total', 'counter',
+     'Messages redirected to the dead letters', 'redirected'))
+
+
+class MailboxSampler(object):
+    """
+    Reads the mailbox counters of every running actor found through a set
+    of sources.  A source is anything with a get_actors method returning
+    (path, actor) pairs, such as the Registry or an ActorSystem.  Rates are
+    computed against the previous sample at the same path, unless the
+    counters went back because a new actor took the path.
+    """
+
+    def __init__(self, sources=None):
+        """
+        Constructor
+
+        :param sources: Registries or actor systems, the registry by default
+        :type sources: list()
+        """
+        if sources is None:
+            sources = [registry.get_registry()]
+        self.__sources = list(sources)
+        self.__previous = {}
+
+    def sample(self):
+        """
+        Take one sample of every running actor with a mailbox.  An actor
+        reachable from several sources is sampled once.
+
+        :return: One dict per actor with its path, name and counters
+        :rtype: list()
+        """
+        now = time.monotonic()
+        previous = self.__previous
+        current = {}
+        seen = set()
+        samples = []
+        for source in self.__sources:
+            for path, actor in source.get_actors():
+                if actor in seen:
+                    continue
+                seen.add(actor)
+                get_stats = getattr(actor, 'get_mailbox_stats', None)
+                if get_stats is None:
+                    continue
+                if actor.get_state() is not ActorState.RUNNING:
+                    continue
+                stats = get_stats()
+                sample = {
+                    'path': path,
+                    'actor': actor.get_name(),
+                    'depth': stats['depth'],
+                    'max_depth': stats.get('max_depth', stats['depth']),
+                    'enqueued': stats.get('enqueued', 0),
+                    'dequeued': stats.get('dequeued', 0),
+                    'dropped': stats['dropped'],
+                    'rejected': stats['rejected'],
+                    'redirected': stats['redirected'],
+                    'enqueue_rate': 0.0,
+                    'dequeue_rate': 0.0}
+                last = previous.get(path)
+                if last is not None and now > last[0] and\
+                        sample['enqueued'] >= last[1] and\
+                        sample['dequeued'] >= last[2]:
+                    elapsed = now - last[0]
+                    sample['enqueue_rate'] =\
+                        (sample['enqueued'] - last[1]) / elapsed
+                    sample['dequeue_rate'] =\
+                        (sample['dequeued'] - last[2]) / elapsed
+                current[path] = (now, sample['enqueued'], sample['dequeued'])
+                samples.append(sample)
+        self.__previous = current
+        return samples
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n')\
+        .replace('"', '\\"')
+
+
+def format_prometheus(samples):
+    """
+    Render mailbox samples in the Prometheus text exposition format
+
+    :param samples: Samples from MailboxSampler.sample
+    :type samples: list()
+    :return: The text
+    :rtype: str()
+    """
+    lines = []
+    for name, metric_type, help_text, key in MAILBOX_METRICS:
+        lines.append("# HELP {} {}".format(name, help_text))
+        lines.append("# TYPE {} {}".format(name, metric_type))
+        for sample in samples:
+            lines.append('{}{{actor="{}",path="{}"}} {}'.format(
+                name, _escape(sample['actor']), _escape(sample['path']),
+                repr(float(sample[key]))))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+class MailboxExporter(object):
+    """
+    Samples mailboxes on a background thread and publishes the Prometheus
+    text to a file, a Unix socket or both.  The file is replaced atomically
+    so a textfile collector never reads a partial dump.  The socket writes
+    the latest dump to every client that connects and closes.
+    """
+
+    def __init__(self, sampler=None, path=None, socket_path=None,
+                 interval=10.0):
+        """
+        Constructor
+
+        :param sampler: The sampler, one over the registry by default
+        :type sampler: MailboxSampler()
+        :param path: File to write the dump to
+        :type path: str()
+        :param socket_path: Unix socket to serve the dump on
+        :type socket_path: str()
+        :param interval: Seconds between samples
+        :type interval: float()
+        """
+        if path is None and socket_path is None:
+            raise ValueError("A file or socket path is required")
+        self.__sampler = sampler
+        if self.__sampler is None:
+            self.__sampler = MailboxSampler()
+        self.__path = path
+        self.__socket_path = socket_path
+        self.__interval = interval
+        self.__text = format_prometheus([])
+        self.__lock = threading.Lock()
+        self.__export_lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__threads = []
+        self.__server = None
+
+    def get_text(self):
+        """
+        Get the latest dump
+
+        :return: The Prometheus text
+        :rtype: str()
+        """
+        with self.__lock:
+            return self.__text
+
+    def export(self):
+        """
+        Sample now and publish the result
+
+        :return: The Prometheus text
+        :rtype: str()
+        """
+        with self.__export_lock:
+            text = format_prometheus(self.__sampler.sample())
+            with self.__lock:
+                self.__text = text
+            if self.__path is not None:
+                tmp_path = "{}.tmp".format(self.__path)
+                with open(tmp_path, 'w') as out:
+                    out.write(text)
+                os.replace(tmp_path, self.__path)
+        return text
+
+    def start(self):
+        """
+        Start sampling and, with a socket path, serving
+        """
+        self.__stopped.clear()
+        self.export()
+        if self.__socket_path is not None:
+            if os.path.exists(self.__socket_path):
+                os.unlink(self.__socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(self.__socket_path)
+            server.listen(8)
+            server.settimeout(0.5)
+            self.__server = server
+            self.__threads.append(threading.Thread(
+                target=self.__serve, name="mailbox-exporter-socket",
+                daemon=True))
+        self.__threads.append(threading.Thread(
+            target=self.__run, name="mailbox-exporter", daemon=True))
+        for thread in self.__threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Stop the threads and remove the socket
+        """
+        self.__stopped.set()
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+        if self.__server is not None:
+            self.__server.close()
+            self.__server = None
+            if os.path.exists(self.__socket_path):
+                os.unlink(self.__socket_path)
+
+    def __run(self):
+        while not self.__stopped.wait(self.__interval):
+            try:
+                self.export()
+            except Exception:
+                logging.exception("Mailbox export failed")
+
+    def __serve(self):
+        while not self.__stopped.is_set():
+            try:
+                conn, _ = self.__server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                conn.sendall(self.get_text().encode('utf-8'))
+            except OSError:
+                pass
+            finally:
+                conn.close()
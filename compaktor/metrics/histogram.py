@@ -0,0 +1,178 @@
+'''
+Fixed memory histograms for latencies.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import math
+
+
+class Histogram(object):
+    """
+    A log-linear histogram of durations in seconds.  Each power of two
+    between the smallest and largest tracked value is split into a fixed
+    number of linear sub-buckets, so memory does not grow with the number
+    of samples.  A percentile is reported as the middle of its bucket, off
+    by at most half a bucket, about 6% with the default of 8.  Values
+    outside the range are clamped into the first or last bucket, which
+    report the recorded min and max instead.
+    """
+
+    __slots__ = ('__counts', '__min_exp', '__sub_buckets', 'count', 'total',
+                 'min', 'max')
+
+    def __init__(self, lowest=1e-7, highest=128.0, sub_buckets=8):
+        """
+        Constructor
+
+        :param lowest: Smallest value tracked with full precision
+        :type lowest: float()
+        :param highest: Largest value tracked with full precision
+        :type highest: float()
+        :param sub_buckets: Linear buckets per power of two
+        :type sub_buckets: int()
+        """
+        self.__min_exp = math.frexp(lowest)[1]
+        self.__sub_buckets = sub_buckets
+        octaves = math.frexp(highest)[1] - self.__min_exp + 1
+        self.__counts = [0] * (octaves * sub_buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def __len__(self):
+        return len(self.__counts)
+
+    def _index(self, value):
+        """
+        Find the bucket for a value
+
+        :param value: The value
+        :type value: float()
+        :return: The bucket index
+        :rtype: int()
+        """
+        if value <= 0:
+            return 0
+        mantissa, exponent = math.frexp(value)
+        index = (exponent - self.__min_exp) * self.__sub_buckets +\
+            int((mantissa - 0.5) * 2 * self.__sub_buckets)
+        if index < 0:
+            return 0
+        last = len(self.__counts) - 1
+        if index > last:
+            return last
+        return index
+
+    def _midpoint(self, index):
+        """
+        Get the value in the middle of a bucket
+
+        :param index: The bucket index
+        :type index: int()
+        :return: The midpoint
+        :rtype: float()
+        """
+        octave, sub = divmod(index, self.__sub_buckets)
+        mantissa = 0.5 + (sub + 0.5) / (2.0 * self.__sub_buckets)
+        return math.ldexp(mantissa, octave + self.__min_exp)
+
+    def record(self, value):
+        """
+        Record a sample
+
+        :param value: The sample in seconds
+        :type value: float()
+        """
+        self.__counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile from the buckets
+
+        :param fraction: The percentile between 0 and 1
+        :type fraction: float()
+        :return: The middle of the bucket holding the percentile, limited
+            to the recorded min and max, or None when empty
+        :rtype: float()
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, int(math.ceil(fraction * self.count)))
+        seen = 0
+        last = len(self.__counts) - 1
+        for index, bucket in enumerate(self.__counts):
+            seen += bucket
+            if seen >= rank:
+                if index == 0:
+                    return self.min
+                if index == last:
+                    return self.max
+                return min(max(self._midpoint(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other):
+        """
+        Add the samples of a histogram with the same layout
+
+        :param other: The other histogram
+        :type other: Histogram()
+        """
+        if len(other) != len(self):
+            raise ValueError("Histogram layouts differ")
+        counts = self.__counts
+        for index, bucket in enumerate(other.get_counts()):
+            counts[index] += bucket
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def get_counts(self):
+        """
+        Get a copy of the bucket counts
+
+        :return: The counts
+        :rtype: list()
+        """
+        return list(self.__counts)
+
+    def reset(self):
+        """
+        Clear every sample
+        """
+        self.__counts = [0] * len(self.__counts)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def snapshot(self):
+        """
+        Summarize the samples
+
+        :return: Count, mean, min, max, p50, p90 and p99 in seconds
+        :rtype: dict()
+        """
+        mean = None
+        if self.count:
+            mean = self.total / self.count
+        return {
+            'count': self.count,
+            'mean': mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99)}
@@ -0,0 +1,428 @@
+'''
+Hosts groups of actors in worker processes so CPU heavy handlers can use
+every core.  Actors are reached through proxies in the registry.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+from multiprocessing import cpu_count
+from threading import Lock
+from compaktor.errors.actor_errors import RemoteActorError
+from compaktor.multiprocessing.runtime import protocol
+from compaktor.multiprocessing.runtime.remote_actor import RemoteActorProxy
+from compaktor.multiprocessing.runtime.worker import worker_main
+from compaktor.multiprocessing.transport.shm_ring import ShmProducer, ShmRing
+from compaktor.registry import actor_registry as registry
+from compaktor.serialization.frames import INLINE_LIMIT, frame_header,\
+    frame_size, send_frames
+from compaktor.system.placement import RoundRobinPlacement
+from compaktor.utils.loop_utils import get_running_loop, resolve_future,\
+    run_on_loop
+from compaktor.utils.name_utils import NameCreationUtils
+
+
+__RUNTIME__ = None
+__runtime_lock = Lock()
+
+_PIPED = protocol.encode_command((protocol.PIPED,))
+_PIPED.insert(0, frame_header(_PIPED))
+
+
+class WorkerHandle(object):
+    """
+    The runtime side of a worker process.  Commands go over the pipe or,
+    with a producer, through a shared memory ring.  Commands too large for
+    the ring are announced on the ring and written to the pipe once the
+    announcement is in the ring, so the worker still sees them in order.
+    Small commands are joined into one
+    record, which is cheaper than writing their frames one by one.
+    """
+
+    def __init__(self, index, process, conn, producer=None, ring=None):
+        """
+        Constructor
+
+        :param index: The worker index
+        :type index: int()
+        :param process: The worker process
+        :type process: multiprocessing.Process()
+        :param conn: The runtime end of the pipe
+        :type conn: multiprocessing.connection.Connection()
+        :param producer: Writes commands to the worker ring
+        :type producer: ShmProducer()
+        :param ring: The ring owned by this side
+        :type ring: ShmRing()
+        """
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.producer = producer
+        self.ring = ring
+        self.alive = True
+        self.lock = Lock()
+
+    def send(self, command):
+        """
+        Write a command to the worker.  Safe to call from any thread.
+
+        :param command: The command tuple
+        :type command: tuple()
+        :return: False when commands are backlogged waiting for ring space
+        :rtype: bool()
+        """
+        if not self.alive:
+            raise RemoteActorError("Worker {} is not running".format(
+                self.index))
+        frames = protocol.encode_command(command)
+        with self.lock:
+            producer = self.producer
+            if producer is None:
+                send_frames(self.conn, frames)
+                return True
+            frames.insert(0, frame_header(frames))
+            size = 0
+            for frame in frames:
+                size += frame_size(frame)
+            if producer.fits(size):
+                if size <= INLINE_LIMIT:
+                    return producer.send(b''.join(frames))
+                return producer.send(frames)
+            del frames[0]
+            # the worker only reads the pipe once it takes the marker off
+            # the ring, so the frames wait until the marker is written
+            return producer.send(
+                _PIPED, functools.partial(send_frames, self.conn, frames))
+
+    def flush(self):
+        """
+        Move backlogged commands into the ring.
+
+        :return: Whether the backlog is empty
+        :rtype: bool()
+        """
+        with self.lock:
+            self.producer.flush()
+            return self.producer.get_backlog() == 0
+
+    def close(self):
+        """
+        Close the pipe and release the ring.
+        """
+        self.conn.close()
+        if self.producer is not None:
+            self.producer.close()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+class ProcessRuntime(object):
+    """
+    Starts worker processes and places actors on them.  Requests are matched
+    to replies by id and replies are read on the runtime loop, which must be
+    running for asks, spawns and stops to complete.
+
+    The 'shm' transport carries commands to each worker through a shared
+    memory ring instead of a pipe write per message.  Replies still use the
+    pipe.
+    """
+
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, num_workers=cpu_count(), loop=None, placement=None,
+                 transport='pipe', ring_size=1 << 22):
+        """
+        Constructor
+
+        :param num_workers: The number of worker processes
+        :type num_workers: int()
+        :param loop: The loop replies are read on
+        :type loop: AbstractEventLoop()
+        :param placement: Chooses the worker for new actors
+        :type placement: PlacementPolicy()
+        :param transport: 'pipe' or 'shm'
+        :type transport: str()
+        :param ring_size: Bytes in each shared memory ring
+        :type ring_size: int()
+        """
+        if transport not in ('pipe', 'shm'):
+            raise ValueError("Unknown transport {}".format(transport))
+        self.__num_workers = max(1, num_workers)
+        self.__transport = transport
+        self.__ring_size = ring_size
+        self.__loop = loop
+        if self.__loop is None:
+            self.__loop = asyncio.get_event_loop()
+        self.__placement = placement
+        if self.__placement is None:
+            self.__placement = RoundRobinPlacement()
+        self.__context = multiprocessing.get_context('spawn')
+        self.__workers = []
+        self.__pending = {}
+        self.__req_ids = itertools.count()
+        self.__proxies = []
+        self.__flushing = set()
+
+    def get_workers(self):
+        """
+        Get the worker handles
+
+        :return: The workers
+        :rtype: list()
+        """
+        return list(self.__workers)
+
+    def get_pending(self):
+        """
+        Get the number of requests awaiting a worker reply
+
+        :return: The pending count
+        :rtype: int()
+        """
+        return len(self.__pending)
+
+    def start(self):
+        """
+        Start the worker processes.
+        """
+        if self.__workers:
+            return
+        for i in range(self.__num_workers):
+            conn, child_conn = self.__context.Pipe()
+            args = (child_conn,)
+            ring = None
+            producer = None
+            if self.__transport == 'shm':
+                ring = ShmRing(self.__ring_size)
+                doorbell_r, doorbell_w = self.__context.Pipe(duplex=False)
+                space_r, space_w = self.__context.Pipe(duplex=False)
+                producer = ShmProducer(ring, doorbell_w, space_r)
+                args = (child_conn, ring.name, ring.capacity, doorbell_r,
+                        space_w)
+            process = self.__context.Process(
+                target=worker_main, args=args,
+                name="compaktor-worker-{}".format(i), daemon=True)
+            process.start()
+            for child_end in args[3:] + (child_conn,):
+                child_end.close()
+            handle = WorkerHandle(i, process, conn, producer, ring)
+            self.__workers.append(handle)
+            self.__loop.add_reader(conn.fileno(), self.__on_readable, handle)
+            if producer is not None:
+                self.__loop.add_reader(producer.fileno(), handle.flush)
+
+    def __send(self, handle, command):
+        """
+        Send a command, polling for ring space while commands are backlogged.
+        """
+        if not handle.send(command) and handle.index not in self.__flushing:
+            self.__flushing.add(handle.index)
+            self.__loop.call_soon_threadsafe(self.__poll_flush, handle)
+
+    def __poll_flush(self, handle):
+        """
+        Retry a backlog on a timer in case a space doorbell was missed.
+        """
+        if handle.alive and not handle.flush():
+            self.__loop.call_later(
+                self.POLL_INTERVAL, self.__poll_flush, handle)
+        else:
+            self.__flushing.discard(handle.index)
+
+    def __on_readable(self, handle):
+        """
+        Read replies from a worker and complete the matching futures.
+
+        :param handle: The worker with data waiting
+        :type handle: WorkerHandle()
+        """
+        try:
+            while handle.conn.poll():
+                _, req_id, ok, value = handle.conn.recv()
+                entry = self.__pending.pop(req_id, None)
+                if entry is None:
+                    continue
+                if ok:
+                    resolve_future(entry[0], value, loop=self.__loop)
+                else:
+                    resolve_future(entry[0], exception=value, loop=self.__loop)
+        except (EOFError, OSError):
+            self.__worker_lost(handle)
+
+    def __worker_lost(self, handle):
+        """
+        Fail every request waiting on a worker that has exited.
+
+        :param handle: The lost worker
+        :type handle: WorkerHandle()
+        """
+        if handle.alive:
+            handle.alive = False
+            self.__loop.remove_reader(handle.conn.fileno())
+            if handle.producer is not None:
+                self.__loop.remove_reader(handle.producer.fileno())
+        for req_id, entry in list(self.__pending.items()):
+            if entry[1] is handle:
+                del self.__pending[req_id]
+                resolve_future(entry[0], exception=RemoteActorError(
+                    "Worker {} exited".format(handle.index)), loop=self.__loop)
+        for proxy in self.__proxies:
+            if proxy.get_worker() is handle:
+                proxy._mark_terminated()
+
+    def __request(self, handle, future, build):
+        """
+        Send a request and track its future until the reply arrives.
+
+        :param handle: The target worker
+        :type handle: WorkerHandle()
+        :param future: Completed with the reply
+        :type future: asyncio.Future()
+        :param build: Called with the request id to make the command
+        :type build: def
+        """
+        req_id = next(self.__req_ids)
+        self.__pending[req_id] = (future, handle)
+        try:
+            self.__send(handle, build(req_id))
+        except Exception:
+            self.__pending.pop(req_id, None)
+            raise
+        discard = functools.partial(self.__discard, req_id)
+        owner = future.get_loop()
+        if owner is get_running_loop():
+            future.add_done_callback(discard)
+        else:
+            owner.call_soon_threadsafe(future.add_done_callback, discard)
+        return future
+
+    def __discard(self, req_id, future):
+        """
+        Stop tracking a request once its future is done, whether by the
+        reply, a timeout or a cancellation.
+
+        :param req_id: The request id
+        :type req_id: int()
+        :param future: The done future
+        :type future: asyncio.Future()
+        """
+        self.__pending.pop(req_id, None)
+
+    def forward_tell(self, handle, name, message):
+        self.__send(handle, (protocol.TELL, name, message))
+
+    def forward_ask(self, handle, name, message):
+        self.__request(handle, message.result, lambda req_id: (
+            protocol.ASK, req_id, name, message))
+
+    async def stop_remote(self, handle, name):
+        await self.__request(handle, self.__loop.create_future(),
+                             lambda req_id: (protocol.STOP, req_id, name))
+
+    async def spawn(self, actor_cls, name=None, address=None, worker=None,
+                    **kwargs):
+        """
+        Create an actor in a worker process and register a proxy for it.
+
+        :param actor_cls: An importable actor class taking name and loop
+        :type actor_cls: class
+        :param name: The actor name, generated when None
+        :type name: str()
+        :param address: The registry address of the parent node
+        :type address: list()
+        :param worker: The worker index, chosen by the placement when None
+        :type worker: int()
+        :param kwargs: Further constructor arguments, which must pickle
+        :type kwargs: dict()
+        :return: The proxy for the remote actor
+        :rtype: RemoteActorProxy()
+        """
+        if not self.__workers:
+            self.start()
+        if name is None:
+            name = str(NameCreationUtils.get_name_base())
+        if worker is None:
+            handle = self.__placement.place(name, self.__workers)
+        else:
+            handle = self.__workers[worker]
+        await self.__request(
+            handle, self.__loop.create_future(), lambda req_id: (
+                protocol.SPAWN, req_id, actor_cls, name, kwargs))
+        proxy = RemoteActorProxy(name, self, handle, self.__loop)
+        if address is None:
+            address = [registry.get_registry().get_host()]
+        registry.get_registry().add_actor(list(address), proxy, False)
+        self.__proxies.append(proxy)
+        return proxy
+
+    async def shutdown(self, timeout=5):
+        """
+        Stop the hosted actors and the workers, then drop the proxies from
+        the registry.
+
+        :param timeout: Seconds to wait for each worker
+        :type timeout: float()
+        """
+        for handle in self.__workers:
+            if not handle.alive:
+                continue
+            try:
+                await asyncio.wait_for(self.__request(
+                    handle, self.__loop.create_future(),
+                    lambda req_id: (protocol.SHUTDOWN, req_id)), timeout)
+            except Exception as ex:
+                logging.warning("Worker {} did not shut down: {}".format(
+                    handle.index, ex))
+        for handle in self.__workers:
+            await self.__loop.run_in_executor(
+                None, handle.process.join, timeout)
+            if handle.process.is_alive():
+                handle.process.terminate()
+            self.__worker_lost(handle)
+            handle.close()
+        for proxy in self.__proxies:
+            try:
+                registry.get_registry().remove_branch(proxy.address, False)
+            except ValueError:
+                pass
+        self.__proxies = []
+        self.__workers = []
+
+    def close(self, timeout=5):
+        """
+        Shut down from synchronous code.
+
+        :param timeout: Seconds to wait for each worker
+        :type timeout: float()
+        """
+        run_on_loop(self.shutdown(timeout), self.__loop)
+
+
+def get_runtime(num_workers=cpu_count(), loop=None, transport='pipe'):
+    """
+    Get the process runtime, creating and starting it on first use.  Like the
+    process pool it is instantiated once.
+
+    :param num_workers: The number of worker processes
+    :type num_workers: int()
+    :param loop: The loop replies are read on
+    :type loop: AbstractEventLoop()
+    :param transport: 'pipe' or 'shm'
+    :type transport: str()
+    :return: The runtime
+    :rtype: ProcessRuntime()
+    """
+    global __RUNTIME__
+    with __runtime_lock:
+        if __RUNTIME__ is None:
+            __RUNTIME__ = ProcessRuntime(
+                num_workers, loop, transport=transport)
+            __RUNTIME__.start()
+    return __RUNTIME__
@@ -0,0 +1,137 @@
+'''
+Commands exchanged between the process runtime and its workers.
+
+Every command is a tuple starting with one of the opcodes below.  Requests
+that expect an answer carry a request id and are answered with
+(REPLY, req_id, ok, value) where value is the result or the exception.
+
+Commands are sent as frames.  A message using the default pickle codec is
+pickled with its command and only out of band buffers take extra frames.
+For any other codec the opcode carries the CODED flag, the first frame
+pickles the command without its message and the message follows in the
+frames of its codec.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import copy
+import pickle
+from compaktor.message.message_objects import MessageTag
+from compaktor.serialization.codec_registry import get_codec_registry
+from compaktor.serialization.codecs import PickleCodec
+
+
+SPAWN = 1       # (SPAWN, req_id, actor_cls, name, kwargs)
+TELL = 2        # (TELL, name, message)
+ASK = 3         # (ASK, req_id, name, message)
+STOP = 4        # (STOP, req_id, name)
+SHUTDOWN = 5    # (SHUTDOWN, req_id)
+REPLY = 6       # (REPLY, req_id, ok, value)
+PIPED = 7       # (PIPED,) the next command is too large for the ring and
+                # follows on the pipe
+CODED = 0x10    # opcode flag, the message follows in its codec frames
+
+_FIELDS = {}
+_SKIPPED = ('sender', '__dict__', '__weakref__')
+
+
+def _fields(cls):
+    """
+    Get the slots of a class and its parents, cached per class.
+    """
+    fields = _FIELDS.get(cls)
+    if fields is None:
+        names = []
+        for klass in cls.__mro__:
+            for name in getattr(klass, '__slots__', ()):
+                if name not in _SKIPPED and name not in names:
+                    names.append(name)
+        fields = tuple(names)
+        _FIELDS[cls] = fields
+    return fields
+
+
+def detach(message):
+    """
+    Copy a message for another process.  The sender and any result future
+    belong to this process and are not sent.  Slotted messages are copied
+    slot by slot, which is several times faster than copy.copy.
+
+    :param message: The message to send
+    :type message: Message()
+    :return: A copy safe to serialize
+    :rtype: Message()
+    """
+    cls = type(message)
+    if not hasattr(cls, '__slots__'):
+        clone = copy.copy(message)
+        clone.sender = None
+        if getattr(message, 'type_tag', 0) & MessageTag.QUERY:
+            clone.result = None
+        return clone
+    clone = cls.__new__(cls)
+    for name in _fields(cls):
+        try:
+            setattr(clone, name, getattr(message, name))
+        except AttributeError:
+            pass
+    attributes = getattr(message, '__dict__', None)
+    if attributes:
+        clone.__dict__.update(attributes)
+    clone.sender = None
+    if getattr(cls, 'type_tag', 0) & MessageTag.QUERY:
+        clone.result = None
+    return clone
+
+
+def encode_command(command):
+    """
+    Encode a command into frames, using the codec registry for a message.
+
+    :param command: The command tuple
+    :type command: tuple()
+    :return: The frames
+    :rtype: list()
+    """
+    op = command[0]
+    if op != TELL and op != ASK:
+        return [pickle.dumps(command, pickle.HIGHEST_PROTOCOL)]
+    message = detach(command[-1])
+    codecs = get_codec_registry()
+    key = codecs.key_for(type(message))
+    if key == 0:
+        codec = codecs.get_codec(0)
+        if isinstance(codec, PickleCodec):
+            return codec.dumps(command[:-1] + (codec.prepare(message),))
+    frames = codecs.encode_with(key, message)
+    frames.insert(0, pickle.dumps(
+        (op | CODED,) + command[1:-1], pickle.HIGHEST_PROTOCOL))
+    return frames
+
+
+def _owned(frame):
+    if isinstance(frame, bytes):
+        return frame
+    return bytes(frame)
+
+
+def decode_command(frames):
+    """
+    Decode a command from frames.  Frames a decoded message may keep are
+    turned into bytes, which copies only frames that arrived inline or in
+    shared memory, so bytes-like payloads always arrive as bytes.
+
+    :param frames: The frames
+    :type frames: list()
+    :return: The command tuple
+    :rtype: tuple()
+    """
+    command = pickle.loads(
+        frames[0], buffers=(_owned(frame) for frame in frames[1:]))
+    if command[0] & CODED:
+        frames = frames[1:3] + [_owned(frame) for frame in frames[3:]]
+        message = get_codec_registry().decode(frames)
+        command = (command[0] & ~CODED,) + command[1:] + (message,)
+    return command
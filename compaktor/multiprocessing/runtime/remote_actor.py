@@ -0,0 +1,106 @@
+'''
+A local stand-in for an actor hosted in a worker process.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+from compaktor.errors.actor_errors import ActorStateError
+from compaktor.message.message_objects import MessageTag
+from compaktor.state.actor_state import ActorState
+
+
+class RemoteActorProxy(object):
+    """
+    Forwards messages to an actor in a worker process.  The proxy is
+    registered with is_local set to False and can be the target of tell and
+    ask like any local actor.  Query replies complete the asker's future.
+    """
+
+    def __init__(self, name, runtime, worker, loop):
+        """
+        Constructor
+
+        :param name: The remote actor name
+        :type name: str()
+        :param runtime: The runtime owning the worker
+        :type runtime: ProcessRuntime()
+        :param worker: The worker hosting the actor
+        :type worker: WorkerHandle()
+        :param loop: The loop the runtime reads replies on
+        :type loop: AbstractEventLoop()
+        """
+        self.name = name
+        self.loop = loop
+        self.address = None
+        self.__runtime = runtime
+        self.__worker = worker
+        self.__state = ActorState.RUNNING
+
+    def get_name(self):
+        return self.name
+
+    def get_address(self):
+        return self.address
+
+    def get_state(self):
+        return self.__state
+
+    def get_worker(self):
+        """
+        Get the worker hosting the actor
+
+        :return: The worker handle
+        :rtype: WorkerHandle()
+        """
+        return self.__worker
+
+    def _receive_nowait(self, message):
+        """
+        Forward a message to the worker.  Queries register their result
+        future with the runtime until the reply arrives.
+
+        :param message: The message to forward
+        :type message: Message()
+        :return: True once written to the worker pipe
+        :rtype: bool()
+        """
+        if self.__state is not ActorState.RUNNING:
+            raise ActorStateError(
+                "Remote actor {} is {}".format(self.name, self.__state))
+        is_query = getattr(message, 'type_tag', 0) & MessageTag.QUERY
+        if is_query and getattr(message, 'result', None) is not None:
+            self.__runtime.forward_ask(self.__worker, self.name, message)
+        else:
+            self.__runtime.forward_tell(self.__worker, self.name, message)
+        return True
+
+    async def _receive(self, message):
+        self._receive_nowait(message)
+
+    async def stop(self):
+        """
+        Stop the remote actor and wait for the worker to confirm.
+
+        :return: A boolean on completion
+        :rtype: bool()
+        """
+        if self.__state is ActorState.RUNNING:
+            self.__state = ActorState.STOPPED
+            await self.__runtime.stop_remote(self.__worker, self.name)
+        self.__state = ActorState.TERMINATED
+        return True
+
+    def _mark_terminated(self):
+        """
+        Record that the hosting worker has gone away.
+        """
+        self.__state = ActorState.TERMINATED
+
+    def __str__(self, *args, **kwargs):
+        return "RemoteActor(name = {}, worker = {}, status = {})".format(
+            self.name, self.__worker.index, self.__state)
+
+    def __repr__(self, *args, **kwargs):
+        return self.__str__(*args, **kwargs)
@@ -0,0 +1,239 @@
+'''
+The worker process hosting a group of actors for the process runtime.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import logging
+from compaktor.actor.loop_bridge import LoopBridge
+from compaktor.errors.actor_errors import RemoteActorError
+from compaktor.multiprocessing.runtime import protocol
+from compaktor.multiprocessing.transport.shm_ring import ShmConsumer, ShmRing
+from compaktor.serialization.frames import recv_frames, split_frames
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
+
+
+class Worker(object):
+    """
+    Reads commands from the runtime pipe on the worker loop and runs them
+    against the hosted actors.  Tells are enqueued in arrival order through
+    a loop bridge so a full mailbox delays rather than reorders them.
+
+    With a shared memory consumer commands arrive on the ring instead and
+    the pipe only carries replies and commands too large for the ring,
+    which are read when their PIPED marker comes off the ring.
+    """
+
+    DRAIN_LIMIT = 256
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, conn, loop, consumer=None):
+        """
+        Constructor
+
+        :param conn: The worker end of the pipe
+        :type conn: multiprocessing.connection.Connection()
+        :param loop: The worker loop
+        :type loop: AbstractEventLoop()
+        :param consumer: Reads commands from a shared memory ring
+        :type consumer: ShmConsumer()
+        """
+        self.__conn = conn
+        self.__loop = loop
+        self.__consumer = consumer
+        self.__closing = False
+        self.__actors = {}
+        self.__bridge = LoopBridge(loop)
+        self.__handlers = {
+            protocol.SPAWN: self.__spawn,
+            protocol.TELL: self.__tell,
+            protocol.ASK: self.__ask,
+            protocol.STOP: self.__stop,
+            protocol.SHUTDOWN: self.__shutdown}
+
+    def get_actors(self):
+        """
+        Get the hosted actors by name
+
+        :return: The actors
+        :rtype: dict()
+        """
+        return self.__actors
+
+    def on_readable(self):
+        """
+        Handle every command waiting on the pipe.
+        """
+        conn = self.__conn
+        try:
+            while conn.poll():
+                self.__handle(protocol.decode_command(recv_frames(conn)))
+        except (EOFError, OSError):
+            self.__disconnected(conn.fileno())
+        except Exception:
+            logging.exception("Worker failed to handle a command")
+
+    def on_ring(self):
+        """
+        Handle commands waiting on the shared memory ring.  The pipe is only
+        read when the ring announces a PIPED command, so it is not watched
+        and a closed doorbell signals that the runtime has gone.
+        """
+        consumer = self.__consumer
+        try:
+            count = consumer.drain(
+                self.__handle, self.__decode_record, self.DRAIN_LIMIT)
+        except (EOFError, OSError):
+            self.__disconnected(consumer.fileno())
+            return
+        except Exception:
+            logging.exception("Worker failed to handle a command")
+            count = self.DRAIN_LIMIT
+        if count >= self.DRAIN_LIMIT:
+            self.__loop.call_soon(self.on_ring)
+
+    def __disconnected(self, fd):
+        """
+        Stop the worker once the runtime end has closed.
+        """
+        if not self.__closing:
+            self.__closing = True
+            self.__loop.remove_reader(fd)
+            self.__loop.create_task(self.__stop_all())
+
+    def poll_ring(self):
+        """
+        Drain the ring on a timer in case a doorbell was missed.
+        """
+        if self.__loop.is_running() and not self.__closing:
+            self.on_ring()
+            self.__loop.call_later(self.POLL_INTERVAL, self.poll_ring)
+
+    @staticmethod
+    def __decode_record(view):
+        frames, _ = split_frames(view)
+        return protocol.decode_command(frames)
+
+    def __handle(self, command):
+        if command[0] == protocol.PIPED:
+            command = protocol.decode_command(recv_frames(self.__conn))
+        self.__handlers[command[0]](*command[1:])
+
+    def __reply(self, req_id, ok, value):
+        """
+        Answer a request.  Values that cannot be pickled are replaced by a
+        RemoteActorError describing them.
+        """
+        try:
+            self.__conn.send((protocol.REPLY, req_id, ok, value))
+        except (EOFError, OSError):
+            pass
+        except Exception as ex:
+            self.__conn.send((protocol.REPLY, req_id, False, RemoteActorError(
+                "Unpicklable reply {!r}: {}".format(value, ex))))
+
+    def __spawn(self, req_id, actor_cls, name, kwargs):
+        try:
+            actor = actor_cls(name=name, loop=self.__loop, **kwargs)
+            actor.start()
+        except Exception as ex:
+            self.__reply(req_id, False, ex)
+        else:
+            self.__actors[name] = actor
+            self.__reply(req_id, True, None)
+
+    def __tell(self, name, message):
+        actor = self.__actors.get(name)
+        if actor is None:
+            get_dead_letter_office().post(
+                message, DeadLetterReason.NO_TARGET, name)
+        else:
+            self.__bridge.submit(actor, message)
+
+    def __ask(self, req_id, name, message):
+        actor = self.__actors.get(name)
+        if actor is None:
+            self.__reply(req_id, False, RemoteActorError(
+                "Target Does Not Exist {}".format(name)))
+            return
+        message.result = self.__loop.create_future()
+        message.result.add_done_callback(
+            lambda fut: self.__reply_future(req_id, fut))
+        self.__bridge.submit(actor, message)
+
+    def __reply_future(self, req_id, future):
+        if future.cancelled():
+            self.__reply(req_id, False, RemoteActorError("Ask cancelled"))
+        elif future.exception() is not None:
+            self.__reply(req_id, False, future.exception())
+        else:
+            self.__reply(req_id, True, future.result())
+
+    def __stop(self, req_id, name):
+        self.__loop.create_task(self.__stop_actor(req_id, name))
+
+    async def __stop_actor(self, req_id, name):
+        actor = self.__actors.pop(name, None)
+        if actor is not None:
+            await actor.stop()
+        self.__reply(req_id, True, None)
+
+    def __shutdown(self, req_id):
+        self.__loop.create_task(self.__stop_all(req_id))
+
+    async def __stop_all(self, req_id=None):
+        """
+        Stop every hosted actor then the loop.
+        """
+        actors = list(self.__actors.values())
+        self.__actors.clear()
+        for actor in actors:
+            try:
+                await actor.stop()
+            except Exception:
+                logging.exception("Failed to stop {}".format(actor))
+        if req_id is not None:
+            self.__reply(req_id, True, None)
+        self.__loop.stop()
+
+
+def worker_main(conn, ring_name=None, ring_size=0, doorbell=None,
+                space=None):
+    """
+    Entry point of a worker process.
+
+    :param conn: The worker end of the pipe
+    :type conn: multiprocessing.connection.Connection()
+    :param ring_name: The shared memory ring carrying commands, if any
+    :type ring_name: str()
+    :param ring_size: The ring capacity in bytes
+    :type ring_size: int()
+    :param doorbell: Read end rung when the ring has commands
+    :type doorbell: multiprocessing.connection.Connection()
+    :param space: Write end rung when ring space is freed
+    :type space: multiprocessing.connection.Connection()
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    ring = None
+    consumer = None
+    if ring_name is not None:
+        ring = ShmRing(ring_size, ring_name)
+        consumer = ShmConsumer(ring, doorbell, space)
+    worker = Worker(conn, loop, consumer)
+    if consumer is None:
+        loop.add_reader(conn.fileno(), worker.on_readable)
+    else:
+        loop.add_reader(consumer.fileno(), worker.on_ring)
+        loop.call_soon(worker.poll_ring)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+        conn.close()
+        if ring is not None:
+            ring.close()
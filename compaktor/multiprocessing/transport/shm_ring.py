@@ -0,0 +1,361 @@
+'''
+A single producer, single consumer ring buffer in shared memory with pipe
+doorbells, used to move messages between processes on one host without a
+pipe write per message.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import ctypes
+import struct
+from collections import deque
+from multiprocessing import shared_memory
+from compaktor.serialization.frames import frame_size
+
+
+_LEN = struct.Struct('I')
+
+# header fields each sit on their own cache line
+_HEAD = 0
+_TAIL = 64
+_CONSUMER_WAITING = 128
+_PRODUCER_WAITING = 192
+_FIELDS = (_HEAD, _TAIL, _CONSUMER_WAITING, _PRODUCER_WAITING)
+_DATA = 256
+
+_WRAP = 0xFFFFFFFF
+_ALIGN = 8
+
+
+class ShmRing(object):
+    """
+    A byte ring in a shared memory segment.  The producer owns the tail and
+    the consumer owns the head.  Both are monotonically increasing byte
+    counts so full and empty are never ambiguous.  Records are a length
+    prefix and the payload, padded to 8 bytes, and never straddle the end of
+    the ring.  A wrap marker sends the reader back to the start.
+    """
+
+    def __init__(self, capacity=1 << 22, name=None):
+        """
+        Constructor.  Creates a segment unless a name is given, in which case
+        the existing segment is attached.
+
+        :param capacity: Data bytes in the ring, rounded up to 8
+        :type capacity: int()
+        :param name: The name of a segment to attach
+        :type name: str()
+        """
+        if name is None:
+            capacity = -(-capacity // _ALIGN) * _ALIGN
+            self.__shm = shared_memory.SharedMemory(
+                create=True, size=_DATA + capacity)
+            self.__owner = True
+            self.__shm.buf[:_DATA] = bytes(_DATA)
+        else:
+            self.__shm = shared_memory.SharedMemory(name=name)
+            self.__owner = False
+            capacity = capacity or (self.__shm.size - _DATA)
+        self.__capacity = capacity
+        self.__buf = self.__shm.buf
+        self.__data = self.__buf[_DATA:_DATA + capacity]
+        # struct.pack_into zeroes its target before packing so the other
+        # process could read 0, while a ctypes store is a single write
+        self.__fields = {}
+        for offset in _FIELDS:
+            self.__fields[offset] = ctypes.c_uint64.from_buffer(
+                self.__buf, offset)
+
+    @property
+    def name(self):
+        return self.__shm.name
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    def __get(self, offset):
+        return self.__fields[offset].value
+
+    def __set(self, offset, value):
+        self.__fields[offset].value = value
+
+    def used(self):
+        """
+        Get the bytes in use including padding
+
+        :return: The used byte count
+        :rtype: int()
+        """
+        return self.__get(_TAIL) - self.__get(_HEAD)
+
+    def empty(self):
+        return self.__get(_TAIL) == self.__get(_HEAD)
+
+    def max_record(self):
+        """
+        Get the largest payload the ring can ever hold
+
+        :return: The payload size in bytes
+        :rtype: int()
+        """
+        return self.__capacity // 2 - _LEN.size
+
+    def try_write(self, data):
+        """
+        Append a record if there is room.  Producer side only.  A list of
+        buffers is written back to back as one record without joining them.
+
+        :param data: The payload or a list of payload parts
+        :type data: bytes-like
+        :return: Whether the record was written
+        :rtype: bool()
+        """
+        if isinstance(data, (list, tuple)):
+            parts = data
+        else:
+            parts = (data,)
+        size = 0
+        for part in parts:
+            size += frame_size(part)
+        if size > self.max_record():
+            raise ValueError("Record of {} bytes exceeds the ring".format(
+                size))
+        capacity = self.__capacity
+        tail = self.__get(_TAIL)
+        free = capacity - (tail - self.__get(_HEAD))
+        record = -(-(_LEN.size + size) // _ALIGN) * _ALIGN
+        index = tail % capacity
+        pad = 0
+        if index + record > capacity:
+            pad = capacity - index
+        if record + pad > free:
+            return False
+        if pad:
+            _LEN.pack_into(self.__data, index, _WRAP)
+            index = 0
+        _LEN.pack_into(self.__data, index, size)
+        start = index + _LEN.size
+        for part in parts:
+            end = start + frame_size(part)
+            self.__data[start:end] = part
+            start = end
+        self.__set(_TAIL, tail + pad + record)
+        return True
+
+    def read(self, decode=bytes):
+        """
+        Take the next record.  Consumer side only.  The payload is handed to
+        decode as a memoryview of the ring before the space is released, so
+        decoding straight from shared memory avoids a copy.
+
+        :param decode: Called with the payload memoryview
+        :type decode: def
+        :return: The decoded record or None when empty
+        :rtype: object
+        """
+        capacity = self.__capacity
+        head = self.__get(_HEAD)
+        if head == self.__get(_TAIL):
+            return None
+        index = head % capacity
+        size = _LEN.unpack_from(self.__data, index)[0]
+        if size == _WRAP:
+            head += capacity - index
+            index = 0
+            size = _LEN.unpack_from(self.__data, 0)[0]
+        start = index + _LEN.size
+        record = -(-(_LEN.size + size) // _ALIGN) * _ALIGN
+        view = self.__data[start:start + size]
+        try:
+            return decode(view)
+        finally:
+            view.release()
+            self.__set(_HEAD, head + record)
+
+    def set_consumer_waiting(self, waiting):
+        self.__set(_CONSUMER_WAITING, 1 if waiting else 0)
+
+    def consumer_waiting(self):
+        return self.__get(_CONSUMER_WAITING) == 1
+
+    def set_producer_waiting(self, waiting):
+        self.__set(_PRODUCER_WAITING, 1 if waiting else 0)
+
+    def producer_waiting(self):
+        return self.__get(_PRODUCER_WAITING) == 1
+
+    def close(self):
+        """
+        Release the mapping and remove the segment if this side created it.
+        """
+        self.__fields = None
+        self.__data.release()
+        self.__buf = None
+        self.__shm.close()
+        if self.__owner:
+            self.__shm.unlink()
+
+
+class ShmProducer(object):
+    """
+    Writes records to a ring.  The consumer is woken through the doorbell
+    pipe only when it has said it is waiting.  Records that do not fit wait
+    in a local backlog, in order, until the consumer rings back.
+    """
+
+    def __init__(self, ring, doorbell, space):
+        """
+        Constructor
+
+        :param ring: The ring to write
+        :type ring: ShmRing()
+        :param doorbell: Write end telling the consumer data is ready
+        :type doorbell: multiprocessing.connection.Connection()
+        :param space: Read end telling the producer room was freed
+        :type space: multiprocessing.connection.Connection()
+        """
+        self.__ring = ring
+        self.__doorbell = doorbell
+        self.__space = space
+        self.__backlog = deque()
+
+    def fileno(self):
+        """
+        The descriptor readable when the consumer has freed room
+        """
+        return self.__space.fileno()
+
+    def get_backlog(self):
+        return len(self.__backlog)
+
+    def fits(self, size):
+        return size <= self.__ring.max_record()
+
+    def send(self, data, written=None):
+        """
+        Write a record or queue it behind earlier records.
+
+        :param data: The payload or a list of payload parts
+        :type data: bytes-like
+        :param written: Called once the record is in the ring and the
+            consumer has been woken
+        :type written: def
+        :return: Whether the record reached the ring now
+        :rtype: bool()
+        """
+        ring = self.__ring
+        if self.__backlog or not ring.try_write(data):
+            if isinstance(data, (list, tuple)):
+                data = b''.join(data)
+            self.__backlog.append((bytes(data), written))
+            ring.set_producer_waiting(True)
+            self.flush()
+            return False
+        self.__ring_doorbell()
+        if written is not None:
+            written()
+        return True
+
+    def flush(self):
+        """
+        Move backlogged records into the ring while they fit.  Call when the
+        space descriptor is readable and periodically as a safety net.
+        """
+        while self.__space.poll():
+            self.__space.recv_bytes()
+        backlog = self.__backlog
+        ring = self.__ring
+        callbacks = []
+        wrote = False
+        while backlog and ring.try_write(backlog[0][0]):
+            _, written = backlog.popleft()
+            if written is not None:
+                callbacks.append(written)
+            wrote = True
+        if backlog:
+            ring.set_producer_waiting(True)
+        else:
+            ring.set_producer_waiting(False)
+        if wrote:
+            self.__ring_doorbell()
+        for written in callbacks:
+            written()
+
+    def close(self):
+        """
+        Close the doorbell pipes.  The ring is closed by its owner.
+        """
+        self.__doorbell.close()
+        self.__space.close()
+
+    def __ring_doorbell(self):
+        ring = self.__ring
+        if ring.consumer_waiting():
+            ring.set_consumer_waiting(False)
+            self.__doorbell.send_bytes(b'\x01')
+
+
+class ShmConsumer(object):
+    """
+    Reads records from a ring.  Before going idle it marks itself waiting
+    and checks the ring once more so a record written meanwhile is not
+    missed.  Python has no memory fences so owners should also call drain on
+    a short timer as a safety net.
+    """
+
+    def __init__(self, ring, doorbell, space):
+        """
+        Constructor
+
+        :param ring: The ring to read
+        :type ring: ShmRing()
+        :param doorbell: Read end woken when data is ready
+        :type doorbell: multiprocessing.connection.Connection()
+        :param space: Write end telling the producer room was freed
+        :type space: multiprocessing.connection.Connection()
+        """
+        self.__ring = ring
+        self.__doorbell = doorbell
+        self.__space = space
+
+    def fileno(self):
+        """
+        The descriptor readable when the producer rang the doorbell
+        """
+        return self.__doorbell.fileno()
+
+    def drain(self, handle, decode=bytes, limit=None):
+        """
+        Read records until the ring is empty or the limit is reached.
+
+        :param handle: Called with each decoded record
+        :type handle: def
+        :param decode: Called with each payload memoryview
+        :type decode: def
+        :param limit: Maximum records to read or None.  When the limit is
+            reached drain must be called again as no doorbell will ring.
+        :type limit: int()
+        :return: The number of records read
+        :rtype: int()
+        """
+        while self.__doorbell.poll():
+            self.__doorbell.recv_bytes()
+        ring = self.__ring
+        count = 0
+        while limit is None or count < limit:
+            ring.set_consumer_waiting(False)
+            item = ring.read(decode)
+            if item is None:
+                ring.set_consumer_waiting(True)
+                if ring.empty():
+                    break
+                continue
+            count += 1
+            if ring.producer_waiting():
+                ring.set_producer_waiting(False)
+                self.__space.send_bytes(b'\x01')
+            handle(item)
+        return count
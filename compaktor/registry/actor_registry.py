@@ -1,25 +1,53 @@
 '''
-The actor registry stores nodes in a b+ tree for
-retrieval and usage.
+The actor registry stores nodes in a tree keyed by name with a flat
+index from full address to node for retrieval and usage.
 
 Created on Oct 14, 2017
 
 @author: aevans
 '''
 
+import asyncio
 import os
+import threading
+import weakref
+from collections import deque
+from compaktor.errors.actor_errors import ChildNodeExistsException
 from compaktor.registry.objects.node import RegistryNode as Node
+from compaktor.registry.objects.snapshot import SHARDS, IndexSnapshot,\
+    empty_shards
+from compaktor.registry.selection import ActorSelection
 from compaktor.state.actor_state import ActorState
+from compaktor.system.shutdown import STOP_CONCURRENCY, stop_tree
+from compaktor.utils.loop_utils import run_on_loop
 from compaktor import registry
 import pdb
 
 
 __REGISTRY = None
 
+# publishes kept for incremental selection refreshes
+CHANGELOG_SIZE = 64
+# states in which an actor is held by strong reference
+_STARTED = (ActorState.RUNNING, ActorState.STOPPED)
+# entries examined for cleanup on every add
+REAP_STEP = 8
+
 
 class Registry(object):
     """
     The registry to use.
+
+    Lookups read an immutable IndexSnapshot without taking a lock.  Writers
+    serialize on a lock, copy the index shards they touch and publish a new
+    snapshot when the write, or the enclosing batch, completes.
+
+    Actors are held by weak reference until they start and then by strong
+    reference until they are retired, so a running actor nobody else
+    references is not collected.  Entries whose actors were collected or
+    reported terminated are queued and removed by reap a few at a time,
+    together with a sweep over the index that finds terminated actors
+    nobody reported.  Every add runs a small reap step.
     """
     def __init__(self, host):
         """
@@ -31,6 +59,23 @@ class Registry(object):
         self.__root = Node(host, None, True)
         self.__sep = os.path.sep
         self.__host = host
+        self.__resolved = {}
+        self.__lock = threading.RLock()
+        self.__depth = 0
+        self.__writer = None
+        self.__dirty = None
+        self.__changes = None
+        self.__changelog = deque(maxlen=CHANGELOG_SIZE)
+        self.__collected = deque()
+        self.__retired = deque()
+        self.__live = set()
+        self.__sweep_shard = 0
+        self.__sweep = None
+        self.__reclaimed_collected = 0
+        self.__reclaimed_terminated = 0
+        shards = empty_shards()
+        shards[IndexSnapshot.shard_of((host,))][(host,)] = self.__root
+        self.__snapshot = IndexSnapshot(0, shards)
 
     def __enter__(self,host):
         """
@@ -44,6 +89,165 @@ class Registry(object):
     def get_host(self):
         return self.__host
 
+    def get_generation(self):
+        """
+        Get the generation of the tree, which changes on every add, removal,
+        move and close
+
+        :return: The generation
+        :rtype: int()
+        """
+        return self.__snapshot.generation
+
+    def get_snapshot(self):
+        """
+        Get the published version of the address index
+
+        :return: The snapshot
+        :rtype: IndexSnapshot()
+        """
+        return self.__snapshot
+
+    def batch(self):
+        """
+        Group mutations into one published version.  Other threads keep
+        seeing the previous version until the outermost batch exits while
+        the writing thread sees its own changes.  Batches nest.  Changes made
+        before an error are still published.  Actors should not be stopped
+        inside a batch since the lock is held throughout.
+
+        :return: A context manager for the batch
+        :rtype: RegistryBatch()
+        """
+        return RegistryBatch(self.__begin, self.__end)
+
+    def __begin(self):
+        """
+        Open a write, taking the writer lock.
+        """
+        self.__lock.acquire()
+        self.__depth += 1
+        if self.__depth == 1:
+            self.__writer = threading.get_ident()
+            self.__dirty = {}
+            self.__changes = []
+
+    def __end(self):
+        """
+        Close a write, publishing when it is the outermost one.
+        """
+        self.__depth -= 1
+        try:
+            if self.__depth == 0:
+                try:
+                    self.__publish()
+                finally:
+                    self.__writer = None
+                    self.__dirty = None
+                    self.__changes = None
+        finally:
+            self.__lock.release()
+
+    def __publish(self):
+        """
+        Publish the shards changed by the write as a new generation and drop
+        every cached resolution.  A resolve racing with the publish stores
+        into the dropped cache.
+        """
+        if not self.__dirty and not self.__changes:
+            return
+        current = self.__snapshot
+        shards = list(current.shards)
+        for i, shard in self.__dirty.items():
+            shards[i] = shard
+        changes = self.__changes
+        if changes is not None:
+            changes = tuple(changes)
+        self.__changelog.append((current.generation + 1, changes))
+        self.__snapshot = IndexSnapshot(current.generation + 1, tuple(shards))
+        self.__resolved = {}
+
+    def get_changes(self, since):
+        """
+        Get the addresses added and removed since a generation, oldest
+        first.  Only the last CHANGELOG_SIZE publishes are kept.
+
+        :param since: The generation the caller is up to date with
+        :type since: int()
+        :return: The generation reached and (address tuple, node) pairs with
+            a node of None for a removal, or None when the changes are no
+            longer known or the registry was closed
+        :rtype: tuple()
+        """
+        generation = self.__snapshot.generation
+        if since >= generation:
+            return generation, ()
+        entries = tuple(self.__changelog)
+        if not entries or entries[0][0] > since + 1:
+            return None
+        changes = []
+        reached = since
+        for entry_generation, entry_changes in entries:
+            if entry_generation <= since:
+                continue
+            if entry_changes is None:
+                return None
+            changes.extend(entry_changes)
+            reached = entry_generation
+        return reached, changes
+
+    def select(self, pattern):
+        """
+        Select the actors whose addresses match a pattern.  Segments are
+        separated by the separator and may use * and ? within a name or be
+        ** to match any number of levels.
+
+        :param pattern: The address pattern
+        :type pattern: str or list
+        :return: The selection
+        :rtype: ActorSelection()
+        """
+        return ActorSelection(self, pattern)
+
+    def get_root(self):
+        """
+        Get the root node
+
+        :return: The root
+        :rtype: RegistryNode()
+        """
+        return self.__root
+
+    def __shard(self, key):
+        """
+        Get the writable copy of the shard holding an address
+
+        :param key: The address tuple
+        :type key: tuple()
+        :return: The shard
+        :rtype: dict()
+        """
+        i = IndexSnapshot.shard_of(key)
+        shard = self.__dirty.get(i)
+        if shard is None:
+            shard = self.__snapshot.shards[i].copy()
+            self.__dirty[i] = shard
+        return shard
+
+    def __lookup(self, key):
+        """
+        Find a node as the writer sees it, including unpublished changes
+
+        :param key: The address tuple
+        :type key: tuple()
+        :return: The node or None
+        :rtype: RegistryNode()
+        """
+        shard = self.__dirty.get(IndexSnapshot.shard_of(key))
+        if shard is None:
+            return self.__snapshot.get(key)
+        return shard.get(key)
+
     def get_sep(self):
         return self.__sep
 
@@ -61,103 +265,197 @@ class Registry(object):
 
     def move_branch(self, old_address, new_parent_address):
         """
-        Move an actor in the registry froman old address to be underneath a new parent.
+        Move an actor in the registry from an old address to be underneath a
+        new parent.  The branch keeps its children and every actor in it is
+        given its new address.
 
         :param old_address: Currently existing address in the registry
         :type old_address: str or list
         :param new_parent_address: Address of the new parent node in the registry
         :type new_parent_address: str or list
+        :raises ChildNodeExistsException: A live actor is in the branch at
+            the name beneath the new parent
         """
-        old = old_address
-        if isinstance(old, str):
-            old = old.split(self.get_sep())
-        else:
-            old = list(old)
+        self.__begin()
+        try:
+            old_n = self.find_node(old_address)
+            if old_n is None or old_n.parent is None:
+                raise ValueError(
+                    "Node not found for path {}".format(old_address))
+            new_n = self.find_node(new_parent_address)
+            if new_n is None:
+                raise ValueError(
+                    "Node not found for path {}".format(new_parent_address))
+            parent = new_n
+            while parent is not None:
+                if parent is old_n:
+                    raise ValueError("Cannot move a branch beneath itself")
+                parent = parent.parent
+            if new_n._children.get(old_n.name) is not old_n:
+                self.__make_room(new_n, old_n.name)
+            self.__detach(old_n)
+            self.__attach(new_n, old_n)
+        finally:
+            self.__end()
+
+    def __path(self, node):
+        """
+        Get the full address of a node
 
-        new_p = new_parent_address
-        if isinstance(new_p, str):
-            new_p = new_p.split(self.get_sep())
-        else:
-            new_p = list(new_p)
-        old_n = self.find_node(old)
-        new_n = self.find_node(new_p)
-        self.remove_branch(old, stop=False)
-        self.__rename_nodes(new_n.__address, old_n)
-        self.add_actor(new_n.address,old_n, new_n.is_local)
-
-    def __rename_nodes(self, new_base, node):
-        """
-        Moving an actor branch requires moving the child nodes to a new address
-
-        :param new_base: The to use with the node
-        :type new_base: list()
-        :param node: The node to rename and re-insert
-        :type node: BaseActor()
-        """
-        address = node.address
-        if address:
-            if isinstance(address, str):
-                address = address.split(self.get_sep())
-            else:
-                address = list(address)
-            n_address = new_base
-            if n_address:
-                n_address.extend(address[:-1])
-                node.address = n_address
-                if node.children:
-                    c_base = node.address
-                    for child in node.children:
-                        self.__rename_nodes(c_base, child)
-
-    def __find_node(self, addr_arr, node, idx):
-        """
-        Find an actor node in the system
-
-        :param addr_arr: The address in the system split by the separator
-        :type addr_arr: list()
-        :param node: The current node for the registry
-        :type node: AbstractActor()
-        :param idx: The current index in the address array
-        :type idx: int()
-        """
-        if idx >= len(addr_arr):
-            return None
-        elif idx == len(addr_arr) - 1:
-            if node.name == addr_arr[len(addr_arr) - 1]:
-                return node
-            else:
-                return None
-        else:
-            idx += 1
-            children = node.children
-            addr_part = addr_arr[idx]
-            if len(children) is 0:
-                return None
-            for child in children:
-                if child.name == addr_part:
-                    return self.__find_node(addr_arr, child, idx)
-        return None
+        :param node: The node
+        :type node: RegistryNode()
+        :return: The names from the root to the node
+        :rtype: tuple()
+        """
+        names = []
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+
+    def __make_room(self, parent, name):
+        """
+        Free a name beneath a parent.  A branch whose actors all terminated
+        or were collected is dropped.
+
+        :param parent: The parent
+        :type parent: RegistryNode()
+        :param name: The name
+        :type name: str()
+        :raises ChildNodeExistsException: A live actor is in the branch at
+            the name
+        """
+        existing = parent._children.get(name)
+        if existing is None:
+            return
+        stack = [existing]
+        while stack:
+            current = stack.pop()
+            actor = current.actor
+            if actor is not None and not self.__terminated(actor):
+                raise ChildNodeExistsException("Node Exists at {}".format(
+                    self.__sep.join(self.__path(existing))))
+            stack.extend(current._children.values())
+        self.__detach(existing)
+
+    def __attach(self, parent, node):
+        """
+        Add a branch beneath a parent, index it and give its actors their
+        addresses.
+
+        :param parent: The new parent
+        :type parent: RegistryNode()
+        :param node: The root of the branch
+        :type node: RegistryNode()
+        :raises ChildNodeExistsException: A live actor is in the branch at
+            the name
+        """
+        self.__make_room(parent, node.name)
+        children = dict(parent._children)
+        children[node.name] = node
+        parent._children = children
+        node.parent = parent
+        stack = [(self.__path(node), node)]
+        while stack:
+            path, current = stack.pop()
+            self.__shard(path)[path] = current
+            if self.__changes is not None:
+                self.__changes.append((path, current))
+            actor = current.actor
+            if actor is not None:
+                actor.address = list(path)
+                join = getattr(actor, '_join_registry', None)
+                if join is not None:
+                    join(self)
+                if getattr(actor, 'get_state', None) is not None and\
+                        actor.get_state() in _STARTED:
+                    self.__live.add(actor)
+            for name, child in current._children.items():
+                stack.append((path + (name,), child))
+
+    def __detach(self, node):
+        """
+        Remove a branch from its parent and from the index
+
+        :param node: The root of the branch
+        :type node: RegistryNode()
+        """
+        parent = node.parent
+        if parent is not None and parent._children.get(node.name) is node:
+            children = dict(parent._children)
+            del children[node.name]
+            parent._children = children
+        stack = [(self.__path(node), node)]
+        while stack:
+            path, current = stack.pop()
+            if self.__lookup(path) is current:
+                if current.actor is not None:
+                    self.__live.discard(current.actor)
+                del self.__shard(path)[path]
+                if self.__changes is not None:
+                    self.__changes.append((path, None))
+            for name, child in current._children.items():
+                stack.append((path + (name,), child))
+        node.parent = None
 
     def find_node(self, address):
         """
-        Find an address in the network.
+        Find an address in the network through the flat address index.
 
         :param address: The address to use
-        :type address: str()
-        :param actor: The actor to add
-        :type actor: AbstractActr()
-        :param is_local: Whether the node is local
-        :type is_local: bool()
+        :type address: str or list
+        :return: The node or None
+        :rtype: RegistryNode()
+        """
+        if isinstance(address, str):
+            key = tuple(address.split(self.__sep))
+        else:
+            key = tuple(address)
+        if self.__writer is not None and\
+                self.__writer == threading.get_ident():
+            return self.__lookup(key)
+        return self.__snapshot.get(key)
+
+    def resolve(self, address):
+        """
+        Find the actor at an address.  Resolutions are cached by weak
+        reference until the tree next changes so repeated sends to an
+        address skip the tree walk.  The thread writing a batch bypasses
+        the cache since it sees changes that are not yet published.
+
+        :param address: The address
+        :type address: str or list
+        :return: The actor or None when none is registered at the address
+        :rtype: AbstractActor()
         """
         if isinstance(address, str):
-            addr_arr = address.split(self.__sep)
+            key = address
         else:
-            addr_arr = list(address)
-        return self.__find_node(addr_arr, self.__root, 0)
+            key = tuple(address)
+        if self.__writer is not None and\
+                self.__writer == threading.get_ident():
+            node = self.find_node(address)
+            if node is None:
+                return None
+            return node.actor
+        resolved = self.__resolved
+        ref = resolved.get(key)
+        if ref is not None:
+            actor = ref()
+            if actor is not None:
+                return actor
+        node = self.find_node(address)
+        if node is None:
+            return None
+        actor = node.actor
+        if actor is not None:
+            resolved[key] = weakref.ref(actor)
+        return actor
 
     def add_actor(self, address, actor, is_local):
         """
-        Add an actor in the network
+        Add an actor in the network.  An entry of a terminated actor at the
+        same name is replaced.
 
         :param address: The address to use
         :type address: str or list
@@ -165,6 +463,8 @@ class Registry(object):
         :type actor: AbstractActr()
         :param is_local: Whether the node is local
         :type is_local: bool()
+        :raises ChildNodeExistsException: A live actor is in the branch at
+            the name
         """
         if address is None:
             raise ValueError("Address must be provided.")
@@ -172,46 +472,102 @@ class Registry(object):
             raise ValueError("Actor must have a name")
         if isinstance(address, str):
             address = address.split(self.__sep)
+        else:
+            address = list(address)
         if len(address) > 0:
             if self.__host not in address and self.__host:
-                addr_t = [self.__host]
-                address = addr_t.extend([x for x in address])
-            node = self.find_node(address)
-            if node is None:
-                raise ValueError(
-                    "Node not Found for Path {}".format(str(address)))
-            new_node = Node(actor.name, actor, is_local)
-            address.append(actor.name)
-            new_node.actor.address = address
-            node.children.append(new_node)
-            new_node.parent = node
+                address = [self.__host] + address
+            self.__begin()
+            try:
+                node = self.find_node(address)
+                if node is None:
+                    raise ValueError(
+                        "Node not Found for Path {}".format(str(address)))
+                self.__attach(node, Node(
+                    actor.name, actor, is_local, self.__collected.append))
+                self.__reap(REAP_STEP)
+            finally:
+                self.__end()
         else:
             raise ValueError("Address Is Empty")
 
-    def __stop_all(self, node):
+    def get_actors(self, node=None):
         """
-        Performs stop on nodes and calls recursively
+        Walk the registry depth first and collect every actor below a node
 
-        :param node: The node to stop and call for children
+        :param node: The start node defaulting to root
         :type node: RegistryNode()
+        :return: (address, actor) pairs with the address joined by the
+            separator
+        :rtype: list()
+        """
+        if node is None:
+            node = self.__root
+        actors = []
+        stack = [([node.name], node)]
+        while stack:
+            path, current = stack.pop()
+            if current.actor is not None:
+                actors.append((self.__sep.join(path), current.actor))
+            for child in reversed(list(current._children.values())):
+                stack.append((path + [child.name], child))
+        return actors
+
+    def __entries(self, node):
         """
-        if node.actor:
-            if node.actor.get_state() == ActorState.RUNNING:
-                node.actor.loop.run_until_complete(node.actor.stop())
-        if node.children:
-            for child in node.children:
-                self.__stop_all(child)
+        Walk a branch and list its entries, parents first
 
-    def stop_all(self, node=None):
+        :param node: The root of the branch
+        :type node: RegistryNode()
+        :return: (address, actor, parent address) triples
+        :rtype: list()
+        """
+        entries = []
+        stack = [(self.__path(node), node, None)]
+        while stack:
+            path, current, parent = stack.pop()
+            address = self.__sep.join(path)
+            entries.append((address, current.actor, parent))
+            for child in reversed(list(current._children.values())):
+                stack.append((path + (child.name,), child, address))
+        return entries
+
+    async def shutdown(self, node=None, concurrency=STOP_CONCURRENCY,
+                       timeout=None):
         """
-        Stop all nodes starting with the provided node or root
+        Stop the actors beneath and including a node concurrently, children
+        before their parents.  May be awaited on a running loop.
 
         :param node: The start node defaulting to root
         :type node: RegistryNode()
+        :param concurrency: Stops allowed to run at once
+        :type concurrency: int()
+        :param timeout: Seconds allowed for the whole shutdown
+        :type timeout: float()
+        :return: The report keyed by address
+        :rtype: ShutdownReport()
         """
         if node is None:
             node = self.__root
-        self.__stop_all(node)
+        return await stop_tree(self.__entries(node), concurrency, timeout)
+
+    def stop_all(self, node=None, concurrency=STOP_CONCURRENCY,
+                 timeout=None):
+        """
+        Stop all nodes starting with the provided node or root.  Blocks
+        until the shutdown finishes on the default loop.
+
+        :param node: The start node defaulting to root
+        :type node: RegistryNode()
+        :param concurrency: Stops allowed to run at once
+        :type concurrency: int()
+        :param timeout: Seconds allowed for the whole shutdown
+        :type timeout: float()
+        :return: The report keyed by address
+        :rtype: ShutdownReport()
+        """
+        return run_on_loop(self.shutdown(node, concurrency, timeout),
+                           asyncio.get_event_loop())
 
     def remove_branch(self, address, stop=True):
         """
@@ -223,19 +579,197 @@ class Registry(object):
         :type stop: bool()
         """
         node = self.find_node(address)
+        if node is not None and node.parent is None:
+            raise ValueError("The root cannot be removed")
         if node:
-            if node.children and stop:
+            if node._children and stop:
                 self.stop_all(node)
-            node.parent.children.remove(node)
+            self.__begin()
+            try:
+                if self.find_node(address) is node:
+                    self.__detach(node)
+            finally:
+                self.__end()
         else:
             raise ValueError("Node not found for path {}".format(address))
 
-    def close(self):
+    def hold(self, actor):
         """
-        Stop the actors in the system and reset the root.
+        Keep a started actor alive until it is retired.  Called by the actor
+        for every registry it is in.
+
+        :param actor: The started actor
+        :type actor: AbstractActor()
+        """
+        self.__live.add(actor)
+
+    def retire(self, actor):
+        """
+        Report a terminated actor so its entry is removed by the next reap
+        and it is only held by weak reference.  Never blocks: a reap step
+        only runs if the registry is not being written.
+
+        :param actor: The terminated actor
+        :type actor: AbstractActor()
+        """
+        self.__live.discard(actor)
+        self.__retired.append(weakref.ref(actor))
+        if self.__lock.acquire(blocking=False):
+            try:
+                self.__begin()
+                try:
+                    self.__reap(REAP_STEP)
+                finally:
+                    self.__end()
+            finally:
+                self.__lock.release()
+
+    def reap(self, limit=64):
+        """
+        Remove entries whose actors were collected or have terminated.  The
+        entries reported by retire and then by collection go first, then
+        the sweep resumes over the index.  An entry with children keeps its
+        place and only loses its actor.
+
+        :param limit: Most entries or index shards to examine
+        :type limit: int()
+        :return: The number of entries reclaimed
+        :rtype: int()
+        """
+        self.__begin()
+        try:
+            return self.__reap(limit)
+        finally:
+            self.__end()
+
+    def __reap(self, limit):
+        """
+        One bounded cleanup step inside a write.
+
+        :param limit: Most entries or index shards to examine
+        :type limit: int()
+        :return: The number of entries reclaimed
+        :rtype: int()
+        """
+        reclaimed = 0
+        retired = self.__retired
+        while limit > 0 and retired:
+            limit -= 1
+            actor = retired.popleft()()
+            address = getattr(actor, 'address', None)
+            if address and self.__terminated(actor):
+                node = self.__lookup(tuple(address))
+                if node is not None and self.__reclaim(node, actor):
+                    self.__reclaimed_terminated += 1
+                    reclaimed += 1
+        collected = self.__collected
+        while limit > 0 and collected:
+            limit -= 1
+            if self.__reclaim(collected.popleft(), None):
+                self.__reclaimed_collected += 1
+                reclaimed += 1
+        wrapped = False
+        while limit > 0:
+            limit -= 1
+            sweep = self.__sweep
+            node = None
+            if sweep is not None:
+                node = next(sweep, None)
+            if node is None:
+                if self.__sweep_shard == SHARDS:
+                    self.__sweep_shard = 0
+                    self.__sweep = None
+                    if wrapped:
+                        break
+                    wrapped = True
+                    continue
+                self.__sweep = iter(tuple(
+                    self.__snapshot.shards[self.__sweep_shard].values()))
+                self.__sweep_shard += 1
+                continue
+            actor = node.actor
+            if actor is None:
+                if node.parent is not None and not node._children:
+                    self.__reclaim(node, None)
+            elif self.__terminated(actor) and self.__reclaim(node, actor):
+                self.__reclaimed_terminated += 1
+                reclaimed += 1
+        return reclaimed
+
+    @staticmethod
+    def __terminated(actor):
+        get_state = getattr(actor, 'get_state', None)
+        return get_state is not None and\
+            get_state() is ActorState.TERMINATED
+
+    def __reclaim(self, node, actor):
         """
-        self.stop_all()
-        self.__root = Node(self.__host, actor=None, is_local=True)
+        Drop an entry that is still indexed and still holds the actor.
+        Parents left without an actor or children are dropped too.
+
+        :param node: The entry
+        :type node: RegistryNode()
+        :param actor: The actor it must hold, None for a collected actor
+        :type actor: AbstractActor()
+        :return: Whether the entry was dropped
+        :rtype: bool()
+        """
+        path = self.__path(node)
+        if node.parent is None or self.__lookup(path) is not node or\
+                node.actor is not actor:
+            return False
+        if node._children:
+            node.actor = None
+            if self.__changes is not None:
+                self.__changes.append((path, None))
+            return True
+        parent = node.parent
+        self.__detach(node)
+        while parent.parent is not None and parent.actor is None and\
+                not parent._children:
+            node = parent
+            parent = node.parent
+            self.__detach(node)
+        return True
+
+    def get_stats(self):
+        """
+        Get the entry counters
+
+        :return: Indexed entries below the root, entries queued for
+            cleanup and entries reclaimed after collection or termination
+        :rtype: dict()
+        """
+        return {
+            'entries': len(self.__snapshot) - 1,
+            'pending': len(self.__collected) + len(self.__retired),
+            'reclaimed_collected': self.__reclaimed_collected,
+            'reclaimed_terminated': self.__reclaimed_terminated}
+
+    def close(self, timeout=None):
+        """
+        Stop the actors in the system and reset the root.  The registry lets
+        go of every actor it still held, including ones that failed to stop.
+
+        :param timeout: Seconds allowed for stopping the actors
+        :type timeout: float()
+        :return: The shutdown report
+        :rtype: ShutdownReport()
+        """
+        report = self.stop_all(timeout=timeout)
+        self.__begin()
+        try:
+            self.__dirty.update(enumerate(empty_shards()))
+            self.__root = Node(self.__host, actor=None, is_local=True)
+            key = (self.__host,)
+            self.__shard(key)[key] = self.__root
+            self.__changes = None
+            self.__live.clear()
+            self.__retired.clear()
+            self.__collected.clear()
+        finally:
+            self.__end()
+        return report
 
     def __exit__(self):
         """
@@ -244,6 +778,25 @@ class Registry(object):
         self.close()
 
 
+class RegistryBatch(object):
+    """
+    Context manager for Registry.batch
+    """
+
+    __slots__ = ('__begin', '__end')
+
+    def __init__(self, begin, end):
+        self.__begin = begin
+        self.__end = end
+
+    def __enter__(self):
+        self.__begin()
+        return self
+
+    def __exit__(self, *args):
+        self.__end()
+
+
 def get_registry(host="localhost"):
     """
     Get the registry.
@@ -5,11 +5,48 @@ Created on Oct 14, 2017
 @author: aevans
 '''
 
+import weakref
+
+
 class RegistryNode:
+    """
+    A registry entry.  The actor is held by weak reference so the registry
+    never keeps an actor alive.  When it is collected the node is passed to
+    on_collect, which runs wherever the collection happens and must only
+    queue the node.
 
-    def __init__(self, name, actor, is_local):
+    The registry keeps the children by name in _children.  A write replaces
+    the dict instead of changing it, so readers walking without the lock
+    always see a whole snapshot.  children lists the child nodes.
+    """
+
+    def __init__(self, name, actor, is_local, on_collect=None):
         self.name = name
-        self.actor = actor
         self.is_local = is_local
-        self.children = []
+        self._children = {}
         self.parent = None
+        self.__on_collect = on_collect
+        self.__ref = None
+        self.actor = actor
+
+    @property
+    def actor(self):
+        ref = self.__ref
+        if ref is None:
+            return None
+        return ref()
+
+    @actor.setter
+    def actor(self, actor):
+        if actor is None:
+            self.__ref = None
+        elif self.__on_collect is None:
+            self.__ref = weakref.ref(actor)
+        else:
+            on_collect = self.__on_collect
+            self.__ref = weakref.ref(
+                actor, lambda ref, node=self: on_collect(node))
+
+    @property
+    def children(self):
+        return list(self._children.values())
@@ -0,0 +1,69 @@
+'''
+A published version of the registry address index.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+SHARDS = 256
+
+
+class IndexSnapshot(object):
+    """
+    An immutable version of the index from full address tuple to registry
+    node.  Addresses are spread over a fixed number of shard dicts so a new
+    version copies only the shards a change touches and shares the rest.
+    Neither the snapshot nor its shards are modified once published, so
+    readers need no lock.
+    """
+
+    __slots__ = ('generation', 'shards')
+
+    def __init__(self, generation, shards):
+        """
+        Constructor
+
+        :param generation: The registry generation of the version
+        :type generation: int()
+        :param shards: SHARDS dicts of address tuple to node
+        :type shards: tuple()
+        """
+        self.generation = generation
+        self.shards = shards
+
+    @staticmethod
+    def shard_of(key):
+        """
+        Get the shard holding an address
+
+        :param key: The address tuple
+        :type key: tuple()
+        :return: The shard number
+        :rtype: int()
+        """
+        return hash(key) % SHARDS
+
+    def get(self, key):
+        """
+        Get the node at an address
+
+        :param key: The address tuple
+        :type key: tuple()
+        :return: The node or None
+        :rtype: RegistryNode()
+        """
+        return self.shards[hash(key) % SHARDS].get(key)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+
+def empty_shards():
+    """
+    Get a fresh set of empty shards
+
+    :return: SHARDS empty dicts
+    :rtype: tuple()
+    """
+    return tuple({} for _ in range(SHARDS))
@@ -0,0 +1,294 @@
+'''
+Selection of registered actors by address pattern.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+from fnmatch import fnmatchcase
+from threading import Lock
+
+
+LITERAL = 0
+GLOB = 1
+ANY_LEVELS = 2
+
+
+def compile_pattern(pattern, sep):
+    """
+    Split an address pattern into (kind, value) segments
+
+    :param pattern: The pattern
+    :type pattern: str or list
+    :param sep: The address separator
+    :type sep: str()
+    :return: The segments
+    :rtype: tuple()
+    """
+    if isinstance(pattern, str):
+        parts = pattern.split(sep)
+    else:
+        parts = list(pattern)
+    if not parts or '' in parts:
+        raise ValueError("Invalid selection pattern {}".format(pattern))
+    segments = []
+    for part in parts:
+        if part == '**':
+            if not segments or segments[-1][0] is not ANY_LEVELS:
+                segments.append((ANY_LEVELS, None))
+        elif '*' in part or '?' in part or '[' in part:
+            segments.append((GLOB, part))
+        else:
+            segments.append((LITERAL, part))
+    return tuple(segments)
+
+
+def match_path(segments, path, i=0, j=0):
+    """
+    Whether an address matches compiled segments
+
+    :param segments: The compiled pattern
+    :type segments: tuple()
+    :param path: The address
+    :type path: tuple()
+    :param i: The segment to match from
+    :type i: int()
+    :param j: The address part to match from
+    :type j: int()
+    :return: Whether it matches
+    :rtype: bool()
+    """
+    while i < len(segments):
+        kind, value = segments[i]
+        if kind is ANY_LEVELS:
+            if i + 1 == len(segments):
+                return True
+            for k in range(j, len(path)):
+                if match_path(segments, path, i + 1, k):
+                    return True
+            return False
+        if j == len(path):
+            return False
+        if kind is LITERAL:
+            if path[j] != value:
+                return False
+        elif not fnmatchcase(path[j], value):
+            return False
+        i += 1
+        j += 1
+    return j == len(path)
+
+
+class ActorSelection(object):
+    """
+    The actors whose registry addresses match a pattern such as
+    localhost/ingest/*/parser-* or **/metrics.  Segments may use * and ?
+    within a name, and a ** segment matches any number of levels.
+
+    Matching walks the registry tree, following literal segments by name
+    and only scanning the children of wildcard levels.  The matching
+    registry nodes are kept until the registry generation changes and then
+    refreshed from the registry change log, so a selection costs nothing to
+    reuse and only re-walks the tree when the log no longer covers its
+    generation.  Like the registry, a selection does not keep its actors
+    alive.
+    """
+
+    def __init__(self, registry, pattern):
+        """
+        Constructor
+
+        :param registry: The registry to select from
+        :type registry: Registry()
+        :param pattern: The address pattern
+        :type pattern: str or list
+        """
+        self.__registry = registry
+        self.__pattern = pattern
+        self.__segments = compile_pattern(pattern, registry.get_sep())
+        self.__lock = Lock()
+        self.__generation = None
+        self.__matches = {}
+        self.__nodes = ()
+        self.__refreshes = 0
+        self.__rebuilds = 0
+
+    def get_pattern(self):
+        return self.__pattern
+
+    def get_stats(self):
+        """
+        Get how often the selection was refreshed
+
+        :return: Incremental refreshes and full rebuilds
+        :rtype: dict()
+        """
+        return {
+            'refreshes': self.__refreshes,
+            'rebuilds': self.__rebuilds,
+            'matches': len(self.__nodes)}
+
+    def __get_nodes(self):
+        """
+        Get the matching nodes, refreshing them if the registry changed.
+        The same tuple is returned until the selection changes.
+
+        :return: The nodes
+        :rtype: tuple()
+        """
+        if self.__generation != self.__registry.get_generation():
+            self.__refresh()
+        return self.__nodes
+
+    def get_actors(self):
+        """
+        Get the selected actors
+
+        :return: The actors
+        :rtype: list()
+        """
+        actors = []
+        for node in self.__get_nodes():
+            actor = node.actor
+            if actor is not None:
+                actors.append(actor)
+        return actors
+
+    def get_addresses(self):
+        """
+        Get the addresses of the selected actors
+
+        :return: The address tuples
+        :rtype: list()
+        """
+        self.__get_nodes()
+        return [path for path, node in list(self.__matches.items())
+                if node.actor is not None]
+
+    def __len__(self):
+        return len(self.get_actors())
+
+    def __iter__(self):
+        for node in self.__get_nodes():
+            actor = node.actor
+            if actor is not None:
+                yield actor
+
+    async def tell(self, sender, message):
+        """
+        Send a message to every selected actor.  Each recipient is offered
+        the message without waiting and the sender only waits on a full
+        mailbox.
+
+        :param sender: The sending actor
+        :type sender: AbstractActor()
+        :param message: The message, shared by every recipient
+        :type message: Message()
+        :return: The number of actors the message was sent to
+        :rtype: int()
+        """
+        sent = 0
+        tell_nowait = sender.tell_nowait
+        for node in self.__get_nodes():
+            actor = node.actor
+            if actor is None:
+                continue
+            if tell_nowait(actor, message) is None:
+                await sender.tell(actor, message)
+            sent += 1
+        return sent
+
+    def __refresh(self):
+        """
+        Bring the selection up to date with the registry.
+        """
+        with self.__lock:
+            registry = self.__registry
+            generation = self.__generation
+            changes = None
+            if generation is not None:
+                changes = registry.get_changes(generation)
+            if changes is None:
+                generation = registry.get_generation()
+                matches = {}
+                self.__walk(registry.get_root(), (), 0, matches)
+                self.__rebuilds += 1
+            else:
+                generation, changes = changes
+                matches = self.__matches
+                if changes:
+                    matches = dict(matches)
+                    segments = self.__segments
+                    for path, node in changes:
+                        if node is None:
+                            matches.pop(path, None)
+                        elif node.actor is not None and\
+                                match_path(segments, path):
+                            matches[path] = node
+                self.__refreshes += 1
+            if matches is not self.__matches:
+                self.__matches = matches
+                self.__nodes = tuple(matches.values())
+            self.__generation = generation
+
+    def __walk(self, node, parent_path, i, matches):
+        """
+        Collect the actors matching the pattern from segment i at a node.
+
+        :param node: The node the segment is matched against
+        :type node: RegistryNode()
+        :param parent_path: The address of the node's parent
+        :type parent_path: tuple()
+        :param i: The segment
+        :type i: int()
+        :param matches: Address to node of the matches so far
+        :type matches: dict()
+        """
+        segments = self.__segments
+        kind, value = segments[i]
+        path = parent_path + (node.name,)
+        if kind is ANY_LEVELS:
+            if i + 1 == len(segments):
+                self.__collect(node, path, matches)
+                return
+            self.__walk(node, parent_path, i + 1, matches)
+            for child in list(node._children.values()):
+                self.__walk(child, path, i, matches)
+            return
+        if kind is LITERAL:
+            if node.name != value:
+                return
+        elif not fnmatchcase(node.name, value):
+            return
+        if i + 1 == len(segments):
+            if node.actor is not None:
+                matches[path] = node
+            return
+        next_kind, next_value = segments[i + 1]
+        if next_kind is LITERAL:
+            child = node._children.get(next_value)
+            if child is not None:
+                self.__walk(child, path, i + 1, matches)
+        else:
+            for child in list(node._children.values()):
+                self.__walk(child, path, i + 1, matches)
+
+    def __collect(self, node, path, matches):
+        """
+        Collect every actor in a branch.
+
+        :param node: The root of the branch
+        :type node: RegistryNode()
+        :param path: The address of the root
+        :type path: tuple()
+        :param matches: Address to node of the matches so far
+        :type matches: dict()
+        """
+        stack = [(path, node)]
+        while stack:
+            path, current = stack.pop()
+            if current.actor is not None:
+                matches[path] = current
+            for name, child in list(current._children.items()):
+                stack.append((path + (name,), child))
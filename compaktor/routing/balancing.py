@@ -24,7 +24,7 @@ class BalancingRouter(BaseActor):
     """
 
     def __init__(self, name=None, loop=None, address=None, mailbox_size=10000,
-                 inbox=None, actors=[]):
+                 inbox=None, actors=None):
         if name is None:
             name = NameCreationUtils.get_name_base()
             name += "_"
@@ -36,6 +36,8 @@ class BalancingRouter(BaseActor):
             self.__queue = inbox
         self.__queue = asyncio.Queue(maxsize=mailbox_size)
         self.__router_queue = BlockingQueue(max_size=mailbox_size)
+        if actors is None:
+            actors = []
         self.actor_set = actors
         self.register_handler(RouteAsk, self.route_ask)
         self.register_handler(RouteTell, self.route_tell)
@@ -87,8 +89,8 @@ class BalancingRouter(BaseActor):
                 self.actor_set.append(actor)
                 if self.address and actor.name:
                     node_addr = [x for x in self.address]
-                    node_addr.append(actor.name)
                     registry.get_registry().add_actor(node_addr, actor, True)
+                    actor.set_address(node_addr)
             actor.__inbox = self.__router_queue
             if self.sys_path is not None and self.actor_system is not None:
                 self.actor_system.add_actor(actor, self.sys_path)
@@ -137,7 +139,7 @@ class BalancingRouter(BaseActor):
         try:
             assert isinstance(message.payload, QueryMessage)
             message = message.payload
-            if not message.result:
+            if not getattr(message, 'result', None):
                 message.result = asyncio.Future(loop=self.loop)
             await self.__router_queue.put(message)
             res = await message.result
@@ -21,7 +21,7 @@ class RandomRouter(BaseActor):
     """
 
     def __init__(self,  name=None, loop=None, address=None, mailbox_size=10000,\
-                actors=[], inbox=None):
+                actors=None, inbox=None):
         if name is None:
             name = NameCreationUtils.get_name_base()
             name += "_"
@@ -29,6 +29,8 @@ class RandomRouter(BaseActor):
         if address is None:
             address = name
         super().__init__(name, loop, address, mailbox_size, inbox)
+        if actors is None:
+            actors = []
         self.actor_set = actors
         if self.actor_set:
             self.actor_set = list(set(self.actor_set))
@@ -145,8 +147,7 @@ class RandomRouter(BaseActor):
             sender = message.sender
             if sender is None:
                 sender = self
-            fut = asyncio.run_coroutine_threadsafe(sender.tell(actor, message))
-            fut.result(15)
+            await sender.tell(actor, message)
         except Exception as e:
             self.handle_fail()
 
@@ -188,8 +189,6 @@ class RandomRouter(BaseActor):
                 self.last_active_check = 0
     
             for actor in self.actor_set:
-                fut = asyncio.run_coroutine_threadsafe(
-                    sender.tell(actor, message), loop=self.loop)
-                fut.result(15)
+                await sender.tell(actor, message)
         except Exception as e:
             self.handle_fail()
@@ -22,7 +22,7 @@ class RoundRobinRouter(BaseActor):
     """
 
     def __init__(self, name=None, loop=None, address=None, mailbox_size=10000,
-                 inbox=None, actors=[]):
+                 inbox=None, actors=None):
         if name is None:
             name = str(NameCreationUtils.get_name_base())
             name += "_"
@@ -31,6 +31,8 @@ class RoundRobinRouter(BaseActor):
             address = name
         super().__init__(name, loop, address, mailbox_size, inbox)
         self.name = name
+        if actors is None:
+            actors = []
         self.actor_set = actors
         self.current_index = atomic.AtomicInteger()
         self.actor_system = None
@@ -175,10 +177,5 @@ class RoundRobinRouter(BaseActor):
         if message.sender is not None:
             sender = message.sender
 
-        rfuncs = []
-        for actor in self.actor_set:
-            fut = asyncio.run_coroutine_threadsafe(
-                sender.tell(actor, message), self.loop)
-            rfuncs.append(fut)
-        for func in rfuncs:
-            func.result(15)
+        await asyncio.gather(
+            *[sender.tell(actor, message) for actor in self.actor_set])
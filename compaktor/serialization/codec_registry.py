@@ -0,0 +1,153 @@
+'''
+Registry mapping message classes to codecs.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import struct
+from threading import Lock
+from compaktor.serialization.codecs import PickleCodec
+
+
+__CODEC_REGISTRY = None
+__registry_lock = Lock()
+
+_KEY = struct.Struct('!H')
+
+
+class CodecRegistry(object):
+    """
+    Chooses the codec for each message class.  Classes opt in with
+    register or the use_codec decorator and subclasses inherit the codec of
+    their nearest registered parent unless that codec only fits its own
+    class.  Everything else uses pickle.
+
+    Codecs are numbered in registration order and the number is sent with
+    each message, so every process must register the same codecs in the
+    same order.  Registering at import time next to the message class does
+    this.
+    """
+
+    def __init__(self, default=None):
+        """
+        Constructor
+
+        :param default: The codec for unregistered classes
+        :type default: Codec()
+        """
+        if default is None:
+            default = PickleCodec()
+        self.__codecs = [default]
+        self.__keys = {}
+        self.__cache = {}
+
+    def register(self, message_cls, codec):
+        """
+        Use a codec for a message class and its subclasses
+
+        :param message_cls: The message class
+        :type message_cls: <class Message>
+        :param codec: The codec
+        :type codec: Codec()
+        :return: The key sent with encoded messages
+        :rtype: int()
+        """
+        key = len(self.__codecs)
+        self.__codecs.append(codec)
+        self.__keys[message_cls] = key
+        self.__cache = {}
+        return key
+
+    def key_for(self, message_cls):
+        """
+        Find the codec key for a class by walking its MRO.  Parent codecs
+        that are not inherited are skipped.
+
+        :param message_cls: The message class
+        :type message_cls: <class Message>
+        :return: The codec key
+        :rtype: int()
+        """
+        key = self.__cache.get(message_cls)
+        if key is None:
+            key = 0
+            for cls in message_cls.__mro__:
+                found = self.__keys.get(cls)
+                if found is None:
+                    continue
+                if cls is message_cls or self.__codecs[found].inherited:
+                    key = found
+                    break
+            self.__cache[message_cls] = key
+        return key
+
+    def get_codec(self, key):
+        return self.__codecs[key]
+
+    def encode(self, message):
+        """
+        Encode a message with its codec
+
+        :param message: The message
+        :type message: Message()
+        :return: The key frame followed by the codec frames
+        :rtype: list()
+        """
+        return self.encode_with(self.key_for(type(message)), message)
+
+    def encode_with(self, key, message):
+        """
+        Encode a message with the codec for a key already looked up
+
+        :param key: The codec key
+        :type key: int()
+        :param message: The message
+        :type message: Message()
+        :return: The key frame followed by the codec frames
+        :rtype: list()
+        """
+        frames = self.__codecs[key].encode(message)
+        frames.insert(0, _KEY.pack(key))
+        return frames
+
+    def decode(self, frames):
+        """
+        Decode frames produced by encode
+
+        :param frames: The frames
+        :type frames: list()
+        :return: The message
+        :rtype: Message()
+        """
+        key = _KEY.unpack(frames[0])[0]
+        return self.__codecs[key].decode(frames[1:])
+
+
+def get_codec_registry():
+    """
+    Get the codec registry
+    """
+    global __CODEC_REGISTRY
+    if __CODEC_REGISTRY is None:
+        with __registry_lock:
+            if __CODEC_REGISTRY is None:
+                __CODEC_REGISTRY = CodecRegistry()
+    return __CODEC_REGISTRY
+
+
+def use_codec(codec):
+    """
+    Class decorator registering a codec for a message class
+
+    :param codec: The codec, or a callable taking the class and returning one
+    :type codec: Codec()
+    """
+    def decorate(message_cls):
+        chosen = codec
+        if not hasattr(chosen, 'encode'):
+            chosen = chosen(message_cls)
+        get_codec_registry().register(message_cls, chosen)
+        return message_cls
+    return decorate
@@ -0,0 +1,148 @@
+'''
+Message codecs.  A codec turns a message into a list of frames and back.
+The first frame carries the encoded message and any further frames are raw
+buffers sent out of band so large payloads are never copied into it.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import copy
+import pickle
+import struct
+
+
+class Codec(object):
+    """
+    Base codec to be extended.  A codec that rebuilds one fixed class sets
+    inherited to False so subclasses of that class are not encoded with it.
+    """
+
+    inherited = True
+
+    def encode(self, message):
+        """
+        Encode a message
+
+        :param message: The message to encode
+        :type message: Message()
+        :return: The frames, each a bytes-like object
+        :rtype: list()
+        """
+        raise NotImplementedError(
+            "The method encode Not Yet Implemented in Codec.")
+
+    def decode(self, frames):
+        """
+        Decode a message.  The first frame may be a view on transport memory
+        that is reused once decode returns so it must not be kept.  Later
+        frames belong to the decoded message.
+
+        :param frames: The frames produced by encode
+        :type frames: list()
+        :return: The message
+        :rtype: Message()
+        """
+        raise NotImplementedError(
+            "The method decode Not Yet Implemented in Codec.")
+
+
+class PickleCodec(Codec):
+    """
+    Pickle protocol 5 with out of band buffers.  Objects that pickle as
+    PickleBuffer, such as numpy arrays, travel as separate frames.  A bytes,
+    bytearray or memoryview payload at or above the threshold is wrapped in
+    a PickleBuffer so it travels the same way.  Out of band payloads arrive
+    as the buffer the transport delivers, bytes for the built-in transports.
+    """
+
+    PROTOCOL = 5
+
+    def __init__(self, threshold=1024):
+        """
+        Constructor
+
+        :param threshold: Smallest bytes-like payload in bytes sent out of
+            band
+        :type threshold: int()
+        """
+        self.__threshold = threshold
+
+    def prepare(self, message):
+        """
+        Mark a large bytes-like payload for out of band transfer.  The
+        message is only copied when its payload is wrapped.
+
+        :param message: The message
+        :type message: Message()
+        :return: The message to pickle
+        :rtype: Message()
+        """
+        payload = getattr(message, 'payload', None)
+        if isinstance(payload, (bytes, bytearray, memoryview)) and\
+                memoryview(payload).nbytes >= self.__threshold:
+            message = copy.copy(message)
+            message.payload = pickle.PickleBuffer(payload)
+        return message
+
+    def dumps(self, obj):
+        """
+        Pickle any object, returning the pickle and its out of band buffers
+
+        :param obj: The object
+        :type obj: object
+        :return: The frames
+        :rtype: list()
+        """
+        buffers = []
+        frames = [pickle.dumps(obj, self.PROTOCOL,
+                               buffer_callback=buffers.append)]
+        for buffer in buffers:
+            frames.append(buffer.raw())
+        return frames
+
+    def encode(self, message):
+        return self.dumps(self.prepare(message))
+
+    def decode(self, frames):
+        return pickle.loads(frames[0], buffers=frames[1:])
+
+
+class StructCodec(Codec):
+    """
+    Packs the payload of a fixed schema message with struct.  A format with
+    one field carries a scalar payload and longer formats a tuple.  The
+    sender is not sent.  Messages always decode into the registered class
+    so subclasses do not inherit the codec.
+    """
+
+    inherited = False
+
+    def __init__(self, message_cls, fmt):
+        """
+        Constructor
+
+        :param message_cls: The message class decoded into
+        :type message_cls: <class Message>
+        :param fmt: The struct format of the payload
+        :type fmt: str()
+        """
+        self.__message_cls = message_cls
+        self.__struct = struct.Struct(fmt)
+        self.__scalar = len(self.__struct.unpack(
+            bytes(self.__struct.size))) == 1
+
+    def get_message_class(self):
+        return self.__message_cls
+
+    def encode(self, message):
+        if self.__scalar:
+            return [self.__struct.pack(message.payload)]
+        return [self.__struct.pack(*message.payload)]
+
+    def decode(self, frames):
+        values = self.__struct.unpack(frames[0])
+        if self.__scalar:
+            return self.__message_cls(values[0])
+        return self.__message_cls(values)
@@ -0,0 +1,123 @@
+'''
+Framing for lists of buffers.  A header gives the frame count, how many
+frames follow it in the same buffer and every frame size.  Small frames
+travel inline with the header and large ones are written separately so
+they are never copied into a joined buffer.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import struct
+
+
+_COUNTS = struct.Struct('!II')
+_SIZES = {}
+INLINE_LIMIT = 1 << 16
+
+
+def _sizes(count):
+    sizes = _SIZES.get(count)
+    if sizes is None:
+        sizes = struct.Struct('!{}I'.format(count))
+        _SIZES[count] = sizes
+    return sizes
+
+
+def frame_size(frame):
+    """
+    Get the size of a frame in bytes
+
+    :param frame: The frame
+    :type frame: bytes-like
+    :return: The byte count
+    :rtype: int()
+    """
+    if isinstance(frame, (bytes, bytearray)):
+        return len(frame)
+    return memoryview(frame).nbytes
+
+
+def frame_header(frames, inline=None):
+    """
+    Build the header for a list of frames
+
+    :param frames: The frames
+    :type frames: list()
+    :param inline: How many frames follow the header in the same buffer,
+        all of them by default
+    :type inline: int()
+    :return: The header
+    :rtype: bytes()
+    """
+    if inline is None:
+        inline = len(frames)
+    sizes = [frame_size(frame) for frame in frames]
+    return _COUNTS.pack(len(sizes), inline) + _sizes(len(sizes)).pack(*sizes)
+
+
+def split_frames(view):
+    """
+    Split a buffer starting with a header into frame views without copying
+
+    :param view: The buffer
+    :type view: bytes-like
+    :return: The inline frames and the sizes of frames sent separately
+    :rtype: tuple()
+    """
+    view = memoryview(view)
+    if view.format != 'B':
+        view = view.cast('B')
+    count, inline = _COUNTS.unpack_from(view, 0)
+    offset = _COUNTS.size + 4 * count
+    if count == 1 and inline == 1:
+        return [view[offset:]], ()
+    sizes = _sizes(count).unpack_from(view, _COUNTS.size)
+    frames = []
+    for size in sizes[:inline]:
+        frames.append(view[offset:offset + size])
+        offset += size
+    return frames, sizes[inline:]
+
+
+def send_frames(conn, frames, inline_limit=INLINE_LIMIT):
+    """
+    Write frames to a connection.  Leading frames are joined with the header
+    while they fit under the inline limit and the rest are written as they
+    are.
+
+    :param conn: The connection
+    :type conn: multiprocessing.connection.Connection()
+    :param frames: The frames
+    :type frames: list()
+    :param inline_limit: Bytes of frames to join with the header
+    :type inline_limit: int()
+    """
+    inline = 0
+    total = 0
+    for frame in frames:
+        total += frame_size(frame)
+        if total > inline_limit:
+            break
+        inline += 1
+    parts = [frame_header(frames, inline)]
+    parts.extend(frames[:inline])
+    conn.send_bytes(b''.join(parts))
+    for frame in frames[inline:]:
+        conn.send_bytes(frame)
+
+
+def recv_frames(conn):
+    """
+    Read frames written by send_frames
+
+    :param conn: The connection
+    :type conn: multiprocessing.connection.Connection()
+    :return: The frames
+    :rtype: list()
+    """
+    frames, rest = split_frames(conn.recv_bytes())
+    for _ in rest:
+        frames.append(conn.recv_bytes())
+    return frames
@@ -0,0 +1,725 @@
+'''
+Actor mailboxes with selectable overflow policies.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from compaktor.errors.actor_errors import MailboxFullError
+from compaktor.message.message_objects import MessageTag
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
+
+
+# raised by a get on a wrapped queue that was closed or shut down
+QUEUE_CLOSED_ERRORS = (RuntimeError,)
+if hasattr(asyncio, 'QueueShutDown'):
+    QUEUE_CLOSED_ERRORS += (asyncio.QueueShutDown,)
+
+
+class OverflowPolicy(Enum):
+    """
+    What a mailbox does with a message that arrives while it is full.
+
+    - BLOCK:  Wait until there is room
+    - BLOCK_TIMEOUT:  Wait up to the put timeout then reject with an error
+    - DROP_NEWEST:  Drop the incoming message
+    - DROP_OLDEST:  Drop the oldest queued message to make room
+    - REJECT:  Raise a MailboxFullError to the sender
+    - DEAD_LETTER:  Redirect the incoming message to the dead letters
+    """
+    BLOCK = 0
+    BLOCK_TIMEOUT = 1
+    DROP_NEWEST = 2
+    DROP_OLDEST = 3
+    REJECT = 4
+    DEAD_LETTER = 5
+
+
+class Mailbox(object):
+    """
+    A bounded FIFO mailbox bound to a single event loop.  Overflow is
+    handled by the configured policy and counted.
+
+    Control messages (tagged with MessageTag.CONTROL such as PoisonPill,
+    DeSubscribe and Tick) go to a separate unbounded lane that is always
+    read first.  User messages stay FIFO among themselves.
+
+    With timing on, the enqueue time of each user message is kept beside
+    it and the time of the last one dequeued is available from
+    get_enqueue_time.
+    """
+
+    def __init__(self, maxsize=0, loop=None, policy=OverflowPolicy.BLOCK,
+                 put_timeout=None, dead_letters=None):
+        """
+        Constructor
+
+        :param maxsize: Maximum number of queued messages.  0 is unbounded.
+        :type maxsize: int()
+        :param loop: The loop the mailbox is read from
+        :type loop: AbstractEventLoop()
+        :param policy: The overflow policy
+        :type policy: OverflowPolicy()
+        :param put_timeout: Seconds to wait under BLOCK_TIMEOUT
+        :type put_timeout: float()
+        :param dead_letters: Called with (message, reason) under DEAD_LETTER,
+            the dead letter office by default
+        :type dead_letters: def
+        """
+        if policy is OverflowPolicy.BLOCK_TIMEOUT and put_timeout is None:
+            raise ValueError("BLOCK_TIMEOUT requires a put timeout")
+        self._loop = loop
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        self._maxsize = maxsize
+        self._policy = policy
+        self._put_timeout = put_timeout
+        self._dead_letters = dead_letters
+        self._dropped = 0
+        self._rejected = 0
+        self._redirected = 0
+        self._enqueued = 0
+        self._dequeued = 0
+        self._max_depth = 0
+        self._control = deque()
+        self.__items = deque()
+        self.__getters = deque()
+        self.__putters = deque()
+        self.__stamps = None
+        self.__enqueue_time = None
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def get_policy(self):
+        """
+        Get the overflow policy
+
+        :return: The policy
+        :rtype: OverflowPolicy()
+        """
+        return self._policy
+
+    def set_dead_letters(self, dead_letters):
+        """
+        Set the callable receiving (message, reason) under DEAD_LETTER
+
+        :param dead_letters: The dead letter callable
+        :type dead_letters: def
+        """
+        self._dead_letters = dead_letters
+
+    def set_timing(self, enabled):
+        """
+        Start or stop recording when user messages are enqueued.  Messages
+        already queued are stamped with the current time.
+
+        :param enabled: Whether to record enqueue times
+        :type enabled: bool()
+        """
+        if not enabled:
+            self.__stamps = None
+            self.__enqueue_time = None
+        elif self.__stamps is None:
+            now = time.perf_counter()
+            self.__stamps = deque(now for _ in self.__items)
+
+    def get_enqueue_time(self):
+        """
+        Get the enqueue time of the last user message dequeued
+
+        :return: The perf_counter time or None when timing is off
+        :rtype: float()
+        """
+        return self.__enqueue_time
+
+    def qsize(self):
+        return len(self.__items)
+
+    def empty(self):
+        return not self.__items and not self._control
+
+    def full(self):
+        return 0 < self._maxsize <= len(self.__items)
+
+    def get_stats(self):
+        """
+        Get the traffic and overflow counters
+
+        :return: The depth and highest depth seen, enqueued and dequeued
+            user messages and dropped, rejected and redirected counts
+        :rtype: dict()
+        """
+        return {
+            'policy': self._policy.name,
+            'depth': self.qsize(),
+            'max_depth': self._max_depth,
+            'enqueued': self._enqueued,
+            'dequeued': self._dequeued,
+            'control_depth': len(self._control),
+            'dropped': self._dropped,
+            'rejected': self._rejected,
+            'redirected': self._redirected}
+
+    def _count_enqueued(self):
+        """
+        Count a user message enqueued and track the highest depth.
+        """
+        self._enqueued += 1
+        depth = self.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+    def _wakeup_next(self, waiters):
+        """
+        Wake the first waiter that is still waiting.
+
+        :param waiters: Getter or putter futures
+        :type waiters: deque()
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def close(self):
+        """
+        Release the mailbox once its reader has stopped.  Queued messages
+        are kept.
+        """
+
+    def put_control(self, item):
+        """
+        Enqueue on the control lane.  The lane is unbounded and bypasses the
+        overflow policy.
+
+        :param item: The control message
+        :type item: Message()
+        """
+        self._control.append(item)
+        self._notify_control()
+
+    def _notify_control(self):
+        """
+        Wake a reader for a new control message.
+        """
+        self._wakeup_next(self.__getters)
+
+    def put_nowait(self, item):
+        """
+        Enqueue without waiting or applying the overflow policy.
+
+        :param item: The message
+        :type item: Message()
+        """
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+            return
+        if self.full():
+            raise asyncio.QueueFull()
+        self.__append(item)
+
+    def __append(self, item):
+        """
+        Append a user message there is room for and wake a reader.
+
+        :param item: The message
+        :type item: Message()
+        """
+        items = self.__items
+        items.append(item)
+        self._enqueued += 1
+        if len(items) > self._max_depth:
+            self._max_depth = len(items)
+        if self.__stamps is not None:
+            self.__stamps.append(time.perf_counter())
+        if self.__getters:
+            self._wakeup_next(self.__getters)
+
+    def get_nowait(self):
+        """
+        Dequeue without waiting.  Control messages come first.
+
+        :return: The next message
+        :rtype: Message()
+        """
+        if self._control:
+            return self._control.popleft()
+        if not self.__items:
+            raise asyncio.QueueEmpty()
+        item = self.__items.popleft()
+        self._dequeued += 1
+        if self.__stamps is not None:
+            self.__enqueue_time = self.__stamps.popleft()
+        self._wakeup_next(self.__putters)
+        return item
+
+    async def get(self):
+        """
+        Wait for and dequeue the next message.  Control messages come first.
+
+        :return: The next message
+        :rtype: Message()
+        """
+        while not self.__items and not self._control:
+            getter = self._loop.create_future()
+            self.__getters.append(getter)
+            try:
+                await getter
+            except:
+                getter.cancel()
+                try:
+                    self.__getters.remove(getter)
+                except ValueError:
+                    pass
+                if not self.empty() and not getter.cancelled():
+                    self._wakeup_next(self.__getters)
+                raise
+        return self.get_nowait()
+
+    async def _wait_for_space(self):
+        """
+        Wait until the mailbox has room.
+        """
+        while self.full():
+            putter = self._loop.create_future()
+            self.__putters.append(putter)
+            try:
+                await putter
+            except:
+                putter.cancel()
+                try:
+                    self.__putters.remove(putter)
+                except ValueError:
+                    pass
+                if not self.full() and not putter.cancelled():
+                    self._wakeup_next(self.__putters)
+                raise
+
+    def _drop_oldest(self):
+        """
+        Discard the oldest queued message.
+
+        :return: The discarded message
+        :rtype: Message()
+        """
+        item = self.__items.popleft()
+        if self.__stamps is not None:
+            self.__stamps.popleft()
+        return item
+
+    def offer(self, item):
+        """
+        Enqueue without waiting, applying any overflow policy that does not
+        block.  Senders already waiting for room keep their place.
+
+        :param item: The message
+        :type item: Message()
+        :return: True when enqueued, False when dropped, rejected or
+            redirected by the policy and None when the sender must wait
+        :rtype: bool()
+        """
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+            return True
+        if not self.full() and not self.__putters:
+            self.__append(item)
+            return True
+        return self._offer_full(item)
+
+    def offer_many(self, items):
+        """
+        Offer messages in order as offer does, waking a reader once for the
+        whole batch.  Stops at the first message the sender must wait for.
+
+        :param items: The messages
+        :type items: list()
+        :return: How many messages were taken from the front of items and
+            how many of those were enqueued
+        :rtype: tuple()
+        """
+        items_queue = self.__items
+        stamps = self.__stamps
+        taken = 0
+        accepted = 0
+        appended = 0
+        for item in items:
+            if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+                self._control.append(item)
+                accepted += 1
+            elif not self.full() and not self.__putters:
+                items_queue.append(item)
+                if stamps is not None:
+                    stamps.append(time.perf_counter())
+                appended += 1
+                accepted += 1
+            else:
+                enqueued = self._offer_full(item)
+                if enqueued is None:
+                    break
+                if enqueued:
+                    accepted += 1
+            taken += 1
+        if taken:
+            self._enqueued += appended
+            if len(items_queue) > self._max_depth:
+                self._max_depth = len(items_queue)
+            if self.__getters:
+                self._wakeup_next(self.__getters)
+        return taken, accepted
+
+    def _offer_full(self, item):
+        """
+        Apply the overflow policy to a user message offered to a full
+        mailbox.
+
+        :param item: The message
+        :type item: Message()
+        :return: True when enqueued, False when dropped, rejected or
+            redirected by the policy and None when the sender must wait
+        :rtype: bool()
+        """
+        policy = self._policy
+        if policy is OverflowPolicy.BLOCK or\
+                policy is OverflowPolicy.BLOCK_TIMEOUT:
+            return None
+        if policy is OverflowPolicy.DROP_OLDEST:
+            self._drop(self._drop_oldest())
+            self.put_nowait(item)
+            return True
+        self._overflow(item)
+        return False
+
+    async def put(self, item):
+        """
+        Enqueue a message, applying the overflow policy when full.
+
+        :param item: The message
+        :type item: Message()
+        :return: Whether the message was enqueued
+        :rtype: bool()
+        """
+        if not self.full():
+            self.put_nowait(item)
+            return True
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+            return True
+        policy = self._policy
+        if policy is OverflowPolicy.BLOCK:
+            await self._wait_for_space()
+        elif policy is OverflowPolicy.BLOCK_TIMEOUT:
+            try:
+                await asyncio.wait_for(
+                    self._wait_for_space(), self._put_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                raise MailboxFullError(
+                    "Mailbox full after {}s".format(self._put_timeout))
+        elif policy is OverflowPolicy.DROP_OLDEST:
+            self._drop(self._drop_oldest())
+        else:
+            self._overflow(item)
+            return False
+        self.put_nowait(item)
+        return True
+
+    def _drop(self, item):
+        """
+        Count a dropped message.  A dropped query goes through the dead
+        letter hook so its ask fails instead of waiting for a reply.
+
+        :param item: The dropped message
+        :type item: Message()
+        """
+        self._dropped += 1
+        if getattr(item, 'type_tag', 0) & MessageTag.QUERY and\
+                self._dead_letters is not None:
+            self._dead_letters(item, DeadLetterReason.MAILBOX_FULL)
+
+    def _overflow(self, item):
+        """
+        Apply a policy that does not enqueue the incoming message.
+
+        :param item: The incoming message
+        :type item: Message()
+        """
+        policy = self._policy
+        if policy is OverflowPolicy.DROP_NEWEST:
+            self._drop(item)
+        elif policy is OverflowPolicy.REJECT:
+            self._rejected += 1
+            raise MailboxFullError(
+                "Mailbox full at {} messages".format(self._maxsize))
+        elif policy is OverflowPolicy.DEAD_LETTER:
+            self._redirected += 1
+            if self._dead_letters is not None:
+                self._dead_letters(item, DeadLetterReason.MAILBOX_FULL)
+            else:
+                get_dead_letter_office().post(
+                    item, DeadLetterReason.MAILBOX_FULL)
+
+
+class QueueMailbox(Mailbox):
+    """
+    A mailbox applying an overflow policy in front of a queue supplied by
+    the user, such as a BlockingQueue shared by a balancing router.  Under
+    BLOCK the queue's own put decides how to wait.
+
+    A closed or shut down queue ends the stream of user messages and the
+    mailbox then only delivers control messages.
+    """
+
+    def __init__(self, queue, loop=None, policy=OverflowPolicy.BLOCK,
+                 put_timeout=None, dead_letters=None):
+        """
+        Constructor
+
+        :param queue: The wrapped queue.  Must have get, put and put_nowait.
+        :type queue: asyncio.Queue()
+        :param loop: The loop the mailbox is read from
+        :type loop: AbstractEventLoop()
+        :param policy: The overflow policy
+        :type policy: OverflowPolicy()
+        :param put_timeout: Seconds to wait under BLOCK_TIMEOUT
+        :type put_timeout: float()
+        :param dead_letters: Called with (message, reason) under DEAD_LETTER,
+            the dead letter office by default
+        :type dead_letters: def
+        """
+        super().__init__(getattr(queue, 'maxsize', 0), loop, policy,
+                         put_timeout, dead_letters)
+        self.__queue = queue
+        self.__get_task = None
+        self.__control_waiter = None
+        self.__ended = False
+
+    def set_timing(self, enabled):
+        """
+        The wrapped queue may be shared so enqueue times are not recorded.
+
+        :param enabled: Ignored
+        :type enabled: bool()
+        """
+
+    def get_queue(self):
+        """
+        Get the wrapped queue
+
+        :return: The wrapped queue
+        :rtype: asyncio.Queue()
+        """
+        return self.__queue
+
+    def qsize(self):
+        return self.__queue.qsize()
+
+    def empty(self):
+        return self.__queue.empty() and not self._control
+
+    def full(self):
+        return self.__queue.full()
+
+    def _notify_control(self):
+        waiter = self.__control_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def put_nowait(self, item):
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+        else:
+            self.__queue.put_nowait(item)
+            self._count_enqueued()
+
+    def get_nowait(self):
+        if self._control:
+            return self._control.popleft()
+        if self.__ended:
+            raise asyncio.QueueEmpty()
+        get_task = self.__get_task
+        if get_task is not None and get_task.done():
+            self.__get_task = None
+            item = self.__take(get_task)
+        else:
+            try:
+                item = self.__queue.get_nowait()
+            except QUEUE_CLOSED_ERRORS:
+                self.__ended = True
+                raise asyncio.QueueEmpty()
+        if self.__ended:
+            raise asyncio.QueueEmpty()
+        self._dequeued += 1
+        return item
+
+    async def get(self):
+        """
+        Wait on the wrapped queue and the control lane together.  A pending
+        get on the wrapped queue is kept for the next call when a control
+        message wins so no user message is lost.  Once the wrapped queue is
+        closed only control messages are returned.
+
+        :return: The next message
+        :rtype: Message()
+        """
+        while True:
+            if self._control:
+                return self._control.popleft()
+            if self.__ended:
+                await self.__wait_control()
+                continue
+            get_task = self.__get_task
+            if get_task is None:
+                get_task = asyncio.ensure_future(
+                    self.__queue.get(), loop=self._loop)
+                self.__get_task = get_task
+            if not get_task.done():
+                await self.__wait_control(get_task)
+            if self._control:
+                return self._control.popleft()
+            if not get_task.done():
+                continue
+            self.__get_task = None
+            item = self.__take(get_task)
+            if not self.__ended:
+                self._dequeued += 1
+                return item
+
+    async def __wait_control(self, get_task=None):
+        """
+        Wait for a control message or the pending get.
+
+        :param get_task: The pending get on the wrapped queue
+        :type get_task: asyncio.Task()
+        """
+        waiter = self._loop.create_future()
+        self.__control_waiter = waiter
+        try:
+            if get_task is None:
+                await waiter
+            else:
+                await asyncio.wait(
+                    [get_task, waiter], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.__control_waiter = None
+            waiter.cancel()
+
+    def __take(self, get_task):
+        """
+        Get the result of a finished get, ending the stream when the
+        wrapped queue was closed.
+
+        :param get_task: The finished get
+        :type get_task: asyncio.Task()
+        :return: The message, None once the stream ended
+        :rtype: Message()
+        """
+        if get_task.cancelled():
+            self.__ended = True
+            return None
+        try:
+            item = get_task.result()
+        except QUEUE_CLOSED_ERRORS:
+            self.__ended = True
+            return None
+        if item is None and getattr(self.__queue, 'closed', False):
+            self.__ended = True
+        return item
+
+    def close(self):
+        """
+        Cancel the pending get on the wrapped queue.  A message it already
+        took is put back so a shared queue hands it to another reader.
+        """
+        get_task = self.__get_task
+        self.__get_task = None
+        if get_task is None:
+            return
+        if not get_task.done():
+            get_task.cancel()
+            return
+        item = self.__take(get_task)
+        if self.__ended:
+            return
+        try:
+            self.__queue.put_nowait(item)
+        except (asyncio.QueueFull,) + QUEUE_CLOSED_ERRORS:
+            if self._dead_letters is not None:
+                self._dead_letters(item, DeadLetterReason.QUEUE_CLOSED)
+            else:
+                get_dead_letter_office().post(
+                    item, DeadLetterReason.QUEUE_CLOSED)
+
+    def _drop_oldest(self):
+        try:
+            return self.__queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def offer(self, item):
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+            return True
+        if not self.full():
+            self.put_nowait(item)
+            return True
+        return self._offer_full(item)
+
+    def offer_many(self, items):
+        """
+        Offer messages one at a time.  The wrapped queue wakes its own
+        readers.
+
+        :param items: The messages
+        :type items: list()
+        :return: How many messages were taken from the front of items and
+            how many of those were enqueued
+        :rtype: tuple()
+        """
+        taken = 0
+        accepted = 0
+        for item in items:
+            enqueued = self.offer(item)
+            if enqueued is None:
+                break
+            if enqueued:
+                accepted += 1
+            taken += 1
+        return taken, accepted
+
+    async def put(self, item):
+        if not self.full():
+            self.put_nowait(item)
+            return True
+        if getattr(item, 'type_tag', 0) & MessageTag.CONTROL:
+            self.put_control(item)
+            return True
+        policy = self._policy
+        if policy is OverflowPolicy.BLOCK:
+            await self.__queue.put(item)
+            self._count_enqueued()
+            return True
+        elif policy is OverflowPolicy.BLOCK_TIMEOUT:
+            try:
+                await asyncio.wait_for(
+                    self.__queue.put(item), self._put_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                raise MailboxFullError(
+                    "Mailbox full after {}s".format(self._put_timeout))
+            self._count_enqueued()
+            return True
+        elif policy is OverflowPolicy.DROP_OLDEST:
+            self._drop(self._drop_oldest())
+            self.put_nowait(item)
+            return True
+        self._overflow(item)
+        return False
@@ -0,0 +1,129 @@
+'''
+A bounded table of the reply futures for an actor's in-flight asks.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import time
+from itertools import count
+from compaktor.errors.actor_errors import AskTimeoutError,\
+    PendingAskLimitError
+from compaktor.utils.loop_utils import resolve_future
+
+
+# seconds between sweeps for expired entries
+EXPIRE_INTERVAL = 1.0
+
+
+class PendingReplyTable(object):
+    """
+    Tracks reply futures with their deadlines.  The table can be bounded and
+    expired entries are failed with an AskTimeoutError and removed.  Expired
+    entries are swept on an add at most once an interval and whenever the
+    table is full.
+    """
+
+    def __init__(self, max_pending=None):
+        """
+        Constructor
+
+        :param max_pending: Maximum number of in-flight asks or None
+        :type max_pending: int()
+        """
+        self.__max_pending = max_pending
+        self.__pending = {}
+        self.__keys = count()
+        self.__expired = 0
+        self.__rejected = 0
+        self.__next_sweep = 0.0
+
+    def __len__(self):
+        return len(self.__pending)
+
+    def get_max_pending(self):
+        return self.__max_pending
+
+    def add(self, future, timeout=None):
+        """
+        Track a reply future.  Expired entries are swept first when the
+        interval has passed or the table is full, and a PendingAskLimitError
+        is raised if it is still full.
+
+        :param future: The reply future
+        :type future: asyncio.Future()
+        :param timeout: Seconds until the entry expires or None
+        :type timeout: float()
+        :return: The key for the entry
+        :rtype: int()
+        """
+        now = time.monotonic()
+        if now >= self.__next_sweep:
+            self.expire(now)
+        max_pending = self.__max_pending
+        if max_pending is not None and len(self.__pending) >= max_pending:
+            self.expire(now)
+            if len(self.__pending) >= max_pending:
+                self.__rejected += 1
+                raise PendingAskLimitError(
+                    "{} asks already in flight".format(len(self.__pending)))
+        deadline = None
+        if timeout is not None:
+            deadline = now + timeout
+        key = next(self.__keys)
+        self.__pending[key] = (future, deadline)
+        return key
+
+    def discard(self, key):
+        """
+        Stop tracking an entry.
+
+        :param key: The key returned by add
+        :type key: int()
+        """
+        self.__pending.pop(key, None)
+
+    def record_expired(self):
+        """
+        Count an ask that timed out while its caller was waiting.
+        """
+        self.__expired += 1
+
+    def expire(self, now=None):
+        """
+        Fail and remove every entry past its deadline.
+
+        :param now: The monotonic time to compare against
+        :type now: float()
+        :return: The number of entries expired
+        :rtype: int()
+        """
+        if now is None:
+            now = time.monotonic()
+        self.__next_sweep = now + EXPIRE_INTERVAL
+        if not self.__pending:
+            return 0
+        expired = [key for key, (_, deadline) in self.__pending.items()
+                   if deadline is not None and deadline <= now]
+        loop = asyncio.get_event_loop()
+        for key in expired:
+            future, _ = self.__pending.pop(key)
+            resolve_future(
+                future, exception=AskTimeoutError("Ask expired"), loop=loop)
+        self.__expired += len(expired)
+        return len(expired)
+
+    def get_stats(self):
+        """
+        Get the table counters
+
+        :return: In flight, expired and rejected counts
+        :rtype: dict()
+        """
+        return {
+            'in_flight': len(self.__pending),
+            'max_pending': self.__max_pending,
+            'expired': self.__expired,
+            'rejected': self.__rejected}
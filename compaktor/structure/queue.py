@@ -7,24 +7,63 @@ Created on Oct 13, 2017
 '''
 
 import asyncio
-import logging
 from janus import Queue
+from compaktor.structure.mailbox import OverflowPolicy, QueueMailbox
+from compaktor.system.dead_letters import DeadLetterReason,\
+    get_dead_letter_office
 
 
 class BlockingQueue:
     """
     Blocking queue using locks. 
     """
-    def __init__(self, max_size=1000, loop=asyncio.get_event_loop()):
+    def __init__(self, max_size=1000, loop=asyncio.get_event_loop(),
+                 policy=OverflowPolicy.DEAD_LETTER, put_timeout=None,
+                 dead_letters=None):
         """
         Constructor
 
         :param max_size: Maximum size of the queue
         :type max_size: int()
+        :param policy: Overflow policy for non-blocking puts
+        :type policy: OverflowPolicy()
+        :param put_timeout: Seconds to wait for room under BLOCK_TIMEOUT
+        :type put_timeout: float()
+        :param dead_letters: Called with (item, reason) under DEAD_LETTER,
+            the dead letter office by default
+        :type dead_letters: def
         """
         self.__is_closed = False
         self.__jq = Queue(maxsize=max_size)
         self.__queue = self.__jq.async_q
+        self.__overflow = QueueMailbox(
+            self.__queue, loop, policy, put_timeout, dead_letters)
+
+    @property
+    def maxsize(self):
+        return self.__queue.maxsize
+
+    def qsize(self):
+        return self.__queue.qsize()
+
+    def empty(self):
+        return self.__queue.empty()
+
+    def full(self):
+        return self.__queue.full()
+
+    def get_stats(self):
+        """
+        Get the overflow counters for non-blocking puts
+
+        :return: The queue statistics
+        :rtype: dict()
+        """
+        return self.__overflow.get_stats()
+
+    @property
+    def closed(self):
+        return self.__is_closed
 
     def close(self):
         self.__is_closed = True
@@ -36,14 +75,32 @@ class BlockingQueue:
 
         :param item: The item to put into the queue
         :type item: object
-        :param block: Whether to block on the queue
+        :param block: Whether to block on the queue instead of applying the
+            overflow policy
         :type block: bool()
+        :return: Whether the item was enqueued
+        :rtype: bool()
         """
         if self.__is_closed is False:
-            if self.__queue.full() is False or block:
+            if block:
                 await self.__queue.put(item)
-            else:
-                logging.warn("Queue Full")
+                return True
+            return await self.__overflow.put(item)
+        get_dead_letter_office().post(item, DeadLetterReason.QUEUE_CLOSED)
+        return False
+
+    def put_nowait(self, item):
+        """
+        Put into the queue without waiting
+
+        :param item: The item to put into the queue
+        :type item: object
+        """
+        if self.__is_closed is False:
+            self.__queue.put_nowait(item)
+        else:
+            get_dead_letter_office().post(
+                item, DeadLetterReason.QUEUE_CLOSED)
 
     async def get(self, block=True):
         """
@@ -61,3 +118,15 @@ class BlockingQueue:
             else:
                 item = None
         return item
+
+    def get_nowait(self):
+        """
+        Get from the queue without waiting.  Lets actors drain a shared
+        queue in batches.
+
+        :return: An item from the queue
+        :type: object
+        """
+        if self.__is_closed:
+            raise asyncio.QueueEmpty()
+        return self.__queue.get_nowait()
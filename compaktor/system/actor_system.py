@@ -13,6 +13,11 @@ from threading import Lock
 from compaktor.errors.actor_errors import ChildNodeExistsException,\
     ChildNotFoundException
 from compaktor.state.actor_state import ActorState
+from compaktor.system.loop_group import LoopGroup
+from compaktor.system.placement import RoundRobinPlacement
+from compaktor.system.shutdown import STOP_CONCURRENCY, stop_tree
+from compaktor.utils.loop_utils import get_running_loop, run_on_loop
+from compaktor.utils.name_utils import NameCreationUtils
 
 
 class ActorTreeNode(object):
@@ -35,19 +40,96 @@ class ActorSystem:
     """
     A basic actor system tree.  Actors are referenced as if they belong to a 
     file system.
+
+    With num_loops set the system starts that many event loops on their own
+    threads and spawn places new actors on them through the placement
+    policy.  Tell and ask already cross loops so actors need no changes.
     """
 
     __root = None
     __system_name = None
 
-    def __init__(self, system_name):
+    def __init__(self, system_name, num_loops=0, placement=None):
         """
         Constructor.
 
         :param system_name:  The system name
+        :param num_loops:  Event loop threads to shard actors across.  0 keeps
+            every actor on the default loop.
+        :type num_loops:  int
+        :param placement:  Chooses the loop for spawned actors, round robin
+            by default
+        :type placement:  PlacementPolicy
         """
         self.__root = ActorTreeNode(system_name.strip(),None)
         self.__system_name = system_name
+        self.__placement = placement
+        if self.__placement is None:
+            self.__placement = RoundRobinPlacement()
+        self.__loop_group = None
+        if num_loops > 0:
+            self.__loop_group = LoopGroup(
+                num_loops, "{}-loop".format(system_name.strip()))
+            self.__loop_group.start()
+
+    def get_loops(self):
+        """
+        Get the loops actors are placed on.
+
+        :return:  The system loops or the default loop alone
+        :rtype:  list
+        """
+        if self.__loop_group is not None and self.__loop_group.is_running():
+            return self.__loop_group.get_loops()
+        return [asyncio.get_event_loop()]
+
+    def place(self, name):
+        """
+        Choose the loop for a new actor with the placement policy.
+
+        :param name:  The actor name
+        :type name:  str
+        :return:  The loop to run the actor on
+        :rtype:  AbstractEventLoop
+        """
+        return self.__placement.place(name, self.get_loops())
+
+    def spawn(self, actor_cls, path=None, name=None, **kwargs):
+        """
+        Create an actor on the loop chosen by the placement policy, start it
+        there and optionally add it to the tree.
+
+        :param actor_cls:  The actor class taking name and loop keywords
+        :type actor_cls:  class
+        :param path:  Path separated by / to add the actor under
+        :type path:  str
+        :param name:  The actor name, generated when None
+        :type name:  str
+        :param kwargs:  Further constructor arguments
+        :type kwargs:  dict
+        :return:  The started actor
+        :rtype:  Actor
+        """
+        if name is None:
+            name = str(NameCreationUtils.get_name_base())
+        loop = self.place(name)
+        actor = actor_cls(name=name, loop=loop, **kwargs)
+        if loop.is_running() and get_running_loop() is not loop:
+            loop.call_soon_threadsafe(actor.start)
+        else:
+            actor.start()
+        if path is not None:
+            self.add_actor(actor, path)
+        return actor
+
+    def _stop(self, actor):
+        """
+        Stop an actor from synchronous code on whichever loop it runs on.
+
+        :param actor:  The actor to stop
+        :type actor:  Actor
+        """
+        run_on_loop(actor.stop(), actor.loop)
 
     def create_branch(self, root_node):
         """
@@ -145,41 +227,117 @@ class ActorSystem:
         
         actor = self.get_actor_node(path)
         if actor is not None:
-            asyncio.get_event_loop().run_until_complete(actor.actor.stop())
+            self._stop(actor.actor)
 
-    def stop_actors_on_branch(self, branch_name):
+    def __entries(self, node, path, parent=None):
         """
-        Stop all actors on a specific branch.
+        Walk the tree below a node and list its entries, parents first.
 
-        :param branch_name:  The name of the branch / system
+        :param node:  The node, a bare actor or None
+        :type node:  ActorTreeNode
+        :param path:  The path to the node separated by /
+        :type path:  str
+        :param parent:  The path to the parent
+        :type parent:  str
+        :return:  (path, actor, parent path) triples
+        :rtype:  list
+        """
+        entries = []
+        stack = [(path, node, parent)]
+        while stack:
+            path, node, parent = stack.pop()
+            if not isinstance(node, ActorTreeNode):
+                # add_branch may store a bare actor in place of a node
+                entries.append((path, node, parent))
+                continue
+            entries.append((path, node.actor, parent))
+            for name in reversed(list(node.children)):
+                stack.append(("{}/{}".format(path, name),
+                              node.children[name], path))
+        return entries
+
+    async def shutdown(self, branch_name=None, concurrency=STOP_CONCURRENCY,
+                       timeout=None):
+        """
+        Stop the running actors on a branch or in the whole tree
+        concurrently, children before their parents.  May be awaited on a
+        running loop.
+
+        :param branch_name:  The name of the branch, None for every branch
         :type branch_name:  str
+        :param concurrency:  Stops allowed to run at once
+        :type concurrency:  int
+        :param timeout:  Seconds allowed for the whole shutdown
+        :type timeout:  float
+        :return:  The report keyed by path, listing the actors that did not
+            finish draining before the deadline
+        :rtype:  ShutdownReport
         """
-        current_node = self.__root
-        branch = branch_name.strip()
-        if branch not in current_node.children:
-            raise ChildNotFoundException("Branch not Found when Stopping Actors\
-            for {}".format(branch_name))
+        if branch_name is None:
+            entries = self.__entries(self.__root, self.__root.name)
+        else:
+            branch = branch_name.strip()
+            if branch not in self.__root.children:
+                raise ChildNotFoundException("Branch not Found when Stopping\
+                 Actors for {}".format(branch_name))
+            entries = self.__entries(
+                self.__root.children[branch],
+                "{}/{}".format(self.__root.name, branch))
+        return await stop_tree(entries, concurrency, timeout)
+
+    def stop_actors_on_branch(self, branch_name, concurrency=STOP_CONCURRENCY,
+                              timeout=None):
+        """
+        Stop all actors on a specific branch.  Blocks until the shutdown
+        finishes on the default loop, so it raises a RuntimeError when
+        called on a running loop; await shutdown(branch_name) there instead.
 
-        def recurse(node):
-            if node is not None and node.actor is not None:
-                if node.actor.get_state() is ActorState.RUNNING:
-                    asyncio.get_event_loop().run_until_complete(node.actor.stop())
-                    
-                for child_node in node.children:
-                    recurse(node.children[child_node])
+        :param branch_name:  The name of the branch / system
+        :type branch_name:  str
+        :param concurrency:  Stops allowed to run at once
+        :type concurrency:  int
+        :param timeout:  Seconds allowed for the whole shutdown
+        :type timeout:  float
+        :return:  The shutdown report
+        :rtype:  ShutdownReport
+        :raises RuntimeError:  Called on a running loop
+        """
+        self.__check_blocking('stop_actors_on_branch')
+        return run_on_loop(
+            self.shutdown(branch_name, concurrency, timeout),
+            asyncio.get_event_loop())
 
-        current_node = current_node.children[branch_name.strip()]
-        recurse(current_node)
+    def stop_all(self, concurrency=STOP_CONCURRENCY, timeout=None):
+        """
+        Stop all actors in the tree.  Blocks until the shutdown finishes on
+        the default loop, so it raises a RuntimeError when called on a
+        running loop; await shutdown() there instead.
+
+        :param concurrency:  Stops allowed to run at once
+        :type concurrency:  int
+        :param timeout:  Seconds allowed for the whole shutdown
+        :type timeout:  float
+        :return:  The shutdown report
+        :rtype:  ShutdownReport
+        :raises RuntimeError:  Called on a running loop
+        """
+        self.__check_blocking('stop_all')
+        return run_on_loop(self.shutdown(None, concurrency, timeout),
+                           asyncio.get_event_loop())
 
-    def stop_all(self):
+    def __check_blocking(self, method):
         """
-        Stop all actors starting at a specific node.
+        Refuse a blocking shutdown on a running loop, which would wait on
+        itself.
 
-        :param node:  The node to begin terminating actors on
-        :type node:  The ActorTreeNode to start canceling from
+        :param method:  The name of the blocking method
+        :type method:  str
+        :raises RuntimeError:  Called on a running loop
         """
-        for branch_name in self.__root.children:
-            self.stop_actors_on_branch(branch_name)
+        if get_running_loop() is not None:
+            raise RuntimeError(
+                "ActorSystem.{}() blocks and cannot run on a running loop; "
+                "use await ActorSystem.shutdown() instead".format(method))
 
     def delete_branch(self, branch_name):
         """
@@ -245,6 +403,28 @@ class ActorSystem:
 
         print_node(current_node, 0)
 
+    def get_actors(self):
+        """
+        Walk the tree depth first and collect every actor in it.
+
+        :return:  (path, actor) pairs with the path separated by /
+        :rtype:  list
+        """
+        actors = []
+        stack = [(self.__root.name, self.__root)]
+        while stack:
+            path, node = stack.pop()
+            if not isinstance(node, ActorTreeNode):
+                # add_branch may store a bare actor in place of a node
+                if node is not None:
+                    actors.append((path, node))
+                continue
+            if node.actor is not None:
+                actors.append((path, node.actor))
+            for name in reversed(list(node.children)):
+                stack.append(("{}/{}".format(path, name), node.children[name]))
+        return actors
+
     def get_children(self, branch_path):
         """
         Get the children of a branch.  This can help in the creation of 
@@ -260,27 +440,33 @@ class ActorSystem:
         else:
             return []
 
-    def close(self, do_print = False):
+    def close(self, do_print = False, concurrency=STOP_CONCURRENCY,
+              timeout=None):
         """
-        Iterate down the tree, close all actors, and remove the actors from the
-        tree.
+        Stop all actors in the tree, children before their parents, and
+        stop the system loops.  Actors still draining at the deadline are
+        abandoned with their loops.  Blocks on the default loop, so it
+        raises a RuntimeError when called on a running loop; await
+        shutdown() there instead.
 
         :param do_print:  Whether to print the tree as it closes
         :type do_print:  boolean
+        :param concurrency:  Stops allowed to run at once
+        :type concurrency:  int
+        :param timeout:  Seconds allowed for stopping the actors
+        :type timeout:  float
+        :return:  The shutdown report
+        :rtype:  ShutdownReport
+        :raises RuntimeError:  Called on a running loop
         """
-        def recurse(node):
-
-            if do_print is True:
-                print(node.name)
-
-            if node is not None:
-                if node.actor is not None:
-                    if do_print is True:
-                        print("Closing {}".format(node.actor.get_name()))
-
-                    if node.actor.get_state() is ActorState.RUNNING:
-                        asyncio.get_event_loop().run_until_complete(node.actor.stop())
-
-                for child_node in node.children:
-                    recurse(node.children[child_node])
-        recurse(self.__root)
+        self.__check_blocking('close')
+        if do_print is True:
+            for path, actor, _ in self.__entries(
+                    self.__root, self.__root.name):
+                print(path)
+                if actor is not None:
+                    print("Closing {}".format(actor.get_name()))
+        report = self.stop_all(concurrency, timeout)
+        if self.__loop_group is not None:
+            self.__loop_group.stop()
+        return report
@@ -0,0 +1,283 @@
+'''
+The dead letter office collects messages that could not be delivered.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import logging
+import time
+from collections import deque
+from threading import Lock
+from compaktor.message.message_objects import DeadLetter
+from compaktor.utils.loop_utils import get_running_loop
+
+
+__DEAD_LETTER_OFFICE = None
+__office_lock = Lock()
+
+
+class DeadLetterReason(object):
+    """
+    Why a message became a dead letter
+    """
+    NO_TARGET = "no_target"
+    NO_HANDLER = "no_handler"
+    MAILBOX_FULL = "mailbox_full"
+    QUEUE_CLOSED = "queue_closed"
+
+
+class DeadLetterOffice(object):
+    """
+    Receives undelivered messages from any thread without blocking.  Every
+    letter is counted by reason.  With sampling, only every nth letter of a
+    reason is kept.  Kept letters go into a ring buffer that overwrites the
+    oldest letter when full and are handed to subscribers.
+
+    A subscriber is an actor, which receives DeadLetter messages through a
+    non-blocking put into its mailbox on its own loop, or a callable taking
+    the DeadLetter.  Callables run on the posting thread and must be quick.
+    A subscriber whose mailbox refuses a letter misses it and the miss is
+    counted as undelivered.  Subscribers never receive letters addressed
+    to themselves, so a subscriber that cannot take a letter does not feed
+    it back to itself.
+
+    Letters for actors on other loops are batched per loop so a burst
+    costs one call_soon_threadsafe wakeup.  At most max_pending letters
+    wait for a loop and further ones are dropped and counted.
+    """
+
+    def __init__(self, capacity=1000, sample_every=1, max_pending=1000):
+        """
+        Constructor
+
+        :param capacity: Letters kept in the ring buffer
+        :type capacity: int()
+        :param sample_every: Keep one letter in this many per reason
+        :type sample_every: int()
+        :param max_pending: Letters allowed to wait for another loop
+        :type max_pending: int()
+        """
+        self.__lock = Lock()
+        self.__letters = deque(maxlen=max(1, capacity))
+        self.__sample_every = max(1, sample_every)
+        self.__counts = {}
+        self.__sampled_out = 0
+        self.__overwritten = 0
+        self.__undelivered = 0
+        self.__dropped = 0
+        self.__max_pending = max(1, max_pending)
+        self.__pending = {}
+        self.__subscribers = ()
+
+    def get_capacity(self):
+        return self.__letters.maxlen
+
+    def set_sample_every(self, sample_every):
+        """
+        Keep one letter in this many per reason
+
+        :param sample_every: The sampling interval.  1 keeps every letter.
+        :type sample_every: int()
+        """
+        self.__sample_every = max(1, sample_every)
+
+    def post(self, message, reason, recipient=None, sender=None):
+        """
+        Record an undelivered message.  Never blocks on anything but a short
+        lock and never grows past the capacity.
+
+        :param message: The undelivered message
+        :type message: Message()
+        :param reason: Why it was not delivered
+        :type reason: str()
+        :param recipient: The intended recipient or its address
+        :type recipient: object
+        :param sender: The sender, taken from the message when None
+        :type sender: AbstractActor()
+        :return: The kept letter or None when sampled out
+        :rtype: DeadLetter()
+        """
+        with self.__lock:
+            count = self.__counts.get(reason, 0) + 1
+            self.__counts[reason] = count
+            if (count - 1) % self.__sample_every:
+                self.__sampled_out += 1
+                return None
+            if sender is None:
+                sender = getattr(message, 'sender', None)
+            letter = DeadLetter(
+                message, reason, recipient, sender, time.time())
+            if len(self.__letters) == self.__letters.maxlen:
+                self.__overwritten += 1
+            self.__letters.append(letter)
+            subscribers = self.__subscribers
+        if count == 1:
+            logging.warning("First dead letter ({}) for {}: {}".format(
+                reason, recipient, message))
+        for subscriber, reasons in subscribers:
+            if subscriber is recipient:
+                continue
+            if reasons is None or reason in reasons:
+                self.__deliver(subscriber, letter)
+        return letter
+
+    def __deliver(self, subscriber, letter):
+        """
+        Hand a letter to one subscriber without blocking.
+
+        :param subscriber: An actor or a callable
+        :type subscriber: object
+        :param letter: The letter
+        :type letter: DeadLetter()
+        """
+        try:
+            receive = getattr(subscriber, '_receive_nowait', None)
+            if receive is None:
+                subscriber(letter)
+            elif subscriber.loop is get_running_loop():
+                if not receive(letter):
+                    self.__count_undelivered()
+            else:
+                self.__deliver_later(subscriber.loop, receive, letter)
+        except Exception:
+            logging.exception("Dead letter subscriber failed")
+            self.__count_undelivered()
+
+    def __deliver_later(self, loop, receive, letter):
+        """
+        Queue a letter for a subscriber on another loop.  Only the first
+        letter of a batch wakes the loop.
+
+        :param loop: The subscriber loop
+        :type loop: AbstractEventLoop()
+        :param receive: The non-blocking receive of the subscriber
+        :type receive: function
+        :param letter: The letter
+        :type letter: DeadLetter()
+        """
+        with self.__lock:
+            pending = self.__pending.get(loop)
+            if pending is not None and loop.is_closed():
+                self.__dropped += len(self.__pending.pop(loop))
+                pending = None
+            if pending is not None:
+                if len(pending) >= self.__max_pending:
+                    self.__dropped += 1
+                else:
+                    pending.append((receive, letter))
+                return
+            self.__pending[loop] = [(receive, letter)]
+        try:
+            loop.call_soon_threadsafe(self.__flush, loop)
+        except RuntimeError:
+            with self.__lock:
+                self.__dropped += len(self.__pending.pop(loop, ()))
+
+    def __flush(self, loop):
+        """
+        Hand the letters queued for a loop to their subscribers.
+
+        :param loop: The running loop
+        :type loop: AbstractEventLoop()
+        """
+        with self.__lock:
+            pending = self.__pending.pop(loop, ())
+        for receive, letter in pending:
+            try:
+                if not receive(letter):
+                    self.__count_undelivered()
+            except Exception:
+                logging.exception("Dead letter subscriber failed")
+                self.__count_undelivered()
+
+    def __count_undelivered(self):
+        with self.__lock:
+            self.__undelivered += 1
+
+    def subscribe(self, subscriber, reasons=None):
+        """
+        Receive letters as they are kept
+
+        :param subscriber: An actor or a callable taking a DeadLetter
+        :type subscriber: object
+        :param reasons: Only receive letters with these reasons
+        :type reasons: list()
+        """
+        if reasons is not None:
+            reasons = frozenset(reasons)
+        with self.__lock:
+            self.__subscribers = tuple(
+                entry for entry in self.__subscribers
+                if entry[0] is not subscriber) + ((subscriber, reasons),)
+
+    def unsubscribe(self, subscriber):
+        """
+        Stop receiving letters
+
+        :param subscriber: A subscribed actor or callable
+        :type subscriber: object
+        """
+        with self.__lock:
+            self.__subscribers = tuple(
+                entry for entry in self.__subscribers
+                if entry[0] is not subscriber)
+
+    def get_letters(self, reason=None):
+        """
+        Get the letters in the ring buffer, oldest first
+
+        :param reason: Only letters with this reason
+        :type reason: str()
+        :return: The letters
+        :rtype: list()
+        """
+        with self.__lock:
+            letters = list(self.__letters)
+        if reason is not None:
+            letters = [letter for letter in letters if letter.reason == reason]
+        return letters
+
+    def get_stats(self):
+        """
+        Get the office counters
+
+        :return: Posted letters in total and by reason, letters sampled
+            out, overwritten in the ring buffer, refused by subscribers and
+            dropped waiting for another loop, plus the number buffered
+        :rtype: dict()
+        """
+        with self.__lock:
+            return {
+                'posted': sum(self.__counts.values()),
+                'by_reason': dict(self.__counts),
+                'sampled_out': self.__sampled_out,
+                'overwritten': self.__overwritten,
+                'undelivered': self.__undelivered,
+                'dropped': self.__dropped,
+                'buffered': len(self.__letters)}
+
+    def clear(self):
+        """
+        Empty the ring buffer and reset the counters
+        """
+        with self.__lock:
+            self.__letters.clear()
+            self.__counts = {}
+            self.__sampled_out = 0
+            self.__overwritten = 0
+            self.__undelivered = 0
+            self.__dropped = 0
+
+
+def get_dead_letter_office():
+    """
+    Get the dead letter office
+    """
+    global __DEAD_LETTER_OFFICE
+    if __DEAD_LETTER_OFFICE is None:
+        with __office_lock:
+            if __DEAD_LETTER_OFFICE is None:
+                __DEAD_LETTER_OFFICE = DeadLetterOffice()
+    return __DEAD_LETTER_OFFICE
@@ -0,0 +1,117 @@
+'''
+A group of event loops each running on its own thread.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+from threading import Event, Thread
+from compaktor.actor.loop_bridge import close_bridges
+from compaktor.system.scheduling import disable_accounting
+
+
+class LoopGroup(object):
+    """
+    Starts a number of event loops on daemon threads so actors can be
+    sharded across them.
+    """
+
+    def __init__(self, size, name="compaktor-loop"):
+        """
+        Constructor
+
+        :param size: The number of loops
+        :type size: int()
+        :param name: Prefix for the thread names
+        :type name: str()
+        """
+        if size < 1:
+            raise ValueError("A loop group needs at least one loop")
+        self.__size = size
+        self.__name = name
+        self.__loops = []
+        self.__threads = []
+
+    def __len__(self):
+        return len(self.__loops)
+
+    def get_loops(self):
+        """
+        Get the running loops
+
+        :return: The loops in start order
+        :rtype: list()
+        """
+        return list(self.__loops)
+
+    def is_running(self):
+        return len(self.__loops) > 0
+
+    def start(self):
+        """
+        Start the loops and wait until each is running.
+        """
+        if self.__loops:
+            return
+        for i in range(self.__size):
+            loop = asyncio.new_event_loop()
+            started = Event()
+            thread = Thread(target=self.__run, args=(loop, started),
+                            name="{}-{}".format(self.__name, i), daemon=True)
+            thread.start()
+            started.wait()
+            self.__loops.append(loop)
+            self.__threads.append(thread)
+
+    def __run(self, loop, started):
+        """
+        Thread body running a loop until it is stopped.
+
+        :param loop: The loop to run
+        :type loop: AbstractEventLoop()
+        :param started: Set once the loop is running
+        :type started: Event()
+        """
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def stop(self, timeout=None):
+        """
+        Stop every loop and join its thread.  Tasks still pending are
+        cancelled first.
+
+        :param timeout: Seconds to wait for each thread
+        :type timeout: float()
+        """
+        for loop in self.__loops:
+            loop.call_soon_threadsafe(self.__cancel_and_stop, loop)
+        for thread in self.__threads:
+            thread.join(timeout)
+        for loop in self.__loops:
+            close_bridges(loop)
+            disable_accounting(loop)
+        self.__loops = []
+        self.__threads = []
+
+    @staticmethod
+    def __cancel_and_stop(loop):
+        """
+        Cancel outstanding tasks and stop the loop once they unwind.
+
+        :param loop: The loop to stop
+        :type loop: AbstractEventLoop()
+        """
+        tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            future = asyncio.gather(*tasks, return_exceptions=True)
+            future.add_done_callback(lambda _: loop.stop())
+        else:
+            loop.stop()
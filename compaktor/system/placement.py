@@ -0,0 +1,100 @@
+'''
+Policies deciding which event loop a new actor runs on.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import zlib
+from threading import Lock
+
+
+class PlacementPolicy(object):
+    """
+    Chooses a loop for a new actor.  Subclasses implement place.
+    """
+
+    def place(self, name, loops):
+        """
+        Choose the loop for an actor
+
+        :param name: The actor name
+        :type name: str()
+        :param loops: The loops available in the system
+        :type loops: list()
+        :return: The chosen loop
+        :rtype: AbstractEventLoop()
+        """
+        raise NotImplementedError(
+            "The method place Not Yet Implemented in PlacementPolicy.")
+
+
+class RoundRobinPlacement(PlacementPolicy):
+    """
+    Cycle through the loops in order.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.__index = 0
+        self.__lock = Lock()
+
+    def place(self, name, loops):
+        with self.__lock:
+            index = self.__index
+            self.__index = (index + 1) % len(loops)
+        return loops[index % len(loops)]
+
+
+class HashPlacement(PlacementPolicy):
+    """
+    Place by a stable hash of the actor name so an actor recreated with the
+    same name lands on the same loop across runs.
+    """
+
+    def place(self, name, loops):
+        return loops[zlib.crc32(str(name).encode()) % len(loops)]
+
+
+class ExplicitPlacement(PlacementPolicy):
+    """
+    Place actors by a mapping of name to loop index.  Names not in the
+    mapping go to the fallback policy.
+    """
+
+    def __init__(self, mapping=None, fallback=None):
+        """
+        Constructor
+
+        :param mapping: Actor name to loop index
+        :type mapping: dict()
+        :param fallback: Policy for unmapped names, round robin by default
+        :type fallback: PlacementPolicy()
+        """
+        self.__mapping = dict(mapping or {})
+        self.__fallback = fallback
+        if self.__fallback is None:
+            self.__fallback = RoundRobinPlacement()
+
+    def assign(self, name, index):
+        """
+        Pin an actor name to a loop
+
+        :param name: The actor name
+        :type name: str()
+        :param index: The loop index
+        :type index: int()
+        """
+        self.__mapping[name] = index
+
+    def place(self, name, loops):
+        index = self.__mapping.get(name)
+        if index is None:
+            return self.__fallback.place(name, loops)
+        if not 0 <= index < len(loops):
+            raise IndexError("Loop index {} out of range for {} loops".format(
+                index, len(loops)))
+        return loops[index]
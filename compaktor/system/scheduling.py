@@ -0,0 +1,205 @@
+'''
+Accounting of how actors share an event loop.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import threading
+from compaktor.metrics.histogram import Histogram
+from compaktor.utils.loop_utils import get_running_loop
+
+
+class SliceStats(object):
+    """
+    How one actor has used the loop
+    """
+
+    __slots__ = ('slices', 'messages', 'busy', 'max_slice', 'preempted')
+
+    def __init__(self):
+        self.slices = 0
+        self.messages = 0
+        self.busy = 0.0
+        self.max_slice = 0.0
+        self.preempted = 0
+
+    def snapshot(self):
+        return {
+            'slices': self.slices,
+            'messages': self.messages,
+            'busy': self.busy,
+            'max_slice': self.max_slice,
+            'preempted': self.preempted}
+
+
+class LoopAccounting(object):
+    """
+    Records the slices actors run on one loop and measures loop lag with a
+    probe that asks to be called back every interval.  The callback runs
+    late by however long the loop was kept busy, so a lag over the
+    threshold is counted as a starvation and blamed on the actor with the
+    longest slice since the previous probe.
+
+    Slices are recorded from the loop thread.  Statistics may be read from
+    any thread.
+    """
+
+    def __init__(self, loop, interval=0.05, threshold=0.1):
+        """
+        Constructor
+
+        :param loop: The accounted loop
+        :type loop: AbstractEventLoop()
+        :param interval: Seconds between lag probes
+        :type interval: float()
+        :param threshold: Lag in seconds counted as a starvation
+        :type threshold: float()
+        """
+        self.__loop = loop
+        self.__interval = interval
+        self.__threshold = threshold
+        self.__actors = {}
+        self.__lag = Histogram()
+        self.__starved = 0
+        self.__culprits = {}
+        self.__window_longest = 0.0
+        self.__window_actor = None
+        self.__handle = None
+        self.__running = False
+
+    def record_slice(self, name, elapsed, messages, preempted):
+        """
+        Record one pass of an actor over its mailbox
+
+        :param name: The actor name
+        :type name: str()
+        :param elapsed: Seconds the pass held the loop
+        :type elapsed: float()
+        :param messages: Messages handled in the pass
+        :type messages: int()
+        :param preempted: Whether the pass ended on its budget
+        :type preempted: bool()
+        """
+        stats = self.__actors.get(name)
+        if stats is None:
+            stats = SliceStats()
+            self.__actors[name] = stats
+        stats.slices += 1
+        stats.messages += messages
+        stats.busy += elapsed
+        if elapsed > stats.max_slice:
+            stats.max_slice = elapsed
+        if preempted:
+            stats.preempted += 1
+        if elapsed > self.__window_longest:
+            self.__window_longest = elapsed
+            self.__window_actor = name
+
+    def start(self):
+        """
+        Start probing the loop lag.  Safe to call from any thread.
+        """
+        self.__running = True
+        if get_running_loop() is self.__loop:
+            self.__schedule()
+        else:
+            self.__loop.call_soon_threadsafe(self.__schedule)
+
+    def stop(self):
+        """
+        Stop probing.  Safe to call from any thread.
+        """
+        self.__running = False
+        handle = self.__handle
+        if handle is not None:
+            if get_running_loop() is self.__loop:
+                handle.cancel()
+            else:
+                self.__loop.call_soon_threadsafe(handle.cancel)
+
+    def __schedule(self):
+        if self.__running:
+            expected = self.__loop.time() + self.__interval
+            self.__handle = self.__loop.call_at(
+                expected, self.__probe, expected)
+
+    def __probe(self, expected):
+        lag = max(0.0, self.__loop.time() - expected)
+        self.__lag.record(lag)
+        if lag > self.__threshold:
+            self.__starved += 1
+            culprit = self.__window_actor
+            if culprit is not None:
+                self.__culprits[culprit] = self.__culprits.get(culprit, 0) + 1
+        self.__window_longest = 0.0
+        self.__window_actor = None
+        self.__schedule()
+
+    def get_stats(self):
+        """
+        Get the loop lag, starvations and per actor slices
+
+        :return: The lag summary in seconds, the starvation count, how
+            often each actor was blamed and the slices of each actor
+        :rtype: dict()
+        """
+        return {
+            'lag': self.__lag.snapshot(),
+            'starved': self.__starved,
+            'culprits': dict(self.__culprits),
+            'actors': {name: stats.snapshot()
+                       for name, stats in list(self.__actors.items())}}
+
+
+_accounting = {}
+_accounting_lock = threading.Lock()
+
+
+def get_loop_accounting(loop):
+    """
+    Get the accounting of a loop
+
+    :param loop: The loop
+    :type loop: AbstractEventLoop()
+    :return: The accounting or None when it is not enabled
+    :rtype: LoopAccounting()
+    """
+    return _accounting.get(loop)
+
+
+def enable_accounting(loop, interval=0.05, threshold=0.1):
+    """
+    Start accounting for a loop, returning the existing accounting if it is
+    already enabled
+
+    :param loop: The loop
+    :type loop: AbstractEventLoop()
+    :param interval: Seconds between lag probes
+    :type interval: float()
+    :param threshold: Lag in seconds counted as a starvation
+    :type threshold: float()
+    :return: The accounting
+    :rtype: LoopAccounting()
+    """
+    with _accounting_lock:
+        accounting = _accounting.get(loop)
+        if accounting is None:
+            accounting = LoopAccounting(loop, interval, threshold)
+            _accounting[loop] = accounting
+            accounting.start()
+    return accounting
+
+
+def disable_accounting(loop):
+    """
+    Stop accounting for a loop
+
+    :param loop: The loop
+    :type loop: AbstractEventLoop()
+    """
+    with _accounting_lock:
+        accounting = _accounting.pop(loop, None)
+    if accounting is not None:
+        accounting.stop()
@@ -0,0 +1,187 @@
+'''
+Concurrent shutdown of a tree of actors.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+from collections import deque
+from compaktor.state.actor_state import ActorState
+from compaktor.utils.loop_utils import get_running_loop
+
+
+STOP_CONCURRENCY = 64
+
+
+class ShutdownReport(object):
+    """
+    The outcome of a shutdown.  Actors are identified by the keys they were
+    given to stop_tree, usually their addresses.
+    """
+
+    def __init__(self):
+        self.stopped = []
+        self.failed = {}
+        self.unfinished = []
+        self.elapsed = 0.0
+
+    def is_complete(self):
+        """
+        Whether every actor stopped without error before the deadline
+
+        :return: Whether the shutdown completed
+        :rtype: bool()
+        """
+        return not self.failed and not self.unfinished
+
+    def __str__(self, *args, **kwargs):
+        return "ShutdownReport(stopped = {}, failed = {}, unfinished = {}, "\
+            "elapsed = {:.3f})".format(
+                len(self.stopped), list(self.failed), self.unfinished,
+                self.elapsed)
+
+    def __repr__(self, *args, **kwargs):
+        return self.__str__(*args, **kwargs)
+
+
+def _run_stop(actor):
+    """
+    Stop an actor by running its idle loop until the stop completes.
+
+    :param actor: The actor
+    :type actor: AbstractActor()
+    :return: The stop result
+    :rtype: bool()
+    """
+    return actor.loop.run_until_complete(actor.stop())
+
+
+async def _stop_actor(actor, loop, idle_locks):
+    """
+    Stop an actor from the coordinating loop, on whichever loop it runs on.
+    An actor whose loop is not running is stopped by running that loop in
+    an executor thread.  Stops on the same idle loop take turns.
+
+    :param actor: The actor
+    :type actor: AbstractActor()
+    :param loop: The coordinating loop
+    :type loop: AbstractEventLoop()
+    :param idle_locks: A lock per idle loop
+    :type idle_locks: dict()
+    :return: The stop result
+    :rtype: bool()
+    """
+    owner = actor.loop
+    if owner is loop:
+        return await actor.stop()
+    if owner.is_running():
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(actor.stop(), owner), loop=loop)
+    if owner.is_closed():
+        raise RuntimeError("The loop of {} is closed".format(
+            actor.get_name()))
+    lock = idle_locks.get(owner)
+    if lock is None:
+        lock = asyncio.Lock()
+        idle_locks[owner] = lock
+    async with lock:
+        if owner.is_running():
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(actor.stop(), owner),
+                loop=loop)
+        return await loop.run_in_executor(None, _run_stop, actor)
+
+
+async def stop_tree(entries, concurrency=STOP_CONCURRENCY, timeout=None):
+    """
+    Stop a tree of actors concurrently, never stopping an actor before the
+    actors beneath it.  At most concurrency stops run at once and each one
+    starts as soon as its children are done, so a wide level drains in
+    parallel instead of one actor at a time.  A child that fails to stop
+    still releases its parent.
+
+    Entries that hold no actor or an actor that is not running are skipped
+    and their children are ordered against the nearest running ancestor.
+    Actors on a loop that is not running are stopped by running their loop
+    in an executor thread.
+
+    When the deadline passes no further stops are started and the report
+    lists every actor that had not finished, whether it was still draining
+    or never started.  Stops already in flight are not cancelled and finish
+    in the background.
+
+    :param entries: (key, actor, parent key) triples with every parent
+        listed before its children.  The parent key of a root is None.
+    :type entries: iterable
+    :param concurrency: Stops allowed to run at once
+    :type concurrency: int()
+    :param timeout: Seconds allowed for the whole shutdown
+    :type timeout: float()
+    :return: The report
+    :rtype: ShutdownReport()
+    """
+    loop = get_running_loop()
+    report = ShutdownReport()
+    start = loop.time()
+    deadline = None
+    if timeout is not None:
+        deadline = start + timeout
+    concurrency = max(1, concurrency)
+    nearest = {}
+    actors = {}
+    parents = {}
+    waiting = {}
+    order = []
+    for key, actor, parent in entries:
+        parent = nearest.get(parent)
+        if actor is None or actor.get_state() is not ActorState.RUNNING:
+            nearest[key] = parent
+            continue
+        nearest[key] = key
+        actors[key] = actor
+        parents[key] = parent
+        waiting[key] = 0
+        order.append(key)
+        if parent is not None:
+            waiting[parent] += 1
+    ready = deque(key for key in order if not waiting[key])
+    running = {}
+    finished = set()
+    idle_locks = {}
+    while ready or running:
+        while ready and len(running) < concurrency:
+            key = ready.popleft()
+            task = asyncio.ensure_future(
+                _stop_actor(actors[key], loop, idle_locks), loop=loop)
+            running[task] = key
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+        done, _ = await asyncio.wait(
+            list(running), timeout=remaining,
+            return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break
+        for task in done:
+            key = running.pop(task)
+            finished.add(key)
+            if task.cancelled():
+                error = asyncio.CancelledError()
+            else:
+                error = task.exception()
+            if error is not None:
+                report.failed[key] = error
+            else:
+                report.stopped.append(key)
+            parent = parents[key]
+            if parent is not None:
+                waiting[parent] -= 1
+                if not waiting[parent]:
+                    ready.append(parent)
+    report.unfinished = [key for key in order if key not in finished]
+    report.elapsed = loop.time() - start
+    return report
@@ -0,0 +1,89 @@
+'''
+Helpers for working with futures and coroutines across event loops.
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+
+
+def _complete_future(future, result, exception):
+    """
+    Complete a future unless it is already done.
+
+    :param future: The future to complete
+    :type future: asyncio.Future()
+    :param result: The result to set
+    :type result: object
+    :param exception: The exception to set instead of a result
+    :type exception: Exception()
+    """
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+def resolve_future(future, result=None, exception=None, loop=None):
+    """
+    Complete a future from any loop.  A future owned by a different loop is
+    completed on its own loop through call_soon_threadsafe so the waiter is
+    woken without blocking either thread.  Futures that are already done,
+    such as expired asks, are left alone.
+
+    :param future: The future to complete
+    :type future: asyncio.Future()
+    :param result: The result to set
+    :type result: object
+    :param exception: The exception to set instead of a result
+    :type exception: Exception()
+    :param loop: The loop the caller is running on
+    :type loop: AbstractEventLoop()
+    """
+    owner = future.get_loop()
+    if owner is loop:
+        _complete_future(future, result, exception)
+    else:
+        owner.call_soon_threadsafe(_complete_future, future, result, exception)
+
+
+def get_running_loop():
+    """
+    Get the loop running on the current thread.
+
+    :return: The running loop or None
+    :rtype: AbstractEventLoop()
+    """
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def run_on_loop(coro, loop, timeout=None):
+    """
+    Run a coroutine to completion on a loop from synchronous code.  A loop
+    already running on another thread is handed the coroutine thread-safely
+    and the caller blocks for the result.  An idle loop is run until the
+    coroutine completes.
+
+    :param coro: The coroutine to run
+    :type coro: coroutine
+    :param loop: The loop to run it on
+    :type loop: AbstractEventLoop()
+    :param timeout: Seconds to wait on a loop owned by another thread
+    :type timeout: float()
+    :return: The coroutine result
+    :rtype: object
+    """
+    if loop.is_running():
+        if get_running_loop() is loop:
+            coro.close()
+            raise RuntimeError(
+                "Cannot block on the loop running on this thread")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+    return loop.run_until_complete(coro)
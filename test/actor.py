@@ -5,9 +5,16 @@ Created on Oct 24, 2017
 '''
 
 import asyncio
+from threading import Thread
 from test.modules.actors import AddTestActor, AddIntMessage, StringMessage,\
-                                StringTestActor, ObjectTestActor, ObjectMessage
+                                StringTestActor, ObjectTestActor, ObjectMessage,\
+                                CollectTestActor, IntMessage
 from compaktor.actor.base_actor import BaseActor
+from compaktor.actor.loop_bridge import get_bridge
+from compaktor.errors.actor_errors import AskTimeoutError,\
+    MailboxFullError, PendingAskLimitError
+from compaktor.message.message_objects import QueryMessage
+from compaktor.structure.mailbox import OverflowPolicy
 import unittest
 
 
@@ -170,11 +177,128 @@ class TestActors(unittest.TestCase):
             await test_helper()
         asyncio.get_event_loop().run_until_complete(test())
 
+    def test_batched_drain(self):
+        """
+        Messages queued before the actor starts are drained in batches and
+        still dispatched in FIFO order.
+        """
+        async def test():
+            a = CollectTestActor(batch_size=16)
+            b = BaseActor()
+            b.start()
+            for i in range(100):
+                await b.tell(a, IntMessage(i))
+            a.start()
+            await asyncio.sleep(0.25)
+            assert(a.received == list(range(100)))
+            await a.stop()
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_tell_nowait(self):
+        """
+        A same loop tell_nowait enqueues directly and reports a full
+        mailbox instead of waiting.  Addresses resolve to the registered
+        actor.
+        """
+        async def test():
+            a = CollectTestActor(mailbox_size=2)
+            b = BaseActor()
+            b.start()
+            assert(b.tell_nowait(a, IntMessage(0)) is True)
+            assert(b.tell_nowait(a, IntMessage(1)) is True)
+            assert(b.tell_nowait(a, IntMessage(2)) is None)
+            assert(b.tell_nowait("localhost/missing_actor",
+                                 IntMessage(3)) is False)
+            a.start()
+            await b.tell(a, IntMessage(2))
+            await asyncio.sleep(0.05)
+            assert(a.received == [0, 1, 2])
+            named = CollectTestActor("tell_nowait_named")
+            named.start()
+            await b.tell("localhost/tell_nowait_named", IntMessage(4))
+            assert(b.tell_nowait("localhost/tell_nowait_named",
+                                 IntMessage(5)) is True)
+            await asyncio.sleep(0.05)
+            assert(named.received == [4, 5])
+            await named.stop()
+            await a.stop()
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_tell_many(self):
+        """
+        A batch to one actor is delivered in order, waiting for room when
+        the mailbox fills, and the accepted count is reported.
+        """
+        async def test():
+            a = CollectTestActor(mailbox_size=4)
+            b = BaseActor()
+            a.start()
+            b.start()
+            messages = [IntMessage(i) for i in range(10)]
+            assert(await b.tell_many(a, messages) == 10)
+            assert(await b.tell_many("localhost/missing_actor",
+                                     messages) == 0)
+            await asyncio.sleep(0.05)
+            assert(a.received == list(range(10)))
+            await a.stop()
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_subclass_dispatch(self):
+        """
+        A handler registered for a base message class receives subclasses.
+        """
+        async def add(message):
+            return message.payload + 1
+
+        async def test():
+            a = BaseActor()
+            a.register_handler(QueryMessage, add)
+            b = BaseActor()
+            a.start()
+            b.start()
+            res = await b.ask(a, AddIntMessage(1))
+            assert(res == 2), "Response not Equals 2 ({})".format(res)
+            await a.stop()
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_ask_timeout(self):
+        """
+        An ask with no reply times out and leaves no pending entry behind.
+        """
+        async def never(message):
+            await asyncio.sleep(1)
+
+        async def test():
+            a = BaseActor()
+            a.register_handler(QueryMessage, never)
+            b = BaseActor(max_pending_asks=1)
+            a.start()
+            b.start()
+            with self.assertRaises(AskTimeoutError):
+                await b.ask(a, AddIntMessage(1), timeout=0.05)
+            assert(b.get_pending_asks() == 0)
+            assert(b.get_ask_stats()['expired'] == 1)
+            slow = asyncio.ensure_future(b.ask(a, AddIntMessage(1), 0.5))
+            await asyncio.sleep(0.01)
+            assert(b.get_pending_asks() == 1)
+            with self.assertRaises(PendingAskLimitError):
+                await b.ask(a, AddIntMessage(1))
+            slow.cancel()
+            await a.stop()
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
     def test_multi_loop(self):
         print("Testing Actors on Multiple Loops")
         add_loop = asyncio.new_event_loop()
         a = AddTestActor("testa", loop=add_loop)
         a.start()
+        add_thread = Thread(target=add_loop.run_forever, daemon=True)
+        add_thread.start()
         base_loop = asyncio.new_event_loop()
         b = BaseActor("testb", loop=base_loop)
         b.start()
@@ -184,6 +308,137 @@ class TestActors(unittest.TestCase):
         res = asyncio.get_event_loop().run_until_complete(b.ask(a, AddIntMessage(1,b)))
         print("Complete")
         assert(res == 2)
+        asyncio.run_coroutine_threadsafe(a.stop(), add_loop).result(5)
+        add_loop.call_soon_threadsafe(add_loop.stop)
+        add_thread.join(5)
+
+    def test_cross_loop_tell(self):
+        """
+        Tells to an actor on another loop arrive in order and are carried in
+        far fewer batches than messages.
+        """
+        collect_loop = asyncio.new_event_loop()
+        a = CollectTestActor(loop=collect_loop, mailbox_size=100)
+        a.start()
+        collect_thread = Thread(target=collect_loop.run_forever, daemon=True)
+        collect_thread.start()
+        b = BaseActor()
+
+        async def test():
+            for i in range(2000):
+                await b.tell(a, IntMessage(i))
+            batch = [IntMessage(i) for i in range(2000, 2100)]
+            assert(await b.tell_many(a, batch) == 100)
+            for _ in range(100):
+                if len(a.received) == 2100:
+                    break
+                await asyncio.sleep(0.05)
+        asyncio.get_event_loop().run_until_complete(test())
+        assert(a.received == list(range(2100)))
+        stats = get_bridge(asyncio.get_event_loop(), collect_loop).get_stats()
+        assert(stats['messages'] == 2100)
+        assert(stats['batches'] < 2000)
+        asyncio.run_coroutine_threadsafe(a.stop(), collect_loop).result(5)
+        collect_loop.call_soon_threadsafe(collect_loop.stop)
+        collect_thread.join(5)
+
+    def test_cross_loop_backlog(self):
+        """
+        A target with a full mailbox only holds up its own messages and a
+        backlog for a target that is not running is dead lettered.
+        """
+        target_loop = asyncio.new_event_loop()
+        slow = CollectTestActor("slow", loop=target_loop, mailbox_size=1)
+
+        async def slow_collect(message):
+            await asyncio.sleep(0.2)
+            slow.received.append(message.payload)
+        slow.register_handler(IntMessage, slow_collect)
+        free = CollectTestActor("free", loop=target_loop)
+        stuck = CollectTestActor("stuck", loop=target_loop, mailbox_size=1)
+        slow.start()
+        free.start()
+        target_thread = Thread(target=target_loop.run_forever, daemon=True)
+        target_thread.start()
+        b = BaseActor()
+
+        async def test():
+            for i in range(3):
+                await b.tell(slow, IntMessage(i))
+                await b.tell(stuck, IntMessage(i))
+            for i in range(10):
+                await b.tell(free, IntMessage(i))
+            for _ in range(20):
+                if len(free.received) == 10:
+                    break
+                await asyncio.sleep(0.01)
+            assert(free.received == list(range(10)))
+            assert(len(slow.received) < 3)
+            for _ in range(100):
+                if len(slow.received) == 3:
+                    break
+                await asyncio.sleep(0.05)
+        asyncio.get_event_loop().run_until_complete(test())
+        assert(slow.received == [0, 1, 2])
+        bridge = get_bridge(asyncio.get_event_loop(), target_loop)
+        stats = bridge.get_stats()
+        assert(stats['dead_lettered'] == 2 and stats['backlog'] == 0)
+        for actor in (slow, free):
+            asyncio.run_coroutine_threadsafe(actor.stop(), target_loop).result(5)
+        target_loop.call_soon_threadsafe(target_loop.stop)
+        target_thread.join(5)
+        target_loop.close()
+        other_loop = asyncio.new_event_loop()
+        get_bridge(asyncio.get_event_loop(), other_loop)
+        assert(get_bridge(asyncio.get_event_loop(), target_loop) is not bridge)
+        other_loop.close()
+
+    def test_cross_loop_tell_many(self):
+        """
+        A batch to an actor on another loop reports how many messages the
+        target enqueued rather than how many were sent.
+        """
+        target_loop = asyncio.new_event_loop()
+        full = BaseActor("full", target_loop, mailbox_size=2,
+                         overflow_policy=OverflowPolicy.DROP_NEWEST)
+        stuck = BaseActor("stuck", target_loop, mailbox_size=1)
+        target_thread = Thread(target=target_loop.run_forever, daemon=True)
+        target_thread.start()
+        b = BaseActor()
+
+        async def test():
+            messages = [IntMessage(i) for i in range(5)]
+            assert(await b.tell_many(full, messages) == 2)
+            assert(await b.tell_many(stuck, messages[:3]) == 1)
+            assert(await b.tell_many(full, []) == 0)
+        asyncio.get_event_loop().run_until_complete(test())
+        target_loop.call_soon_threadsafe(target_loop.stop)
+        target_thread.join(5)
+        target_loop.close()
+
+    def test_cross_loop_reject(self):
+        """
+        An ask refused by a full REJECT mailbox on another loop fails at
+        once and the refused message is dead lettered.
+        """
+        target_loop = asyncio.new_event_loop()
+        full = BaseActor("full", target_loop, mailbox_size=1,
+                         overflow_policy=OverflowPolicy.REJECT)
+        target_thread = Thread(target=target_loop.run_forever, daemon=True)
+        target_thread.start()
+        b = BaseActor()
+
+        async def test():
+            assert(await b.tell_many(full, [IntMessage(0)]) == 1)
+            with self.assertRaises(MailboxFullError):
+                await b.ask(full, QueryMessage(1), timeout=5)
+        asyncio.get_event_loop().run_until_complete(test())
+        stats = get_bridge(asyncio.get_event_loop(), target_loop).get_stats()
+        assert(stats['dead_lettered'] == 1)
+        target_loop.call_soon_threadsafe(target_loop.stop)
+        target_thread.join(5)
+        target_loop.close()
+
 
 if __name__ == "__main__":
     unittest.main()
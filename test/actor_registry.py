@@ -6,9 +6,15 @@ Created on Oct 14, 2017
 @author: aevans
 '''
 
+import asyncio
+import gc
+import weakref
+from threading import Event, Thread
 from test.actor import StringTestActor
+from test.modules.actors import StopOrderActor
+from compaktor.errors.actor_errors import ChildNodeExistsException
 from compaktor.state.actor_state import ActorState
-from compaktor.registry.actor_registry import Registry
+from compaktor.registry.actor_registry import Registry, get_registry
 import unittest
 
 
@@ -128,3 +134,235 @@ class TestActorRegistry(unittest.TestCase):
         registry.stop_all()
         assert(testa.get_state() == ActorState.TERMINATED)
         assert(testb.get_state() == ActorState.TERMINATED)
+
+    def test_resolve(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("string_test")
+        registry.add_actor("localhost", testa, is_local=True)
+        generation = registry.get_generation()
+        assert(registry.resolve("localhost/string_test") is testa)
+        assert(registry.resolve(("localhost", "string_test")) is testa)
+        assert(registry.resolve("localhost") is None)
+        assert(registry.resolve("localhost/missing") is None)
+        testb = StringTestActor("string_test_b")
+        registry.add_actor("string_test", testb, is_local=True)
+        assert(registry.get_generation() > generation)
+        assert(registry.resolve("localhost/string_test/string_test_b")
+               is testb)
+        registry.remove_branch(["localhost", "string_test"], stop=False)
+        assert(registry.resolve("localhost/string_test") is None)
+        assert(registry.resolve("localhost/string_test/string_test_b")
+               is None)
+
+    def test_resolve_in_batch(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("string_test")
+        registry.add_actor("localhost", testa, is_local=True)
+        assert(registry.resolve("localhost/string_test") is testa)
+        seen = []
+
+        def read():
+            seen.append(registry.resolve("localhost/string_test_b"))
+
+        with registry.batch():
+            registry.remove_branch("localhost/string_test", stop=False)
+            assert(registry.resolve("localhost/string_test") is None)
+            testb = StringTestActor("string_test_b")
+            registry.add_actor("localhost", testb, is_local=True)
+            assert(registry.resolve("localhost/string_test_b") is testb)
+            reader = Thread(target=read)
+            reader.start()
+            reader.join()
+        assert(seen == [None])
+        assert(registry.resolve("localhost/string_test") is None)
+        assert(registry.resolve("localhost/string_test_b") is testb)
+
+    def test_children_snapshot(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("string_test")
+        registry.add_actor("localhost", testa, is_local=True)
+        root = registry.find_node("localhost")
+        snapshot = root._children
+        testb = StringTestActor("string_test_b")
+        registry.add_actor("localhost", testb, is_local=True)
+        registry.remove_branch("localhost/string_test", stop=False)
+        assert(list(snapshot) == ["string_test"])
+        assert(list(root._children) == ["string_test_b"])
+
+    def test_move_branch(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("string_test")
+        testb = StringTestActor("second_level")
+        testc = StringTestActor("string_test_c")
+        registry.add_actor("localhost", testa, is_local=True)
+        registry.add_actor(["localhost", "string_test"], testb, True)
+        registry.add_actor("localhost", testc, is_local=True)
+        assert(registry.resolve("localhost/string_test/second_level")
+               is testb)
+        registry.move_branch("localhost/string_test", "localhost/string_test_c")
+        assert(registry.find_node(["localhost", "string_test"]) is None)
+        node = registry.find_node(
+            ["localhost", "string_test_c", "string_test", "second_level"])
+        assert(node.actor is testb)
+        assert(testb.address == ["localhost", "string_test_c",
+                                 "string_test", "second_level"])
+        assert(registry.resolve("localhost/string_test/second_level")
+               is None)
+        with self.assertRaises(ValueError):
+            registry.move_branch("localhost/string_test_c",
+                                 "localhost/string_test_c/string_test")
+        registry.remove_branch("localhost/string_test_c", stop=False)
+        assert(registry.find_node(
+            ["localhost", "string_test_c", "string_test"]) is None)
+        assert([path for path, _ in registry.get_actors()] == [])
+
+    def test_name_taken(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("string_test")
+        testb = StringTestActor("second_level")
+        registry.add_actor("localhost", testa, is_local=True)
+        registry.add_actor("localhost/string_test", testb, is_local=True)
+        node = registry.find_node("localhost/string_test")
+        assert([child.actor for child in node.children] == [testb])
+        replacement = StringTestActor("string_test")
+        with self.assertRaises(ChildNodeExistsException):
+            registry.add_actor("localhost", replacement, is_local=True)
+        assert(registry.resolve("localhost/string_test") is testa)
+        testa.start()
+        testb.start()
+        asyncio.get_event_loop().run_until_complete(testa.stop())
+        with self.assertRaises(ChildNodeExistsException):
+            registry.add_actor("localhost", replacement, is_local=True)
+        asyncio.get_event_loop().run_until_complete(testb.stop())
+        registry.add_actor("localhost", replacement, is_local=True)
+        assert(registry.resolve("localhost/string_test") is replacement)
+        assert(registry.find_node(
+            "localhost/string_test/second_level") is None)
+
+    def test_batch(self):
+        registry = Registry("localhost")
+        generation = registry.get_generation()
+        seen = []
+
+        def read():
+            seen.append(registry.find_node(["localhost", "batch_a"]))
+
+        with registry.batch():
+            registry.add_actor("localhost", StringTestActor("batch_a"), True)
+            registry.add_actor("localhost/batch_a",
+                               StringTestActor("batch_b"), True)
+            assert(registry.find_node("localhost/batch_a/batch_b")
+                   is not None)
+            reader = Thread(target=read)
+            reader.start()
+            reader.join()
+        assert(seen == [None])
+        assert(registry.get_generation() == generation + 1)
+        read()
+        assert(seen[1].actor.name == "batch_a")
+        assert(len(registry.get_snapshot()) == 3)
+
+    def test_concurrent_reads(self):
+        registry = Registry("localhost")
+        actors = [StringTestActor("reader_{}".format(i)) for i in range(50)]
+        errors = []
+        done = Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    for actor in actors:
+                        found = registry.resolve(actor.address)
+                        assert(found is None or found is actor)
+            except Exception as ex:
+                errors.append(ex)
+
+        readers = [Thread(target=read) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        for _ in range(20):
+            for actor in actors:
+                registry.add_actor("localhost", actor, True)
+            for actor in actors:
+                registry.remove_branch(actor.address, stop=False)
+        done.set()
+        for reader in readers:
+            reader.join()
+        assert(errors == [])
+
+    def test_reap(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("reap_a")
+        testb = StringTestActor("reap_b")
+        registry.add_actor("localhost", testa, is_local=True)
+        registry.add_actor("localhost/reap_a", testb, is_local=True)
+        registry.add_actor("localhost", StringTestActor("reap_c"), True)
+        gc.collect()
+        assert(registry.get_stats()['pending'] == 1)
+        assert(registry.reap() == 1)
+        assert(registry.find_node("localhost/reap_c") is None)
+        loop = asyncio.get_event_loop()
+        testa.start()
+        loop.run_until_complete(testa.stop())
+        assert(registry.find_node("localhost/reap_a").actor is None)
+        assert(registry.reap(1000) == 0)
+        assert(registry.resolve("localhost/reap_a/reap_b") is testb)
+        del testb
+        gc.collect()
+        registry.reap()
+        assert(registry.find_node("localhost/reap_a") is None)
+        stats = registry.get_stats()
+        assert(stats['entries'] == 0 and stats['pending'] == 0)
+        assert(stats['reclaimed_collected'] == 2)
+        assert(stats['reclaimed_terminated'] == 1)
+        assert(get_registry().find_node(["localhost", "reap_a"]) is None)
+
+    def test_running_actor_held(self):
+        registry = Registry("localhost")
+        loop = asyncio.get_event_loop()
+        registry.add_actor("localhost", StringTestActor("held_a"), True)
+        testb = StringTestActor("held_b")
+        registry.add_actor("localhost", testb, is_local=True)
+        testb.start()
+        loop.run_until_complete(asyncio.sleep(0.01))
+        del testb
+        gc.collect()
+        assert(registry.resolve("localhost/held_a") is None)
+        testb = registry.resolve("localhost/held_b")
+        assert(testb is not None)
+        assert(testb.get_state() is ActorState.RUNNING)
+        loop.run_until_complete(testb.stop())
+        assert(registry.find_node("localhost/held_b") is None)
+        ref = weakref.ref(testb)
+        del testb
+        gc.collect()
+        assert(ref() is None)
+
+    def test_close_releases(self):
+        registry = Registry("localhost")
+        testa = StringTestActor("close_a")
+        registry.add_actor("localhost", testa, is_local=True)
+        testb = StringTestActor("close_b")
+        registry.hold(testb)
+        registry.close()
+        refs = [weakref.ref(testa), weakref.ref(testb)]
+        del testa, testb
+        gc.collect()
+        assert([ref() for ref in refs] == [None, None])
+
+    def test_stop_all(self):
+        registry = Registry("localhost")
+        stopped = []
+        actors = [StopOrderActor("stop_top", stopped)]
+        registry.add_actor("localhost", actors[0], is_local=True)
+        for i in range(5):
+            actor = StopOrderActor("stop_{}".format(i), stopped, 0.02)
+            registry.add_actor("localhost/stop_top", actor, is_local=True)
+            actors.append(actor)
+        for actor in actors:
+            actor.start()
+        report = registry.stop_all(concurrency=2)
+        assert(report.is_complete() and len(report.stopped) == 6)
+        assert(report.stopped[-1] == "localhost/stop_top")
+        assert(stopped[-1] == "stop_top")
+        assert(all(a.get_state() is ActorState.TERMINATED for a in actors))
@@ -0,0 +1,143 @@
+'''
+Multi-loop actor system tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+from test.modules.actors import AddTestActor, AddIntMessage, CollectTestActor,\
+    IntMessage, StopOrderActor
+from compaktor.actor.base_actor import BaseActor
+from compaktor.state.actor_state import ActorState
+from compaktor.system.actor_system import ActorSystem
+from compaktor.system.placement import ExplicitPlacement, HashPlacement,\
+    RoundRobinPlacement
+
+
+class TestActorSystem(unittest.TestCase):
+
+    def test_placement(self):
+        loops = ['a', 'b', 'c']
+        rr = RoundRobinPlacement()
+        assert([rr.place(None, loops) for _ in range(4)] == [
+            'a', 'b', 'c', 'a'])
+        hp = HashPlacement()
+        assert(hp.place("worker", loops) == hp.place("worker", loops))
+        ep = ExplicitPlacement({"pinned": 2})
+        assert(ep.place("pinned", loops) == 'c')
+        assert(ep.place("other", loops) == 'a')
+
+    def test_spawn_across_loops(self):
+        sys = ActorSystem("tests", num_loops=2)
+        loops = sys.get_loops()
+        assert(len(loops) == 2)
+        adders = [sys.spawn(AddTestActor, "tests") for _ in range(4)]
+        assert(set(a.loop for a in adders) == set(loops))
+        collect = sys.spawn(CollectTestActor, "tests")
+        b = BaseActor()
+        b.start()
+
+        async def test():
+            for adder in adders:
+                res = await b.ask(adder, AddIntMessage(1), timeout=5)
+                assert(res == 2), "Response not Equals 2 ({})".format(res)
+            for i in range(10):
+                await b.tell(collect, IntMessage(i))
+            for _ in range(100):
+                if len(collect.received) == 10:
+                    break
+                await asyncio.sleep(0.01)
+            await b.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+        assert(collect.received == list(range(10)))
+        sys.close()
+        for actor in adders + [collect]:
+            assert(actor.get_state() is ActorState.TERMINATED)
+        assert(all(loop.is_closed() for loop in loops))
+
+    def test_shutdown(self):
+        stopped = []
+        sys = ActorSystem("shutdown")
+        parent = StopOrderActor("parent", stopped)
+        sys.add_actor(parent, "shutdown")
+        children = [StopOrderActor("child_{}".format(i), stopped, 0.05)
+                    for i in range(20)]
+        for actor in [parent] + children:
+            actor.start()
+        for child in children:
+            sys.add_actor(child, "shutdown/parent")
+        report = sys.stop_actors_on_branch("parent", concurrency=10)
+        assert(report.is_complete())
+        assert(len(report.stopped) == 21)
+        assert(stopped[-1] == "parent")
+        assert(report.elapsed < 0.5)
+        assert(sys.stop_all().stopped == [])
+
+    def test_shutdown_deadline(self):
+        stopped = []
+        sys = ActorSystem("deadline")
+        parent = StopOrderActor("parent", stopped)
+        slow = StopOrderActor("slow", stopped, 1.0)
+        fast = StopOrderActor("fast", stopped)
+        sys.add_actor(parent, "deadline")
+        sys.add_actor(slow, "deadline/parent")
+        sys.add_actor(fast, "deadline/parent")
+
+        async def test():
+            for actor in (parent, slow, fast):
+                actor.start()
+            report = await sys.shutdown(timeout=0.1)
+            while slow.get_state() is not ActorState.TERMINATED:
+                await asyncio.sleep(0.05)
+            return report
+        report = asyncio.get_event_loop().run_until_complete(test())
+        assert(report.stopped == ["deadline/parent/fast"])
+        assert(report.unfinished == [
+            "deadline/parent", "deadline/parent/slow"])
+        assert(not report.is_complete())
+        assert(parent.get_state() is ActorState.RUNNING)
+        assert(sys.close().stopped == ["deadline/parent"])
+
+    def test_shutdown_idle_loop(self):
+        stopped = []
+        sys = ActorSystem("idle")
+        idle_loop = asyncio.new_event_loop()
+        parent = StopOrderActor("parent", stopped)
+        children = [StopOrderActor("child_{}".format(i), stopped, 0.02,
+                                   loop=idle_loop) for i in range(2)]
+        sys.add_actor(parent, "idle")
+        for child in children:
+            sys.add_actor(child, "idle/parent")
+        for actor in [parent] + children:
+            actor.start()
+        report = sys.stop_all()
+        assert(report.is_complete()), report
+        assert(len(report.stopped) == 3)
+        assert(stopped[-1] == "parent")
+        for actor in [parent] + children:
+            assert(actor.get_state() is ActorState.TERMINATED)
+        assert(not idle_loop.is_running())
+        idle_loop.close()
+
+    def test_shutdown_running_loop(self):
+        stopped = []
+        sys = ActorSystem("running")
+        actor = StopOrderActor("actor", stopped)
+        sys.add_actor(actor, "running")
+        actor.start()
+
+        async def test():
+            for blocking in (sys.stop_all, sys.close):
+                with self.assertRaisesRegex(RuntimeError, "await"):
+                    blocking()
+            report = await sys.shutdown()
+            assert(report.stopped == ["running/actor"])
+        asyncio.get_event_loop().run_until_complete(test())
+        assert(actor.get_state() is ActorState.TERMINATED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -110,5 +110,31 @@ def test_balancing_at_load():
     print("Done Load Testing")
 
 
+
+def test_balancing_router_registers_actors():
+    print("Testing Actor Registration")
+    sys = ActorSystem("tests")
+
+    async def create():
+        return BalancingRouter("test_router")
+
+    rr = asyncio.get_event_loop().run_until_complete(create())
+    rr.start()
+    rr.set_actor_system(sys, "tests")
+    other = asyncio.get_event_loop().run_until_complete(create())
+    assert(other.get_num_actors() == 0), "Routers Share Actors"
+
+    a = BaseActor("testa")
+    a.start()
+    rr.add_actor(a)
+    assert(rr.get_num_actors() == 1), "Actor Missing"
+    assert(other.get_num_actors() == 0), "Routers Share Actors"
+    sys.close()
+    rr.close_queue()
+    other.close_queue()
+    assert(a.get_state() is ActorState.TERMINATED), "Actor a Not Terminated"
+    print("Actor Registration Complete")
+
+
 if __name__ == "__main__":
     test_balancing_router_arithemetic()
@@ -0,0 +1,141 @@
+'''
+Dead letter office tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+from test.modules.actors import IntMessage, StringMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.errors.actor_errors import HandlerNotFoundError
+from compaktor.message.message_objects import DeadLetter, QueryMessage
+from compaktor.structure.mailbox import OverflowPolicy
+from compaktor.system.dead_letters import DeadLetterOffice,\
+    DeadLetterReason, get_dead_letter_office
+
+
+class DeadLetterCollector(BaseActor):
+
+    def __init__(self, name=None, loop=None):
+        super().__init__(name, loop)
+        self.letters = []
+        self.register_handler(DeadLetter, self.collect)
+
+    async def collect(self, message):
+        self.letters.append(message)
+
+
+class FullTarget(BaseActor):
+
+    def __init__(self, name=None, loop=None):
+        super().__init__(name, loop, mailbox_size=1,
+                         overflow_policy=OverflowPolicy.DEAD_LETTER)
+        self.received = []
+        self.register_handler(IntMessage, self.collect)
+
+    async def collect(self, message):
+        self.received.append(message.payload)
+
+
+class TestDeadLetters(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        office = DeadLetterOffice(capacity=3)
+        for i in range(5):
+            office.post(IntMessage(i), DeadLetterReason.NO_TARGET, "nobody")
+        letters = office.get_letters()
+        assert([letter.payload.payload for letter in letters] == [2, 3, 4])
+        assert(letters[0].recipient == "nobody")
+        stats = office.get_stats()
+        assert(stats['posted'] == 5 and stats['overwritten'] == 2)
+        assert(stats['buffered'] == 3)
+        office.clear()
+        assert(office.get_letters() == [])
+
+    def test_sampling_and_subscribers(self):
+        office = DeadLetterOffice(sample_every=3)
+        full = []
+        closed = []
+        office.subscribe(full.append, [DeadLetterReason.MAILBOX_FULL])
+        office.subscribe(closed.append, [DeadLetterReason.QUEUE_CLOSED])
+        for i in range(7):
+            office.post(IntMessage(i), DeadLetterReason.MAILBOX_FULL)
+        assert([letter.payload.payload for letter in full] == [0, 3, 6])
+        assert(closed == [])
+        office.unsubscribe(full.append)
+        office.unsubscribe(closed.append)
+        office.post(IntMessage(7), DeadLetterReason.MAILBOX_FULL)
+        stats = office.get_stats()
+        assert(stats['by_reason'] == {DeadLetterReason.MAILBOX_FULL: 8})
+        assert(stats['sampled_out'] == 5)
+
+    def test_undeliverable(self):
+        office = get_dead_letter_office()
+        office.clear()
+
+        async def test():
+            collector = DeadLetterCollector()
+            sender = BaseActor()
+            target = FullTarget()
+            collector.start()
+            sender.start()
+            office.subscribe(collector)
+            try:
+                await sender.tell("localhost/missing_actor", IntMessage(1))
+                target._receive_nowait(IntMessage(2))
+                target._receive_nowait(IntMessage(3))
+                target.start()
+                await asyncio.sleep(0)
+                await sender.tell(target, StringMessage('unhandled'))
+                await asyncio.sleep(0)
+                with self.assertRaises(HandlerNotFoundError):
+                    await sender.ask(target, QueryMessage(4), timeout=5)
+                assert(target.received == [2])
+            finally:
+                office.unsubscribe(collector)
+            await target.stop()
+            await collector.stop()
+            await sender.stop()
+            return collector.letters
+        letters = asyncio.get_event_loop().run_until_complete(test())
+        reasons = [letter.reason for letter in letters]
+        assert(reasons == [DeadLetterReason.NO_TARGET,
+                           DeadLetterReason.MAILBOX_FULL,
+                           DeadLetterReason.NO_HANDLER,
+                           DeadLetterReason.NO_HANDLER])
+        assert(letters[0].recipient == "localhost/missing_actor")
+        assert(letters[1].payload.payload == 3)
+        assert(office.get_stats()['posted'] == 4)
+
+
+    def test_other_loop_subscriber(self):
+        office = DeadLetterOffice(max_pending=3)
+        other = asyncio.new_event_loop()
+        collector = DeadLetterCollector(loop=other)
+        collector.start()
+        office.subscribe(collector)
+        try:
+            office.post(IntMessage(0), DeadLetterReason.NO_HANDLER, collector)
+            for i in range(1, 6):
+                office.post(IntMessage(i), DeadLetterReason.NO_TARGET)
+            assert(office.get_stats()['dropped'] == 2)
+            other.run_until_complete(asyncio.sleep(0.05))
+            payloads = [letter.payload.payload
+                        for letter in collector.letters]
+            assert(payloads == [1, 2, 3])
+            office.post(IntMessage(6), DeadLetterReason.NO_TARGET)
+            other.run_until_complete(asyncio.sleep(0.05))
+            assert(collector.letters[-1].payload.payload == 6)
+        finally:
+            office.unsubscribe(collector)
+            other.run_until_complete(collector.stop())
+            other.close()
+        stats = office.get_stats()
+        assert(stats['posted'] == 7 and stats['undelivered'] == 0)
+        assert(stats['dropped'] == 2)
+
+if __name__ == "__main__":
+    unittest.main()
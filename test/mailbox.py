@@ -0,0 +1,239 @@
+'''
+Mailbox overflow policy tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+import time
+from test.modules.actors import CollectTestActor, IntMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.errors.actor_errors import MailboxFullError
+from compaktor.message.message_objects import PoisonPill, QueryMessage
+from compaktor.state.actor_state import ActorState
+from compaktor.structure.mailbox import Mailbox, OverflowPolicy,\
+    QueueMailbox
+from compaktor.structure.queue import BlockingQueue
+
+
+class TestMailbox(unittest.TestCase):
+
+    def fill(self, mailbox, count):
+        loop = asyncio.get_event_loop()
+        return [loop.run_until_complete(mailbox.put(IntMessage(i)))
+                for i in range(count)]
+
+    def drain(self, mailbox):
+        items = []
+        while not mailbox.empty():
+            items.append(mailbox.get_nowait().payload)
+        return items
+
+    def test_drop_newest(self):
+        mailbox = Mailbox(2, policy=OverflowPolicy.DROP_NEWEST)
+        assert(self.fill(mailbox, 3) == [True, True, False])
+        assert(self.drain(mailbox) == [0, 1])
+        assert(mailbox.get_stats()['dropped'] == 1)
+
+    def test_drop_oldest(self):
+        mailbox = Mailbox(2, policy=OverflowPolicy.DROP_OLDEST)
+        self.fill(mailbox, 3)
+        assert(self.drain(mailbox) == [1, 2])
+        stats = mailbox.get_stats()
+        assert(stats['dropped'] == 1)
+        assert(stats['enqueued'] == 3 and stats['dequeued'] == 2)
+        assert(stats['max_depth'] == 2)
+
+    def test_reject(self):
+        mailbox = Mailbox(1, policy=OverflowPolicy.REJECT)
+        self.fill(mailbox, 1)
+        with self.assertRaises(MailboxFullError):
+            self.fill(mailbox, 1)
+        assert(mailbox.get_stats()['rejected'] == 1)
+
+    def test_offer(self):
+        mailbox = Mailbox(1)
+        assert(mailbox.offer(IntMessage(0)) is True)
+        assert(mailbox.offer(IntMessage(1)) is None)
+        assert(mailbox.offer(PoisonPill()) is True)
+        dropping = Mailbox(1, policy=OverflowPolicy.DROP_OLDEST)
+        dropping.offer(IntMessage(0))
+        assert(dropping.offer(IntMessage(1)) is True)
+        assert(self.drain(dropping) == [1])
+
+    def test_offer_many(self):
+        mailbox = Mailbox(3)
+        items = [IntMessage(0), PoisonPill(), IntMessage(1), IntMessage(2),
+                 IntMessage(3)]
+        assert(mailbox.offer_many(items) == (4, 4))
+        assert(mailbox.offer_many(items[4:]) == (0, 0))
+        dropping = Mailbox(2, policy=OverflowPolicy.DROP_NEWEST)
+        assert(dropping.offer_many(
+            [IntMessage(i) for i in range(4)]) == (4, 2))
+        assert(self.drain(dropping) == [0, 1])
+        stats = dropping.get_stats()
+        assert(stats['enqueued'] == 2 and stats['dropped'] == 2)
+
+    def test_block_timeout(self):
+        mailbox = Mailbox(1, policy=OverflowPolicy.BLOCK_TIMEOUT,
+                          put_timeout=0.05)
+        self.fill(mailbox, 1)
+        with self.assertRaises(MailboxFullError):
+            self.fill(mailbox, 1)
+        assert(mailbox.get_stats()['rejected'] == 1)
+
+    def test_dead_letter(self):
+        letters = []
+        mailbox = Mailbox(1, policy=OverflowPolicy.DEAD_LETTER,
+                          dead_letters=lambda m, r: letters.append((m, r)))
+        self.fill(mailbox, 2)
+        assert(len(letters) == 1)
+        assert(letters[0][0].payload == 1)
+        assert(mailbox.get_stats()['redirected'] == 1)
+
+    def test_block(self):
+        mailbox = Mailbox(1)
+
+        async def test():
+            await mailbox.put(IntMessage(0))
+            put = asyncio.ensure_future(mailbox.put(IntMessage(1)))
+            await asyncio.sleep(0.05)
+            assert(not put.done())
+            assert(mailbox.get_nowait().payload == 0)
+            await put
+            assert(mailbox.get_nowait().payload == 1)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_actor_policy(self):
+        async def test():
+            a = BaseActor(mailbox_size=1,
+                          overflow_policy=OverflowPolicy.DROP_NEWEST)
+            b = BaseActor()
+            await b.tell(a, IntMessage(0))
+            await b.tell(a, IntMessage(1))
+            assert(a.get_mailbox_stats()['dropped'] == 1)
+            assert(a.get_mailbox_stats()['depth'] == 1)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_dropped_ask(self):
+        """
+        An ask dropped by a full mailbox fails at once instead of waiting
+        for a reply that never comes.
+        """
+        async def test():
+            b = BaseActor()
+            for policy in (OverflowPolicy.DROP_NEWEST,
+                           OverflowPolicy.DROP_OLDEST):
+                a = BaseActor(mailbox_size=1, overflow_policy=policy)
+                first = QueryMessage(0)
+                second = QueryMessage(1)
+                asks = [asyncio.ensure_future(b.ask(a, first)),
+                        asyncio.ensure_future(b.ask(a, second))]
+                done, _ = await asyncio.wait(asks, timeout=1)
+                assert(len(done) == 1)
+                with self.assertRaises(MailboxFullError):
+                    done.pop().result()
+                assert(a.get_mailbox_stats()['dropped'] == 1)
+                for ask in asks:
+                    ask.cancel()
+                await asyncio.sleep(0)
+            assert(b.get_pending_asks() == 0)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_control_lane(self):
+        """
+        Control messages overtake user messages, which stay FIFO, and are
+        accepted even when the user lane is full.
+        """
+        mailbox = Mailbox(2, policy=OverflowPolicy.REJECT)
+        self.fill(mailbox, 2)
+        asyncio.get_event_loop().run_until_complete(mailbox.put(PoisonPill()))
+        assert(isinstance(mailbox.get_nowait(), PoisonPill))
+        assert(self.drain(mailbox) == [0, 1])
+
+    def test_wrapped_control_lane(self):
+        """
+        A control message wakes a reader waiting on a wrapped queue without
+        losing the user message that arrives later.
+        """
+        async def test():
+            mailbox = QueueMailbox(asyncio.Queue())
+            get = asyncio.ensure_future(mailbox.get())
+            await asyncio.sleep(0.01)
+            await mailbox.put(PoisonPill())
+            assert(isinstance(await get, PoisonPill))
+            await mailbox.put(IntMessage(1))
+            assert((await mailbox.get()).payload == 1)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_saturated_stop(self):
+        """
+        Stopping a saturated actor does not wait for the backlog.
+        """
+        async def slow(message):
+            await asyncio.sleep(0.01)
+
+        async def test():
+            a = BaseActor(mailbox_size=100)
+            a.register_handler(IntMessage, slow)
+            b = BaseActor()
+            for i in range(100):
+                await b.tell(a, IntMessage(i))
+            a.start()
+            await asyncio.sleep(0.05)
+            start = time.time()
+            await asyncio.wait_for(a.stop(), 1)
+            assert(time.time() - start < 0.5)
+            assert(a.get_state() is ActorState.TERMINATED)
+            assert(a.get_mailbox_stats()['depth'] > 0)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_shared_queue_stop(self):
+        """
+        A reader stopped on a shared queue leaves later messages to the
+        others and a closed queue ends the stream instead of the actor.
+        """
+        async def test():
+            shared = BlockingQueue(max_size=10)
+            a = CollectTestActor("shared_a", inbox=shared)
+            b = CollectTestActor("shared_b", inbox=shared)
+            a.start()
+            b.start()
+            await asyncio.sleep(0.01)
+            await asyncio.wait_for(a.stop(), 1)
+            for i in range(5):
+                await shared.put(IntMessage(i))
+            await asyncio.sleep(0.05)
+            assert(a.received == [] and b.received == list(range(5)))
+            shared.close()
+            c = CollectTestActor("shared_c", inbox=shared)
+            c.start()
+            await asyncio.sleep(0.01)
+            await asyncio.wait_for(b.stop(), 1)
+            await asyncio.wait_for(c.stop(), 1)
+            assert(c.get_state() is ActorState.TERMINATED)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_release_put_back(self):
+        """
+        A message already taken by the pending get is put back on close.
+        """
+        async def test():
+            queue = asyncio.Queue()
+            mailbox = QueueMailbox(queue)
+            get = asyncio.ensure_future(mailbox.get())
+            await asyncio.sleep(0)
+            mailbox.put_control(PoisonPill())
+            await queue.put(IntMessage(1))
+            assert(isinstance(await get, PoisonPill))
+            await asyncio.sleep(0)
+            mailbox.close()
+            assert(queue.get_nowait().payload == 1)
+        asyncio.get_event_loop().run_until_complete(test())
+
+
+if __name__ == "__main__":
+    unittest.main()
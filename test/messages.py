@@ -0,0 +1,73 @@
+'''
+Message envelope tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+from test.modules.actors import AddIntMessage, StringMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.message.message_objects import Message, MessageTag,\
+    PoisonPill, PullQuery, QueryMessage, SplitPublish
+
+
+class TestMessages(unittest.TestCase):
+
+    def test_slots(self):
+        """
+        Built-in messages carry no per-instance dictionary.
+        """
+        for msg in [Message(1), PoisonPill(), QueryMessage(1),
+                    SplitPublish("split", 1)]:
+            assert(not hasattr(msg, '__dict__'))
+        msg = SplitPublish("split", 1)
+        assert(msg.split_name == "split")
+        assert(repr(msg) == "Message(1, None, split)")
+
+    def test_tags(self):
+        """
+        Tags identify the built-in messages and are inherited by subclasses.
+        """
+        assert(PoisonPill.type_tag == MessageTag.POISON_PILL)
+        assert(PullQuery.type_tag & MessageTag.QUERY)
+        assert(not Message.type_tag & MessageTag.QUERY)
+        assert(AddIntMessage.type_tag == MessageTag.QUERY_MESSAGE)
+        assert(StringMessage.type_tag == MessageTag.MESSAGE)
+
+    def test_user_subclass(self):
+        """
+        User subclasses keep a dictionary and the query result slot.
+        """
+        msg = AddIntMessage(1)
+        assert(msg.result is None)
+        msg.note = "extra"
+        assert(msg.note == "extra")
+        assert(msg.payload == 1)
+
+        class BareQuery(QueryMessage):
+
+            def __init__(self, value):
+                self.value = value
+
+        msg = BareQuery(2)
+        assert(getattr(msg, 'result', None) is None)
+        assert(QueryMessage(1).result is None)
+
+        async def double(message):
+            return message.value * 2
+
+        async def test():
+            a = BaseActor()
+            b = BaseActor()
+            a.register_handler(BareQuery, double)
+            a.start()
+            assert(await b.ask(a, msg, timeout=5) == 4)
+            await a.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+'''
+Actor instrumentation tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+from test.modules.actors import AddTestActor, AddIntMessage,\
+    CollectTestActor, IntMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.message.message_objects import Message
+from compaktor.metrics.actor_metrics import get_metrics_registry
+from compaktor.metrics.exporter import MailboxExporter, MailboxSampler
+from compaktor.metrics.histogram import Histogram
+from compaktor.structure.mailbox import Mailbox, OverflowPolicy
+from compaktor.system.actor_system import ActorSystem
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram(self):
+        histogram = Histogram()
+        size = len(histogram)
+        for i in range(1, 1001):
+            histogram.record(i * 1e-6)
+        assert(len(histogram) == size)
+        assert(histogram.count == 1000)
+        assert(histogram.min == 1e-6 and histogram.max == 1e-3)
+        assert(abs(histogram.percentile(0.5) - 500e-6) <= 500e-6 * 0.07)
+        assert(abs(histogram.percentile(0.99) - 990e-6) <= 990e-6 * 0.07)
+        histogram.record(1e6)
+        assert(histogram.percentile(1.0) == 1e6)
+        other = Histogram()
+        other.record(2e-9)
+        histogram.merge(other)
+        assert(histogram.count == 1002 and histogram.min == 2e-9)
+        histogram.reset()
+        assert(histogram.snapshot()['p50'] is None)
+
+    def test_mailbox_timing(self):
+        mailbox = Mailbox(2, policy=OverflowPolicy.DROP_OLDEST)
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(mailbox.put(IntMessage(0)))
+        mailbox.set_timing(True)
+        for i in range(1, 3):
+            loop.run_until_complete(mailbox.put(IntMessage(i)))
+        assert(mailbox.get_nowait().payload == 1)
+        first = mailbox.get_enqueue_time()
+        assert(mailbox.get_nowait().payload == 2)
+        assert(mailbox.get_enqueue_time() >= first)
+        mailbox.set_timing(False)
+        assert(mailbox.get_enqueue_time() is None)
+
+    def test_actor_metrics(self):
+        async def test():
+            plain = BaseActor()
+            assert(plain.get_metrics() is None)
+            actor = AddTestActor("metrics_add")
+            actor.enable_metrics()
+            sender = BaseActor()
+            actor.start()
+            sender.start()
+            for i in range(5):
+                await sender.tell(actor, IntMessage(i))
+            await sender.tell(actor, Message('not a number'))
+            assert(await sender.ask(actor, AddIntMessage(1)) == 2)
+            snapshot = actor.get_metrics()
+            await actor.stop()
+            await sender.stop()
+            return snapshot
+        snapshot = asyncio.get_event_loop().run_until_complete(test())
+        assert(snapshot['name'] == "metrics_add")
+        ints = snapshot['messages']['IntMessage']
+        assert(ints['messages'] == 5 and ints['failures'] == 0)
+        assert(ints['queue_wait']['count'] == 5)
+        assert(ints['handler_time']['count'] == 5)
+        assert(snapshot['messages']['Message']['failures'] == 1)
+        asks = snapshot['messages']['AddIntMessage']
+        assert(asks['asks'] == 1 and asks['failures'] == 0)
+        names = [m['name'] for m in get_metrics_registry().snapshot()]
+        assert("metrics_add" in names)
+
+    def test_registry_switch(self):
+        metrics = get_metrics_registry()
+        metrics.enable()
+        try:
+            actor = BaseActor()
+        finally:
+            metrics.disable()
+        assert(actor.get_metrics() is not None)
+        assert(BaseActor().get_metrics() is None)
+
+    def test_sampler_keys_paths(self):
+        loop = asyncio.get_event_loop()
+        first = CollectTestActor(name="sampled_first")
+        second = CollectTestActor(name="sampled_second")
+        for actor, count in ((first, 3), (second, 1)):
+            actor.start()
+            for i in range(count):
+                actor._receive_nowait(IntMessage(i))
+
+        class Source(object):
+            actors = [("sampled", first)]
+
+            def get_actors(self):
+                return list(self.actors)
+        source = Source()
+        sampler = MailboxSampler([source])
+        assert(sampler.sample()[0]['enqueued'] == 3)
+        source.actors = [("sampled", second), ("moved", first)]
+        first._receive_nowait(IntMessage(3))
+        samples = sampler.sample()
+        assert([s['enqueue_rate'] for s in samples] == [0.0, 0.0])
+        second._receive_nowait(IntMessage(1))
+        assert(sampler.sample()[0]['enqueue_rate'] > 0)
+        for actor in (first, second):
+            loop.run_until_complete(actor.stop())
+
+    def test_mailbox_exporter(self):
+        system = ActorSystem("exported")
+        loop = asyncio.get_event_loop()
+        actor = CollectTestActor(name="exported_actor")
+        system.add_actor(actor, "exported")
+        actor.start()
+        for i in range(3):
+            actor._receive_nowait(IntMessage(i))
+        sampler = MailboxSampler([system])
+        samples = sampler.sample()
+        assert(len(samples) == 1)
+        assert(samples[0]['path'] == "exported/exported_actor")
+        assert(samples[0]['depth'] == 3 and samples[0]['enqueued'] == 3)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "mailboxes.prom")
+        socket_path = os.path.join(directory, "mailboxes.sock")
+        exporter = MailboxExporter(
+            sampler, path=path, socket_path=socket_path, interval=60)
+        exporter.start()
+        try:
+            with open(path) as dump:
+                text = dump.read()
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            served = b''
+            chunk = client.recv(65536)
+            while chunk:
+                served += chunk
+                chunk = client.recv(65536)
+            client.close()
+        finally:
+            exporter.stop()
+            loop.run_until_complete(actor.stop())
+        assert(served.decode('utf-8') == text)
+        assert("# TYPE compaktor_mailbox_depth gauge" in text)
+        line = 'compaktor_mailbox_depth{actor="exported_actor",' +\
+            'path="exported/exported_actor"} 3.0'
+        assert(line in text.splitlines())
+        assert(not os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
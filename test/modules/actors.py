@@ -57,3 +57,50 @@ class AddTestActor(BaseActor):
 
     async def add_test(self, message):
         return message.payload + 1
+
+
+class CollectTestActor(BaseActor):
+
+    def __init__(self, name="CollectTest", loop=asyncio.get_event_loop(),
+                 address=None, mailbox_size=1000, inbox=None, batch_size=64):
+        super().__init__(name, loop, address, mailbox_size, inbox,
+                         batch_size=batch_size)
+        self.received = []
+        self.register_handler(IntMessage, self.collect)
+        self.register_handler(QueryMessage, self.get_received)
+
+    async def collect(self, message):
+        self.received.append(message.payload)
+
+    async def get_received(self, message):
+        return list(self.received)
+
+
+class SlowTestActor(BaseActor):
+
+    def __init__(self, name="SlowTest", loop=asyncio.get_event_loop(),
+                 delay=0.5):
+        super().__init__(name, loop)
+        self.delay = delay
+        self.register_handler(QueryMessage, self.reply_late)
+
+    async def reply_late(self, message):
+        await asyncio.sleep(self.delay)
+        return self.delay
+
+
+class StopOrderActor(BaseActor):
+
+    def __init__(self, name, stopped, delay=0.0,
+                 loop=asyncio.get_event_loop()):
+        super().__init__(name, loop)
+        self.stopped = stopped
+        self.delay = delay
+
+    async def _stop(self):
+        await asyncio.sleep(self.delay)
+        await super()._stop()
+
+    def post_stop(self):
+        super().post_stop()
+        self.stopped.append(self.name)
@@ -0,0 +1,93 @@
+'''
+Process sharded runtime tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+from test.modules.actors import AddTestActor, AddIntMessage,\
+    CollectTestActor, IntMessage, SlowTestActor
+from compaktor.actor.base_actor import BaseActor
+from compaktor.errors.actor_errors import AskTimeoutError
+from compaktor.message.message_objects import QueryMessage
+from compaktor.multiprocessing.runtime.process_runtime import ProcessRuntime
+from compaktor.registry import actor_registry as registry
+from compaktor.state.actor_state import ActorState
+
+
+class TestProcessRuntime(unittest.TestCase):
+
+    def test_remote_tell_ask(self):
+        async def test():
+            runtime = ProcessRuntime(2)
+            runtime.start()
+            try:
+                proxies = [await runtime.spawn(AddTestActor) for _ in range(2)]
+                assert(set(p.get_worker().index for p in proxies) == {0, 1})
+                node = registry.get_registry().find_node(proxies[0].address)
+                assert(node.actor is proxies[0] and node.is_local is False)
+                b = BaseActor()
+                b.start()
+                for proxy in proxies:
+                    await b.tell(proxy, AddIntMessage(1, b))
+                    res = await b.ask(proxy, AddIntMessage(1, b), timeout=10)
+                    assert(res == 2), "Response not Equals 2 ({})".format(res)
+                await proxies[0].stop()
+                assert(proxies[0].get_state() is ActorState.TERMINATED)
+                await b.stop()
+            finally:
+                await runtime.shutdown()
+            assert(runtime.get_pending() == 0)
+            assert(registry.get_registry().find_node(proxies[1].address) is None)
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_remote_ask_timeout(self):
+        """
+        A remote ask that times out stops being tracked by the runtime.
+        """
+        async def test():
+            runtime = ProcessRuntime(1)
+            try:
+                slow = await runtime.spawn(SlowTestActor)
+                b = BaseActor()
+                b.start()
+                with self.assertRaises(AskTimeoutError):
+                    await b.ask(slow, QueryMessage(), timeout=0.05)
+                await asyncio.sleep(0)
+                assert(runtime.get_pending() == 0)
+                assert(b.get_pending_asks() == 0)
+                await b.stop()
+            finally:
+                await runtime.shutdown()
+        asyncio.get_event_loop().run_until_complete(test())
+
+    def test_shm_transport(self):
+        """
+        Commands through a small ring keep their order when the ring fills
+        and when a message larger than the pipe buffer is too large for it
+        while the ring is backlogged.
+        """
+        async def test():
+            runtime = ProcessRuntime(1, transport='shm', ring_size=4096)
+            try:
+                collect = await runtime.spawn(CollectTestActor)
+                b = BaseActor()
+                b.start()
+                for i in range(500):
+                    await b.tell(collect, IntMessage(i))
+                await b.tell(collect, IntMessage(bytes(1 << 20)))
+                await b.tell(collect, IntMessage(500))
+                res = await b.ask(collect, QueryMessage(), timeout=10)
+                assert(res[:500] == list(range(500)))
+                assert(res[500] == bytes(1 << 20) and res[501] == 500)
+                await b.stop()
+            finally:
+                await runtime.shutdown()
+        asyncio.get_event_loop().run_until_complete(test())
+
+
+if __name__ == "__main__":
+    unittest.main()
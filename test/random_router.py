@@ -8,7 +8,7 @@ import unittest
 import asyncio
 import gc
 from test.modules.actors import AddTestActor, AddIntMessage, StringMessage,\
-                                StringTestActor
+                                StringTestActor, CollectTestActor, IntMessage
 from compaktor.system.actor_system import ActorSystem
 from compaktor.state.actor_state import ActorState
 from compaktor.routing.random import RandomRouter
@@ -99,12 +99,12 @@ class TestRandomRouter(unittest.TestCase):
         rr.start()
         rr.set_actor_system(sys, "tests")
     
-        a = StringTestActor()
+        a = StringTestActor("testa")
         a.start()
         rr.add_actor(a)
         print(rr.actor_set)
     
-        b = StringTestActor()
+        b = StringTestActor("testb")
         b.start()
         rr.add_actor(b)
         print(rr.actor_set)
@@ -126,18 +126,18 @@ class TestRandomRouter(unittest.TestCase):
         rr.start()
         rr.set_actor_system(sys, "tests")
     
-        a = StringTestActor()
+        a = StringTestActor("testa")
         a.start()
         rr.add_actor(a)
     
-        b = StringTestActor()
+        b = StringTestActor("testb")
         b.start()
         rr.add_actor(b)
     
         asyncio.get_event_loop().run_until_complete(
             rr.broadcast(StringMessage("Hello World!")))
         msg = "Actors Missing. Length {}".format(rr.get_num_actors())
-        assert(rr.get_num_actors() is 3), msg
+        assert(rr.get_num_actors() == 2), msg
     
         asyncio.get_event_loop().run_until_complete(
             rr.route_tell(StringMessage("Hello World")))
@@ -216,3 +216,40 @@ class TestRandomRouter(unittest.TestCase):
         del gc.garbage[:]
         assert(rr.get_state() is ActorState.TERMINATED), "Router Not Terminated"
         print("Load Testing With Tell Complete")
+
+    def test_random_router_own_actors(self):
+        sys = ActorSystem("tests")
+        rr = RandomRouter("test_router")
+        rr.start()
+        rr.set_actor_system(sys, "tests")
+        other = RandomRouter("other_router")
+        other.start()
+        other.set_actor_system(sys, "tests")
+
+        a = BaseActor("testa")
+        a.start()
+        rr.add_actor(a)
+        assert(rr.get_num_actors() == 1), "Actor Missing"
+        assert(other.get_num_actors() == 0), "Routers Share Actors"
+        sys.close()
+        assert(a.get_state() is ActorState.TERMINATED), "Actor a Not Terminated"
+
+    def test_random_router_tell_delivers(self):
+        sys = ActorSystem("tests")
+        rr = RandomRouter("test_router")
+        rr.start()
+        rr.set_actor_system(sys, "tests")
+
+        a = CollectTestActor("testa")
+        a.start()
+        rr.add_actor(a)
+
+        async def deliver():
+            await rr.route_tell(IntMessage(1))
+            await rr.broadcast(IntMessage(2))
+            await asyncio.sleep(0.1)
+
+        asyncio.get_event_loop().run_until_complete(deliver())
+        assert(a.received == [1, 2]), "Received {}".format(a.received)
+        sys.close()
+        assert(a.get_state() is ActorState.TERMINATED), "Actor a Not Terminated"
@@ -2,11 +2,12 @@
 import asyncio
 import gc
 from test.modules.actors import AddTestActor, AddIntMessage, StringMessage,\
-                                StringTestActor
+                                StringTestActor, CollectTestActor, IntMessage
 from compaktor.system.actor_system import ActorSystem
 from compaktor.state.actor_state import ActorState
 from compaktor.routing.round_robin import RoundRobinRouter
 from compaktor.actor.base_actor import BaseActor
+from compaktor.message.message_objects import RouteTell
 
 
 def test_round_robin_actor_addition():
@@ -74,11 +75,11 @@ def test_round_robin_tell():
     rr.start()
     rr.set_actor_system(sys, "tests")
 
-    a = StringTestActor()
+    a = StringTestActor("testa")
     a.start()
     rr.add_actor(a)
 
-    b = StringTestActor()
+    b = StringTestActor("testb")
     b.start()
     rr.add_actor(b)
     msg = "Actors Missing. Length {}".format(rr.get_num_actors())
@@ -100,11 +101,11 @@ def test_round_robin_broadcast():
     rr.start()
     rr.set_actor_system(sys, "tests")
 
-    a = StringTestActor()
+    a = StringTestActor("testa")
     a.start()
     rr.add_actor(a)
 
-    b = StringTestActor()
+    b = StringTestActor("testb")
     b.start()
     rr.add_actor(b)
 
@@ -187,3 +188,52 @@ def test__round_robin_tell_at_load():
     del gc.garbage[:]
     assert(rr.get_state() is ActorState.TERMINATED), "Router Not Terminated"
     print("Load Testing With Tell Complete")
+
+
+def test_round_robin_own_actors():
+    print("Testing Separate Actor Sets")
+    sys = ActorSystem("tests")
+    rr = RoundRobinRouter("test_router")
+    rr.start()
+    rr.set_actor_system(sys, "tests")
+    other = RoundRobinRouter("other_router")
+    other.start()
+    other.set_actor_system(sys, "tests")
+
+    a = BaseActor("testa")
+    a.start()
+    rr.add_actor(a)
+    assert(rr.get_num_actors() == 1), "Actor Missing"
+    assert(other.get_num_actors() == 0), "Routers Share Actors"
+    sys.close()
+    assert(a.get_state() is ActorState.TERMINATED), "Actor a Not Terminated"
+    print("Separate Actor Sets Complete")
+
+
+def test_round_robin_broadcast_delivers():
+    print("Testing Broadcast Delivery")
+    sys = ActorSystem("tests")
+    rr = RoundRobinRouter("test_router")
+    rr.start()
+    rr.set_actor_system(sys, "tests")
+
+    a = CollectTestActor("testa")
+    a.start()
+    rr.add_actor(a)
+
+    b = CollectTestActor("testb")
+    b.start()
+    rr.add_actor(b)
+
+    async def deliver():
+        await rr.broadcast(IntMessage(1))
+        await rr.route_tell(RouteTell(IntMessage(2)))
+        await asyncio.sleep(0.1)
+
+    asyncio.get_event_loop().run_until_complete(deliver())
+    assert(a.received == [1, 2]), "Received {}".format(a.received)
+    assert(b.received == [1]), "Received {}".format(b.received)
+    sys.close()
+    assert(a.get_state() is ActorState.TERMINATED), "Actor a Not Terminated"
+    assert(b.get_state() is ActorState.TERMINATED), " Actor b Not Terminated"
+    print("Broadcast Delivery Complete")
@@ -0,0 +1,104 @@
+'''
+Time budget and loop accounting tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import time
+import unittest
+from test.modules.actors import IntMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.system.scheduling import disable_accounting,\
+    enable_accounting, get_loop_accounting
+
+
+class BusyActor(BaseActor):
+
+    def __init__(self, name=None, loop=None, work=0.001, time_budget=None):
+        super().__init__(name, loop, batch_size=1000,
+                         time_budget=time_budget)
+        self.work = work
+        self.handled = 0
+        self.register_handler(IntMessage, self.busy)
+
+    async def busy(self, message):
+        end = time.perf_counter() + self.work
+        while time.perf_counter() < end:
+            pass
+        self.handled += 1
+
+
+class ProbeActor(BaseActor):
+
+    def __init__(self, name=None, loop=None, other=None):
+        super().__init__(name, loop)
+        self.other = other
+        self.seen = None
+        self.register_handler(IntMessage, self.probe)
+
+    async def probe(self, message):
+        self.seen = self.other.handled
+
+
+class TestScheduling(unittest.TestCase):
+
+    def run_backlog(self, time_budget):
+        async def test():
+            busy = BusyActor(time_budget=time_budget)
+            probe = ProbeActor(other=busy)
+            for i in range(200):
+                busy._receive_nowait(IntMessage(i))
+            busy.start()
+            probe.start()
+            probe._receive_nowait(IntMessage(0))
+            while busy.handled < 200:
+                await asyncio.sleep(0.001)
+            await busy.stop()
+            await probe.stop()
+            return probe.seen
+        return asyncio.get_event_loop().run_until_complete(test())
+
+    def test_time_budget(self):
+        assert(self.run_backlog(None) == 200)
+        assert(self.run_backlog(0.005) < 50)
+
+    def test_accounting(self):
+        loop = asyncio.get_event_loop()
+        accounting = enable_accounting(loop, interval=0.01, threshold=0.02)
+        assert(get_loop_accounting(loop) is accounting)
+        assert(enable_accounting(loop) is accounting)
+
+        async def test():
+            budgeted = BusyActor("budgeted", time_budget=0.002)
+            hog = BusyActor("hog", work=0.05)
+            budgeted.start()
+            hog.start()
+            for i in range(50):
+                budgeted._receive_nowait(IntMessage(i))
+            await asyncio.sleep(0.03)
+            hog._receive_nowait(IntMessage(0))
+            while budgeted.handled < 50 or hog.handled < 1:
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.03)
+            await budgeted.stop()
+            await hog.stop()
+        try:
+            loop.run_until_complete(test())
+        finally:
+            disable_accounting(loop)
+        assert(get_loop_accounting(loop) is None)
+        stats = accounting.get_stats()
+        budgeted = stats['actors']['budgeted']
+        assert(budgeted['messages'] >= 50 and budgeted['preempted'] > 0)
+        assert(budgeted['max_slice'] < 0.02)
+        assert(stats['actors']['hog']['max_slice'] >= 0.05)
+        assert(stats['starved'] >= 1)
+        assert(stats['culprits'].get('hog', 0) >= 1)
+        assert(stats['lag']['count'] > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+'''
+Actor selection tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import asyncio
+import unittest
+from test.modules.actors import CollectTestActor, IntMessage
+from compaktor.actor.base_actor import BaseActor
+from compaktor.registry.actor_registry import Registry, get_registry
+from compaktor.registry.selection import compile_pattern, match_path
+
+
+class TestSelection(unittest.TestCase):
+
+    def build(self):
+        registry = Registry("localhost")
+        # the registry only holds actors weakly
+        self.actors = []
+
+        def add(address, name):
+            actor = BaseActor(name)
+            self.actors.append(actor)
+            registry.add_actor(address, actor, True)
+
+        with registry.batch():
+            add("localhost", "ingest")
+            for group in ("a", "b"):
+                add("localhost/ingest", group)
+                for name in ("parser-1", "parser-2", "writer"):
+                    add("localhost/ingest/{}".format(group), name)
+            add("localhost/ingest/a/writer", "metrics")
+            add("localhost", "metrics")
+        return registry
+
+    def names(self, selection):
+        return sorted("/".join(path) for path in selection.get_addresses())
+
+    def test_match_path(self):
+        segments = compile_pattern("localhost/**/parser-?", "/")
+        assert(match_path(segments, ("localhost", "a", "b", "parser-1")))
+        assert(match_path(segments, ("localhost", "parser-1")))
+        assert(not match_path(segments, ("localhost", "a", "parser-10")))
+        with self.assertRaises(ValueError):
+            compile_pattern("localhost//a", "/")
+
+    def test_select(self):
+        registry = self.build()
+        parsers = registry.select("localhost/ingest/*/parser-*")
+        assert(self.names(parsers) == [
+            "localhost/ingest/a/parser-1", "localhost/ingest/a/parser-2",
+            "localhost/ingest/b/parser-1", "localhost/ingest/b/parser-2"])
+        metrics = registry.select("**/metrics")
+        assert(self.names(metrics) == [
+            "localhost/ingest/a/writer/metrics", "localhost/metrics"])
+        assert(len(parsers) == 4)
+        assert(parsers.get_stats()['rebuilds'] == 1)
+
+    def test_incremental_refresh(self):
+        registry = self.build()
+        parsers = registry.select("localhost/ingest/*/parser-*")
+        parsers.get_actors()
+        parser = BaseActor("parser-3")
+        registry.add_actor("localhost/ingest/b", parser, True)
+        registry.remove_branch("localhost/ingest/a", stop=False)
+        assert(self.names(parsers) == [
+            "localhost/ingest/b/parser-1", "localhost/ingest/b/parser-2",
+            "localhost/ingest/b/parser-3"])
+        registry.move_branch("localhost/ingest/b", "localhost")
+        assert(self.names(parsers) == [])
+        stats = parsers.get_stats()
+        assert(stats['rebuilds'] == 1 and stats['refreshes'] == 2)
+        registry.close()
+        assert(len(parsers) == 0)
+        assert(parsers.get_stats()['rebuilds'] == 2)
+
+    def test_tell(self):
+        async def test():
+            sender = BaseActor()
+            first = CollectTestActor("selection_tell_1")
+            second = CollectTestActor("selection_tell_2")
+            sender.start()
+            first.start()
+            second.start()
+            selection = get_registry().select("localhost/selection_tell_*")
+            assert(await selection.tell(sender, IntMessage(1)) == 2)
+            await asyncio.sleep(0.05)
+            assert(first.received == [1] and second.received == [1])
+            for actor in (sender, first, second):
+                await actor.stop()
+        asyncio.get_event_loop().run_until_complete(test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+'''
+Message codec and framing tests
+
+Created on Oct 18, 2026
+
+@author: aevans
+'''
+
+import multiprocessing
+import pickle
+from array import array
+import unittest
+from test.modules.actors import IntMessage
+from compaktor.message.message_objects import Message, QueryMessage
+from compaktor.multiprocessing.runtime import protocol
+from compaktor.serialization.codec_registry import CodecRegistry,\
+    get_codec_registry, use_codec
+from compaktor.serialization.codecs import PickleCodec, StructCodec
+from compaktor.serialization.frames import frame_header, frame_size,\
+    recv_frames, send_frames, split_frames
+
+
+@use_codec(lambda cls: StructCodec(cls, '!qd'))
+class PointMessage(Message):
+    __slots__ = ()
+
+
+class SubPointMessage(PointMessage):
+    __slots__ = ('label',)
+
+    def __init__(self, payload, label=None):
+        super().__init__(payload)
+        self.label = label
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_pickle_out_of_band(self):
+        codec = PickleCodec(threshold=1024)
+        payload = bytes(range(256)) * 64
+        message = Message(payload)
+        frames = codec.encode(message)
+        assert(len(frames) == 2)
+        assert(len(frames[0]) < 1024)
+        assert(frames[1].obj is payload)
+        assert(message.payload is payload)
+        decoded = codec.decode([frames[0], bytes(frames[1])])
+        assert(decoded.payload == payload)
+        assert(len(codec.encode(Message(b'small'))) == 1)
+        doubles = array('d', range(200))
+        frames = codec.encode(Message(memoryview(doubles)))
+        assert(len(frames) == 2 and frame_size(frames[1]) == 1600)
+        decoded = codec.decode([frames[0], bytes(frames[1])])
+        assert(array('d', decoded.payload) == doubles)
+
+    def test_struct_codec(self):
+        codec = StructCodec(IntMessage, '!i')
+        frames = codec.encode(IntMessage(42))
+        assert(frames == [b'\x00\x00\x00\x2a'])
+        decoded = codec.decode(frames)
+        assert(isinstance(decoded, IntMessage) and decoded.payload == 42)
+        codec = StructCodec(PointMessage, '!qd')
+        decoded = codec.decode(codec.encode(PointMessage((3, 0.5))))
+        assert(decoded.payload == (3, 0.5))
+
+    def test_registry(self):
+        codecs = CodecRegistry()
+        key = codecs.register(IntMessage, StructCodec(IntMessage, '!i'))
+        assert(codecs.key_for(IntMessage) == key)
+        assert(codecs.key_for(Message) == 0)
+        decoded = codecs.decode(codecs.encode(IntMessage(7)))
+        assert(isinstance(decoded, IntMessage) and decoded.payload == 7)
+        decoded = codecs.decode(codecs.encode(QueryMessage('q')))
+        assert(decoded.payload == 'q')
+        global_codecs = get_codec_registry()
+        point_key = global_codecs.key_for(PointMessage)
+        assert(point_key != 0)
+        assert(global_codecs.key_for(SubPointMessage) == 0)
+        decoded = global_codecs.decode(
+            global_codecs.encode(SubPointMessage((1, 2.0), 'sub')))
+        assert(type(decoded) is SubPointMessage)
+        assert(decoded.payload == (1, 2.0) and decoded.label == 'sub')
+
+    def test_commands(self):
+        sender = object()
+        frames = protocol.encode_command(
+            (protocol.TELL, 'a', Message(bytes(4096), sender)))
+        assert(len(frames) == 2)
+        command = protocol.decode_command(frames)
+        assert(command[:2] == (protocol.TELL, 'a'))
+        assert(command[2].sender is None)
+        assert(command[2].payload == bytes(4096))
+        frames = protocol.encode_command(
+            (protocol.ASK, 3, 'b', PointMessage((1, 2.0), sender)))
+        assert(pickle.loads(frames[0])[0] & protocol.CODED)
+        command = protocol.decode_command(frames)
+        assert(command[:3] == (protocol.ASK, 3, 'b'))
+        assert(isinstance(command[3], PointMessage))
+        assert(command[3].payload == (1, 2.0))
+
+    def test_frames(self):
+        frames = [b'head', bytes(100), b'']
+        parts, rest = split_frames(frame_header(frames) + b''.join(frames))
+        assert([bytes(part) for part in parts] == frames and rest == ())
+        parts, rest = split_frames(frame_header(frames, 1) + frames[0])
+        assert([bytes(part) for part in parts] == frames[:1])
+        assert(rest == (100, 0))
+        parent, child = multiprocessing.Pipe()
+        try:
+            large = bytes(range(256)) * 64
+            send_frames(parent, [b'head', large], inline_limit=1024)
+            received = recv_frames(child)
+            assert(bytes(received[0]) == b'head' and received[1] == large)
+            doubles = array('d', range(200))
+            assert(frame_size(doubles) == frame_size(memoryview(doubles)))
+            assert(frame_size(doubles) == 1600)
+            send_frames(parent, [b'head', doubles], inline_limit=1024)
+            received = recv_frames(child)
+            assert(bytes(received[1]) == doubles.tobytes())
+        finally:
+            parent.close()
+            child.close()
+
+
+if __name__ == "__main__":
+    unittest.main()